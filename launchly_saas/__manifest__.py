@@ -8,20 +8,28 @@
     "author": "Abdulrahman Elassal",
     "website": "https://launchlyclub.com/",
     "license": "AGPL-3",
-    "version": "18.0.1.2",
-    "depends": ["base", "product", "sale_management" , "project"],
+    "version": "18.0.1.4",
+    "depends": ["base", "bus", "product", "sale_management" , "project"],
     "data": [
         "data/ir_sequence.xml",
+        "data/port_range_data.xml",
         "views/subscription_views.xml",
         "views/menu.xml",
         "security/ir.model.access.csv",
         "security/security.xml",
         "views/odoo_instance.xml",
         "views/odoo_template.xml",
+        "views/golden_database_views.xml",
+        "views/provision_job_views.xml",
+        "views/instance_metric_views.xml",
+        "views/port_lease_views.xml",
+        "views/fleet_operation_views.xml",
+        "views/custom_addon_version_views.xml",
         "views/config_views.xml",
         "views/instance_plan_views.xml",
         "views/instance_backup_views.xml",
         "views/instance_backup_file_wizard.xml",
+        "views/instance_backup_restore_wizard.xml",
         "views/subscription_renewal_history_views.xml",
         "data/subscription_data.xml",
         "data/mail_template_data.xml",
@@ -30,6 +38,11 @@
         "data/instance_backup_cron.xml",
         "views/Project_views.xml",
     ],
+    "assets": {
+        "web.assets_backend": [
+            "launchly_saas/static/src/**/*",
+        ],
+    },
     "images": ["static/icon.png"],
     "demo": [],
     "installable": True,
@@ -0,0 +1,99 @@
+#!/bin/bash
+################################################################################
+# Golden Template Database Builder
+# Builds a fully initialized (-i base) database once so that new instances can
+# be cloned from it with `createdb -T` instead of initializing from scratch.
+# Usage:
+#   ./build_golden_db.sh <golden_db> <odoo_version> <source_path> <country_code> <is_demo> <shared_venv> <wheel_cache>
+################################################################################
+
+# Exit on error
+set -e
+
+GOLDEN_DB=$1
+ODOO_VERSION=$2
+SOURCE_PATH=$3
+COUNTRY_CODE=$4
+IS_DEMO=$5
+SHARED_VENV=$6
+WHEEL_CACHE=$7
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+
+# Golden databases are owned by a dedicated system/PostgreSQL user so that the
+# installer can safely reassign every object to the tenant user after cloning.
+GOLDEN_USER="launchly_golden"
+GOLDEN_HOME="/opt/$GOLDEN_USER"
+GOLDEN_DATA="$GOLDEN_HOME/data"
+GOLDEN_DB_PASSWORD="adminpwd"
+VENV_PATH="$SHARED_VENV"
+
+echo "============================================================"
+echo " Building golden database: $GOLDEN_DB"
+echo " Version: $ODOO_VERSION"
+echo " Source path: $SOURCE_PATH"
+echo " Country: ${COUNTRY_CODE:-generic}"
+echo " Demo Data: $IS_DEMO"
+echo "============================================================"
+
+# Create system user
+if ! id -u $GOLDEN_USER >/dev/null 2>&1; then
+    sudo adduser --system --home=$GOLDEN_HOME --group $GOLDEN_USER
+fi
+sudo mkdir -p $GOLDEN_DATA
+sudo chown -R $GOLDEN_USER:$GOLDEN_USER $GOLDEN_DATA
+
+# PostgreSQL user setup
+if ! sudo -u postgres psql -tAc "SELECT 1 FROM pg_roles WHERE rolname='$GOLDEN_USER'" | grep -q 1; then
+    echo "Creating PostgreSQL user $GOLDEN_USER..."
+    sudo -u postgres psql -c "CREATE USER $GOLDEN_USER WITH PASSWORD '$GOLDEN_DB_PASSWORD' CREATEDB;"
+fi
+
+# Drop the previous build, a template database must be unflagged before it can be dropped
+if sudo -u postgres psql -tAc "SELECT 1 FROM pg_database WHERE datname='$GOLDEN_DB'" | grep -q 1; then
+    echo "Dropping previous golden database $GOLDEN_DB..."
+    sudo -u postgres psql -c "ALTER DATABASE $GOLDEN_DB IS_TEMPLATE false;"
+    sudo -u postgres dropdb $GOLDEN_DB
+fi
+sudo rm -rf $GOLDEN_DATA/filestore/$GOLDEN_DB
+sudo -u postgres createdb -O $GOLDEN_USER $GOLDEN_DB
+
+# Grant access to the source path
+current="$SOURCE_PATH"
+while [ "$current" != "/" ]; do
+    sudo setfacl -m u:"$GOLDEN_USER":x "$current"
+    current=$(dirname "$current")
+done
+sudo setfacl -R -m u:"$GOLDEN_USER":rx "$SOURCE_PATH"
+
+# Setup (or reuse) the shared virtualenv of this Odoo version
+bash $SCRIPT_DIR/setup_shared_venv.sh $SHARED_VENV $WHEEL_CACHE $SOURCE_PATH
+
+if [ "$IS_DEMO" = "true" ]; then
+    DEMO_ARGS=""
+else
+    DEMO_ARGS="--without-demo=all"
+fi
+
+echo "Initializing golden database $GOLDEN_DB with base modules..."
+sudo -u $GOLDEN_USER $VENV_PATH/bin/python3.10 $SOURCE_PATH/odoo-bin \
+    --addons-path=$SOURCE_PATH/addons \
+    --data-dir=$GOLDEN_DATA \
+    --db_user=$GOLDEN_USER \
+    --db_password=$GOLDEN_DB_PASSWORD \
+    -d $GOLDEN_DB -i base $DEMO_ARGS --stop-after-init
+
+if ! sudo -u postgres psql -d $GOLDEN_DB -tAc "SELECT 1 FROM information_schema.tables WHERE table_name='ir_module_module'" | grep -q 1; then
+    echo "ERROR: Golden database $GOLDEN_DB was not initialized"
+    exit 1
+fi
+
+# Localize the company so country specific golden databases match their key
+if [ -n "$COUNTRY_CODE" ]; then
+    sudo -u postgres psql -d $GOLDEN_DB -c "UPDATE res_company SET country_id = (SELECT id FROM res_country WHERE code = '$COUNTRY_CODE' LIMIT 1) WHERE EXISTS (SELECT 1 FROM res_country WHERE code = '$COUNTRY_CODE');"
+    sudo -u postgres psql -d $GOLDEN_DB -c "UPDATE res_partner SET country_id = (SELECT country_id FROM res_company ORDER BY id LIMIT 1) WHERE id IN (SELECT partner_id FROM res_company);"
+fi
+
+# Freeze the database: only usable as a template from now on
+sudo -u postgres psql -c "ALTER DATABASE $GOLDEN_DB IS_TEMPLATE true ALLOW_CONNECTIONS false;"
+
+echo "GOLDEN_DB_READY: $GOLDEN_DB"
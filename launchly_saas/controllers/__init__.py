@@ -1,2 +1,3 @@
 from . import backup_download
+from . import instance_wake
 from . import main
@@ -1,8 +1,11 @@
 from odoo import http
-from odoo.http import request
+from odoo.http import request, content_disposition
 import os
-from werkzeug.utils import secure_filename
+from werkzeug.utils import secure_filename, send_file
 from werkzeug.exceptions import NotFound, Forbidden
+from werkzeug.wrappers import Response
+
+from ..models.backup_stream import BlobStore, BLOB_STORE_DIR, iter_full_archive, read_filestore_index
 
 class MicroSaasBackupDownloadController(http.Controller):
     @http.route('/launchly_saas/download_backup', type='http', auth='user')
@@ -25,11 +28,21 @@ class MicroSaasBackupDownloadController(http.Controller):
             return Forbidden()
         if not os.path.isfile(abs_path):
             return NotFound()
-        # Stream the file
-        return request.make_response(
-            open(abs_path, 'rb').read(),
-            headers=[
-                ('Content-Type', 'application/zip'),
-                ('Content-Disposition', f'attachment; filename="{filename}"'),
-            ]
-        ) 
\ No newline at end of file
+        # Incremental archives only hold the filestore index, the full zip is rebuilt from the blob store
+        if read_filestore_index(abs_path) is not None:
+            store = BlobStore(os.path.join(os.path.abspath(backup_path), BLOB_STORE_DIR))
+            return Response(
+                iter_full_archive(abs_path, store),
+                mimetype='application/zip',
+                headers=[('Content-Disposition', content_disposition(filename))],
+                direct_passthrough=True,
+            )
+        # Stream the file from disk, large archives are never loaded in memory
+        return send_file(
+            abs_path,
+            request.httprequest.environ,
+            mimetype='application/zip',
+            as_attachment=True,
+            download_name=filename,
+            conditional=True,
+        )
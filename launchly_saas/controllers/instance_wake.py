@@ -0,0 +1,35 @@
+from odoo import http
+from odoo.http import request
+from odoo.tools import consteq
+from werkzeug.exceptions import NotFound
+from werkzeug.wrappers import Response
+
+from ..models.odoo_instance import WAKE_TIMEOUT
+
+RETRY_PAGE = """<!DOCTYPE html>
+<html><head><meta http-equiv="refresh" content="10"><title>Starting</title></head>
+<body><p>This instance is starting, the page reloads in a few seconds.</p></body></html>"""
+
+
+class InstanceWakeController(http.Controller):
+
+    @http.route('/launchly_saas/wake/<int:instance_id>/<string:token>', type='http', auth='public', csrf=False,
+                save_session=False)
+    def wake_instance(self, instance_id, token, **kwargs):
+        """Called by the vhost of an instance when nginx cannot connect to it: start the hibernated
+        instance, then send the client back to the URL it asked for.
+
+        Only the request that started the instance waits for it and is redirected; the others
+        (parallel asset requests, an instance that is simply down) get a 503 to retry later.
+        """
+        instance = request.env['odoo.instance'].sudo().browse(instance_id).exists()
+        if not instance or not consteq(instance.wake_token or '', token):
+            return NotFound()
+        if not instance._wake() or not instance._wait_until_healthy(WAKE_TIMEOUT):
+            return Response(RETRY_PAGE, status=503,
+                            headers=[('Retry-After', '10'), ('Content-Type', 'text/html; charset=utf-8')])
+        uri = request.httprequest.headers.get('X-Launchly-Uri') or '/'
+        if not uri.startswith('/') or uri.startswith('//'):
+            uri = '/'
+        # 307 makes the browser repeat the same method and body, which never reached the instance
+        return request.redirect(uri, code=307, local=True)
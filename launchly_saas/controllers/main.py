@@ -1,6 +1,7 @@
 import logging
 from odoo import http
 from odoo.http import request
+from odoo.tools import consteq
 
 _logger = logging.getLogger(__name__)
 
@@ -56,12 +57,29 @@ class SubscriptionAPI(http.Controller):
             'subscription_period': subscription_period,
         })
 
+        job = subscription.provision_job_id
         return {
             "message": "Subscription created successfully",
             "subscription_id": subscription.id,
-            "partner_id": partner.id
+            "partner_id": partner.id,
+            "job_id": job.id or None,
+            "job_token": job.access_token or None,
         }
 
+    @http.route('/api/provision_status', type='json', auth='public', methods=['POST'], csrf=False)
+    def provision_status(self, **kwargs):
+        params = kwargs.get('params', kwargs)
+        job_id = params.get('job_id')
+        token = params.get('job_token')
+        if not job_id or not token:
+            return {"error": "Missing required fields: job_id, job_token"}
+
+        job = request.env['launchly.provision.job'].sudo().browse(int(job_id)).exists()
+        if not job or not consteq(job.access_token or '', str(token)):
+            return {"error": "Provisioning job not found"}
+
+        return job.get_status()
+
     @http.route('/api/create_demo', type='json', auth='public', methods=['POST'], csrf=False)
     def create_demo(self, **kwargs):
         # Log content type
@@ -144,13 +162,17 @@ class SubscriptionAPI(http.Controller):
             instance = request.env['odoo.instance'].sudo().create_demo_instance_after_delay(post_data,
                                                                                                    partner.id)
 
+            job = request.env['launchly.provision.job'].sudo().search(
+                [('instance_id', '=', instance.id)], limit=1) if instance else None
             return {
                 "jsonrpc": "2.0",
                 "result": {
                     "message": "Demo instance creation initiated successfully",
                     "instance_id": instance.id if instance else None,
                     "partner_id": partner.id,
-                    "activation_code": instance.name if instance else None
+                    "activation_code": instance.name if instance else None,
+                    "job_id": job.id if job else None,
+                    "job_token": job.access_token if job else None,
                 }
             }
 
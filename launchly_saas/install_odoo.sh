@@ -2,7 +2,7 @@
 ################################################################################
 # Odoo Instance Installer Script - Custom Addons Auto Path
 # Usage:
-#   ./install_odoo_instance.sh <name> <odoo_version> <source_path> <http_port> <db_name> <db_user> <db_password> <admin_password> <user_email> <user_phone> <country_code> <is_demo>
+#   ./install_odoo_instance.sh <name> <odoo_version> <source_path> <http_port> <db_name> <db_user> <db_password> <admin_password> <user_email> <user_phone> <country_code> <is_demo> [golden_db] [shared_venv] [wheel_cache] [skip_packages]
 ################################################################################
 
 # Exit on error
@@ -21,6 +21,10 @@ USER_EMAIL=$9
 USER_PHONE=${10}
 COUNTRY_CODE=${11}
 IS_DEMO=${12}
+GOLDEN_DB=${13}
+SHARED_VENV=${14}
+WHEEL_CACHE=${15}
+SKIP_PACKAGES=${16:-false}
 
 # Derived vars
 OE_USER=$INSTANCE_NAME
@@ -30,6 +34,8 @@ OE_CONFIG="/etc/${OE_USER}.conf"
 OE_LOG="/var/log/${OE_USER}.log"
 VENV_PATH="$OE_HOME/venv"
 CUSTOM_ADDONS_PATH="$OE_HOME/custom-addons"   # <-- Auto created
+GOLDEN_DATA="/opt/launchly_golden/data"       # <-- Filestores of golden template databases
+DB_CLONED=false
 
 echo "============================================================"
 echo " Starting installation of Odoo instance: $INSTANCE_NAME"
@@ -41,13 +47,19 @@ echo " Database: $DB_NAME (User: $DB_USER)"
 echo " Admin Email: $USER_EMAIL"
 echo " Country: $COUNTRY_CODE"
 echo " Demo Data: $IS_DEMO"
+echo " Golden DB: ${GOLDEN_DB:-none}"
+echo " Shared venv: ${SHARED_VENV:-none}"
 echo "============================================================"
 
-# Install dependencies
-sudo apt-get install -y git python3.10 python3.10-venv python3.10-dev \
-    libxml2-dev libxslt1-dev zlib1g-dev libsasl2-dev libldap2-dev \
-    build-essential libssl-dev libffi-dev libjpeg-dev libpq-dev \
-    xfonts-75dpi xfonts-base fontconfig acl
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+
+# Install dependencies (the shared virtualenv builder installs them when it has to build wheels)
+if [ -z "$SHARED_VENV" ]; then
+    sudo apt-get install -y git python3.10 python3.10-venv python3.10-dev \
+        libxml2-dev libxslt1-dev zlib1g-dev libsasl2-dev libldap2-dev \
+        build-essential libssl-dev libffi-dev libjpeg-dev libpq-dev \
+        xfonts-75dpi xfonts-base fontconfig acl
+fi
 
 # Create system user
 if ! id -u $OE_USER >/dev/null 2>&1; then
@@ -66,11 +78,58 @@ fi
 
 # Create database if it doesn't exist
 if ! sudo -u postgres psql -tAc "SELECT 1 FROM pg_database WHERE datname='$DB_NAME'" | grep -q 1; then
-    echo "Creating database $DB_NAME..."
-    sudo -u postgres createdb -O $DB_USER $DB_NAME
-    echo "Database $DB_NAME created successfully."
-    DB_NEEDS_INIT=true
-    echo "DEBUG: DB_NEEDS_INIT set to true (new database)"
+    if [ -n "$GOLDEN_DB" ] && sudo -u postgres psql -tAc "SELECT 1 FROM pg_database WHERE datname='$GOLDEN_DB' AND datistemplate" | grep -q 1; then
+        echo "Cloning database $DB_NAME from golden template $GOLDEN_DB..."
+        sudo -u postgres createdb -T $GOLDEN_DB -O $DB_USER $DB_NAME
+
+        # The clone keeps the golden owner on every object: hand them over to the tenant user
+        # and give the database its own identity (uuid/secret) instead of the golden one.
+        sudo -u postgres psql -d $DB_NAME -v ON_ERROR_STOP=1 <<EOSQL
+ALTER SCHEMA public OWNER TO $DB_USER;
+DO \$\$
+DECLARE
+    r record;
+BEGIN
+    FOR r IN
+        SELECT c.relname, c.relkind
+          FROM pg_class c
+          JOIN pg_namespace n ON n.oid = c.relnamespace
+         WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p', 'v', 'm', 'S')
+    LOOP
+        EXECUTE format('ALTER %s public.%I OWNER TO %I',
+                       CASE r.relkind
+                           WHEN 'S' THEN 'SEQUENCE'
+                           WHEN 'v' THEN 'VIEW'
+                           WHEN 'm' THEN 'MATERIALIZED VIEW'
+                           ELSE 'TABLE'
+                       END,
+                       r.relname, '$DB_USER');
+    END LOOP;
+    FOR r IN
+        SELECT p.oid::regprocedure AS func
+          FROM pg_proc p
+          JOIN pg_namespace n ON n.oid = p.pronamespace
+         WHERE n.nspname = 'public'
+    LOOP
+        EXECUTE format('ALTER FUNCTION %s OWNER TO %I', r.func, '$DB_USER');
+    END LOOP;
+END
+\$\$;
+UPDATE ir_config_parameter SET value = md5(random()::text || clock_timestamp()::text)::uuid::text WHERE key = 'database.uuid';
+UPDATE ir_config_parameter SET value = md5(random()::text || clock_timestamp()::text)::uuid::text WHERE key = 'database.secret';
+UPDATE ir_config_parameter SET value = to_char(now() AT TIME ZONE 'UTC', 'YYYY-MM-DD HH24:MI:SS') WHERE key = 'database.create_date';
+EOSQL
+        echo "Database $DB_NAME cloned successfully."
+        DB_CLONED=true
+        DB_NEEDS_INIT=false
+        echo "DEBUG: DB_NEEDS_INIT set to false (cloned from golden database)"
+    else
+        echo "Creating database $DB_NAME..."
+        sudo -u postgres createdb -O $DB_USER $DB_NAME
+        echo "Database $DB_NAME created successfully."
+        DB_NEEDS_INIT=true
+        echo "DEBUG: DB_NEEDS_INIT set to true (new database)"
+    fi
 else
     echo "Database $DB_NAME already exists."
     # Check if database is initialized (has ir_module_module table)
@@ -107,14 +166,33 @@ sudo chown -R $OE_USER:$OE_USER $CUSTOM_ADDONS_PATH
 
 # Create data directory for filestore and session data
 sudo mkdir -p $OE_HOME/data
+if [ "$DB_CLONED" = "true" ] && [ -d "$GOLDEN_DATA/filestore/$GOLDEN_DB" ]; then
+    echo "Copying golden filestore for $DB_NAME..."
+    sudo mkdir -p $OE_HOME/data/filestore
+    sudo rm -rf $OE_HOME/data/filestore/$DB_NAME
+    sudo cp -a $GOLDEN_DATA/filestore/$GOLDEN_DB $OE_HOME/data/filestore/$DB_NAME
+fi
 sudo chown -R $OE_USER:$OE_USER $OE_HOME/data
 
 # Setup virtualenv
-python3.10 -m venv $VENV_PATH
-source $VENV_PATH/bin/activate
-pip install --upgrade pip wheel setuptools
-pip install -r $OE_HOME_EXT/requirements.txt
-deactivate
+if [ -n "$SHARED_VENV" ]; then
+    if [ "$SKIP_PACKAGES" = "true" ] && [ -f "$SHARED_VENV/.launchly-ready" ]; then
+        echo "Reusing shared virtualenv $SHARED_VENV (package installation skipped)"
+    else
+        bash $SCRIPT_DIR/setup_shared_venv.sh $SHARED_VENV $WHEEL_CACHE $OE_HOME_EXT
+    fi
+    # The instance venv is a link to the shared read-only environment
+    if [ -d "$VENV_PATH" ] && [ ! -L "$VENV_PATH" ]; then
+        sudo rm -rf $VENV_PATH
+    fi
+    sudo ln -sfn $SHARED_VENV $VENV_PATH
+else
+    python3.10 -m venv $VENV_PATH
+    source $VENV_PATH/bin/activate
+    pip install --upgrade pip wheel setuptools
+    pip install -r $OE_HOME_EXT/requirements.txt
+    deactivate
+fi
 
 # Determine demo data setting
 if [ "$IS_DEMO" = "true" ]; then
@@ -234,8 +312,8 @@ else
     echo "DEBUG: Database initialization not needed"
 fi
 
-# Only setup admin user if database was just initialized successfully
-if [ "$DB_NEEDS_INIT" = "true" ] && [ "$DB_INIT_SUCCESS" = "true" ]; then
+# Only setup admin user if database was just initialized successfully or cloned from a golden database
+if { [ "$DB_NEEDS_INIT" = "true" ] && [ "$DB_INIT_SUCCESS" = "true" ]; } || [ "$DB_CLONED" = "true" ]; then
     echo "Setting up admin user with custom credentials..."
     # Create a temporary Python script to setup the admin user
     SETUP_SCRIPT="/tmp/setup_admin_${INSTANCE_NAME}.py"
@@ -0,0 +1,44 @@
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def _table_exists(cr, table):
+    cr.execute("SELECT 1 FROM information_schema.tables WHERE table_name = %s", (table,))
+    return bool(cr.fetchone())
+
+
+def migrate(cr, version):
+    """Remove the duplicated mirror lines before the unique constraints are added.
+
+    The oldest line of each (instance, addon) and (instance, login) is kept; the many2many links
+    to a removed addon line are moved to the kept one.
+    """
+    if _table_exists(cr, 'odoo_addon_line'):
+        cr.execute("""
+            CREATE TEMPORARY TABLE launchly_addon_line_duplicates ON COMMIT DROP AS
+            SELECT id, keep_id
+              FROM (SELECT id, min(id) OVER (PARTITION BY instance_id, name) AS keep_id
+                      FROM odoo_addon_line) lines
+             WHERE id != keep_id
+        """)
+        if _table_exists(cr, 'instance_odoo_addon_rel'):
+            cr.execute("""
+                INSERT INTO instance_odoo_addon_rel (instance_id, odoo_addon_id)
+                SELECT rel.instance_id, dup.keep_id
+                  FROM instance_odoo_addon_rel rel
+                  JOIN launchly_addon_line_duplicates dup ON dup.id = rel.odoo_addon_id
+                    ON CONFLICT DO NOTHING
+            """)
+        cr.execute("DELETE FROM odoo_addon_line WHERE id IN (SELECT id FROM launchly_addon_line_duplicates)")
+        _logger.info(f"[LAUNCHLY_SAAS] Removed {cr.rowcount} duplicated addon lines")
+
+    if _table_exists(cr, 'odoo_db_user'):
+        cr.execute("""
+            DELETE FROM odoo_db_user
+             WHERE id IN (SELECT id
+                            FROM (SELECT id, min(id) OVER (PARTITION BY instance_id, login) AS keep_id
+                                    FROM odoo_db_user) users
+                           WHERE id != keep_id)
+        """)
+        _logger.info(f"[LAUNCHLY_SAAS] Removed {cr.rowcount} duplicated database users")
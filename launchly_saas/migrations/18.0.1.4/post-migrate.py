@@ -0,0 +1,17 @@
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """Record the directory each existing custom addon line is installed under.
+
+    The line keeps that name on the next upload or update, whatever upload method is used.
+    """
+    cr.execute("""
+        UPDATE custom_addon_line
+           SET technical_name = regexp_replace(rtrim(addon_path, '/'), '^.*/', '')
+         WHERE technical_name IS NULL
+           AND coalesce(addon_path, '') != ''
+    """)
+    _logger.info(f"[LAUNCHLY_SAAS] Set the technical name of {cr.rowcount} custom addon lines")
@@ -1,15 +1,25 @@
+from . import pg_access
 from . import odoo_template
+from . import golden_database
 
 from . import odoo_instance
+from . import instance_log
+from . import instance_metric
+from . import port_lease
+from . import fleet_operation
 
 from . import custom_addon_line
+from . import custom_addon_version
 from . import db_users
 from . import saas_config
 from . import odoo_addon_line
 from . import instance_plan
 from . import instance_backup
+from . import instance_backup_archive
 from . import instance_backup_file_wizard
+from . import instance_backup_restore_wizard
 from . import subscription
 from . import subscription_renewal_history
 from . import demo_creation
+from . import provision_job
 from . import Project
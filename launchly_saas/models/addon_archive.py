@@ -0,0 +1,76 @@
+import os
+import posixpath
+import stat
+
+MANIFEST_NAMES = ('__manifest__.py', '__openerp__.py')
+# A member inflating more than this is treated as a zip bomb whatever the size limits
+MAX_COMPRESSION_RATIO = 200
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class AddonArchiveError(ValueError):
+    """The uploaded archive is not a valid or acceptable addon archive"""
+
+
+def _check_member_name(name):
+    if name.startswith('/') or '\\' in name or (len(name) > 1 and name[1] == ':'):
+        raise AddonArchiveError(f"Unsafe path in archive: {name}")
+    if '..' in posixpath.normpath(name).split('/'):
+        raise AddonArchiveError(f"Unsafe path in archive: {name}")
+
+
+def inspect_archive(zf, max_entries, max_file_size, max_total_size):
+    """Validate the index of an addon archive before anything is extracted.
+
+    Rejects absolute or parent paths, symlinks and device files, and archives over the entry
+    count, per file or total size limits. The addon root is the shallowest directory holding a
+    manifest.
+
+    :returns: (prefix of the addon root inside the archive, '' or 'dir/', members under it)
+    """
+    infos = zf.infolist()
+    if len(infos) > max_entries:
+        raise AddonArchiveError(f"Archive has {len(infos)} entries, the limit is {max_entries}")
+    total = 0
+    manifests = []
+    for info in infos:
+        _check_member_name(info.filename)
+        file_type = stat.S_IFMT(info.external_attr >> 16)
+        if file_type and file_type not in (stat.S_IFREG, stat.S_IFDIR):
+            raise AddonArchiveError(f"Archive member {info.filename} is not a regular file")
+        if info.file_size > max_file_size:
+            raise AddonArchiveError(f"Archive member {info.filename} is larger than {max_file_size} bytes")
+        if info.compress_size and info.file_size / info.compress_size > MAX_COMPRESSION_RATIO:
+            raise AddonArchiveError(f"Archive member {info.filename} has a suspicious compression ratio")
+        total += info.file_size
+        if posixpath.basename(info.filename) in MANIFEST_NAMES:
+            manifests.append(info.filename)
+    if total > max_total_size:
+        raise AddonArchiveError(f"Archive expands to {total} bytes, the limit is {max_total_size}")
+    manifests = [name for name in manifests if name.count('/') <= 1]
+    if not manifests:
+        raise AddonArchiveError("Invalid addon: No manifest file found")
+    manifest = min(manifests, key=lambda name: name.count('/'))
+    prefix = manifest[:-len(posixpath.basename(manifest))]
+    members = [info for info in infos if info.filename.startswith(prefix) and not info.is_dir()]
+    return prefix, members
+
+
+def extract_members(zf, members, prefix, dest, max_file_size):
+    """Extract the members one by one under `dest`, stripping the addon root prefix.
+
+    Sizes are checked again while inflating, the headers of a crafted archive can lie.
+    """
+    for info in members:
+        target = os.path.join(dest, *info.filename[len(prefix):].split('/'))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        written = 0
+        with zf.open(info) as source, open(target, 'wb') as output:
+            while True:
+                chunk = source.read(COPY_CHUNK_SIZE)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > max_file_size:
+                    raise AddonArchiveError(f"Archive member {info.filename} is larger than {max_file_size} bytes")
+                output.write(chunk)
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+# Not part of the addon sources, rebuilt by Odoo
+IGNORED_DIRS = {'__pycache__', '.git'}
+IGNORED_SUFFIXES = ('.pyc', '.pyo')
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_hash(path):
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_index(root, previous=None):
+    """Index of the files of an addon directory: {relative path: [size, mtime_ns, blake2b]}.
+
+    Files whose size and mtime match the `previous` index keep their hash, only the other ones
+    are read.
+    """
+    previous = previous or {}
+    index = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [name for name in dirnames if name not in IGNORED_DIRS]
+        for filename in filenames:
+            if filename.endswith(IGNORED_SUFFIXES):
+                continue
+            path = os.path.join(dirpath, filename)
+            rel_path = os.path.relpath(path, root)
+            stat = os.stat(path)
+            known = previous.get(rel_path)
+            if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+                index[rel_path] = known
+            else:
+                index[rel_path] = [stat.st_size, stat.st_mtime_ns, file_hash(path)]
+    return index
+
+
+def load_index(value):
+    return json.loads(value) if value else {}
+
+
+def dump_index(index):
+    return json.dumps(index, sort_keys=True, separators=(',', ':'))
+
+
+def diff_indexes(current, source):
+    """Files to change to turn `current` into `source`.
+
+    :returns: (added, modified, removed) sorted lists of relative paths
+    """
+    added = sorted(path for path in source if path not in current)
+    removed = sorted(path for path in current if path not in source)
+    modified = sorted(path for path in source
+                      if path in current and current[path][2] != source[path][2])
+    return added, modified, removed
+
+
+def apply_changes(source_root, dest_root, added, modified, removed):
+    """Copy the added and modified files from `source_root` and delete the removed ones.
+
+    Each file is written next to its destination then renamed over it, so a running instance
+    never reads a partially written file. Raises PermissionError when `dest_root` is not writable.
+    """
+    for rel_path in added + modified:
+        dest = os.path.join(dest_root, rel_path)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dest), prefix='.launchly_')
+        os.close(fd)
+        try:
+            shutil.copy2(os.path.join(source_root, rel_path), tmp_path)
+            os.replace(tmp_path, dest)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    for rel_path in removed:
+        try:
+            os.remove(os.path.join(dest_root, rel_path))
+        except FileNotFoundError:
+            pass
+    # Directories left empty by removed files
+    for rel_path in removed:
+        directory = os.path.dirname(os.path.join(dest_root, rel_path))
+        while os.path.normpath(directory) != os.path.normpath(dest_root):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                break
+            directory = os.path.dirname(directory)
+
+
+def content_hash(index):
+    """Hash identifying the content of an indexed directory, independent of file times"""
+    digest = hashlib.blake2b(digest_size=20)
+    for rel_path in sorted(index):
+        digest.update(f"{rel_path}\0{index[rel_path][2]}\n".encode())
+    return digest.hexdigest()
+
+
+def build_tree(source_root, dest, index, base_root=None, base_index=None):
+    """Create `dest` with the content of `source_root`.
+
+    With a base (an existing copy of an earlier version of the same addon), unchanged files are
+    hard links to the base and only the changed files are copied.
+    """
+    ignore = shutil.ignore_patterns(*IGNORED_DIRS, *('*' + suffix for suffix in IGNORED_SUFFIXES))
+    if base_root and base_index:
+        shutil.copytree(base_root, dest, copy_function=os.link)
+        apply_changes(source_root, dest, *diff_indexes(base_index, index))
+    else:
+        shutil.copytree(source_root, dest, ignore=ignore)
+    make_shared(dest)
+
+
+def make_shared(root):
+    """Make a tree readable by every instance user and writable by none of them"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        os.chmod(dirpath, 0o755)
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            os.chmod(path, (os.stat(path).st_mode & 0o755) | 0o644)
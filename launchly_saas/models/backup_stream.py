@@ -0,0 +1,422 @@
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import time
+import zipfile
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Size of the chunks copied from the dump and filestore streams into the archive
+CHUNK_SIZE = 1024 * 1024
+
+# Archive compressions, zstd only exists on Python builds shipping zipfile.ZIP_ZSTANDARD (3.14+)
+ZIP_COMPRESSIONS = {
+    'stored': zipfile.ZIP_STORED,
+    'deflate': zipfile.ZIP_DEFLATED,
+}
+if hasattr(zipfile, 'ZIP_ZSTANDARD'):
+    ZIP_COMPRESSIONS['zstd'] = zipfile.ZIP_ZSTANDARD
+
+# Incremental backups: blob store directory (inside the backup directory) and the archive index
+BLOB_STORE_DIR = 'blobs'
+FILESTORE_INDEX = 'filestore.json'
+# Directory format dumps (pg_dump -Fd) are stored under this archive folder
+DUMP_DIRECTORY = 'dump'
+# Odoo filestore files are stored as <sha1[:2]>/<sha1 of the content>
+FILESTORE_NAME_RE = re.compile(r'^[0-9a-f]{2}/([0-9a-f]{40})$')
+
+
+class _HashingWriter:
+    """Write-only file wrapper hashing everything written through it.
+
+    It has no seek(), so zipfile writes the archive sequentially (sizes in data descriptors)
+    and the checksum of the whole archive is known as soon as it is closed.
+    """
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.hash.update(data)
+        self.size += len(data)
+        return self.raw.write(data)
+
+    def tell(self):
+        return self.size
+
+    def flush(self):
+        self.raw.flush()
+
+
+class StreamingBackupWriter:
+    """Write an Odoo restorable backup zip (dump.sql, filestore/, manifest.json) in constant memory.
+
+    The database dump and the filestore are streamed straight into the archive, nothing is copied
+    to a temporary directory. The archive is written to `<path>.part` and only renamed to `path`
+    once complete, so a failed backup never leaves a truncated zip next to the good ones.
+    The SHA256 checksum and size of the archive are available once it is closed.
+    """
+
+    def __init__(self, path, compression='deflate', compress_level=None):
+        if compression not in ZIP_COMPRESSIONS:
+            raise ValueError(f"Unsupported backup compression '{compression}'")
+        self.path = path
+        self.part_path = f'{path}.part'
+        self.compression = ZIP_COMPRESSIONS[compression]
+        # Levels only apply to deflate (0-9) and zstd, stored archives ignore them
+        self.compress_level = compress_level if compression != 'stored' else None
+        self.zipfile = None
+        self.file_count = 0
+        self.checksum = None
+        self.size = 0
+
+    def __enter__(self):
+        self._raw = open(self.part_path, 'wb')
+        self._writer = _HashingWriter(self._raw)
+        self.zipfile = zipfile.ZipFile(self._writer, 'w', compression=self.compression,
+                                       compresslevel=self.compress_level, allowZip64=True)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        complete = False
+        try:
+            self.zipfile.close()
+            self.checksum = self._writer.hash.hexdigest()
+            self.size = self._writer.size
+            if exc_type is None:
+                self._raw.flush()
+                os.fsync(self._raw.fileno())
+                complete = True
+        finally:
+            self._raw.close()
+            if complete:
+                os.replace(self.part_path, self.path)
+            elif os.path.exists(self.part_path):
+                os.remove(self.part_path)
+        return False
+
+    def add_stream(self, arcname, fileobj, compress=True):
+        """Copy a readable binary stream into the archive chunk by chunk"""
+        if not compress:
+            # Already compressed data (e.g. pg_dump -Fd members) is stored as is
+            arcname = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+            arcname.compress_type = zipfile.ZIP_STORED
+        with self.zipfile.open(arcname, 'w', force_zip64=True) as dest:
+            shutil.copyfileobj(fileobj, dest, CHUNK_SIZE)
+        self.file_count += 1
+
+    def add_bytes(self, arcname, data):
+        self.zipfile.writestr(arcname, data)
+        self.file_count += 1
+
+    def add_pg_dump(self, dump_cmd, env=None, arcname='dump.sql'):
+        """Stream the standard output of pg_dump into the archive"""
+        with tempfile.TemporaryFile() as stderr:
+            proc = subprocess.Popen(dump_cmd, env=env, stdout=subprocess.PIPE, stderr=stderr)
+            try:
+                self.add_stream(arcname, proc.stdout)
+            finally:
+                proc.stdout.close()
+                returncode = proc.wait()
+            if returncode != 0:
+                stderr.seek(0)
+                raise subprocess.CalledProcessError(returncode, dump_cmd, stderr=stderr.read().decode(errors='replace'))
+
+    def add_pg_dump_directory(self, dump_cmd, env=None, jobs=1):
+        """Run a parallel directory format pg_dump (-Fd -j) and move its files into the archive.
+
+        pg_dump can only write the directory format to disk: it is written next to the archive
+        and removed once its members, compressed by pg_dump itself, are stored in the archive.
+        """
+        dump_dir = f'{self.part_path}.{DUMP_DIRECTORY}'
+        shutil.rmtree(dump_dir, ignore_errors=True)
+        cmd = dump_cmd + ['-F', 'd', '-j', str(max(jobs, 1)), '-f', dump_dir]
+        try:
+            result = subprocess.run(cmd, env=env, capture_output=True, text=True)
+            if result.returncode != 0:
+                raise subprocess.CalledProcessError(result.returncode, cmd, stderr=result.stderr)
+            for filename in sorted(os.listdir(dump_dir)):
+                with open(os.path.join(dump_dir, filename), 'rb') as src:
+                    self.add_stream(f'{DUMP_DIRECTORY}/{filename}', src, compress=False)
+        finally:
+            shutil.rmtree(dump_dir, ignore_errors=True)
+
+    def add_directory(self, path, arcname, sudo_password=None):
+        """Stream every regular file of a directory into the archive under `arcname`"""
+        count = 0
+        for rel_path, fileobj in iter_directory_files(path, sudo_password):
+            self.add_stream(f'{arcname}/{rel_path}', fileobj)
+            count += 1
+        return count
+
+    def add_directory_blobs(self, path, store, sudo_password=None):
+        """Store the files of a directory in a blob store and add only their index to the archive.
+
+        Filestore files are named after the SHA1 of their content, so a file whose blob already
+        exists is neither read nor copied again; only the new files are streamed into the store.
+        """
+        index = {}
+        missing = []
+        for rel_path in list_directory_files(path, sudo_password):
+            match = FILESTORE_NAME_RE.match(rel_path)
+            if match and store.claim(match.group(1)):
+                index[rel_path] = match.group(1)
+            else:
+                missing.append(rel_path)
+        new_count = new_bytes = 0
+        if missing:
+            for rel_path, fileobj in iter_directory_files(path, sudo_password, missing):
+                digest, size, created = store.add_stream(fileobj)
+                index[rel_path] = digest
+                if created:
+                    new_count += 1
+                    new_bytes += size
+        self.add_bytes(FILESTORE_INDEX, json.dumps({'blob_store': BLOB_STORE_DIR, 'files': index}))
+        return {'files': len(index), 'new_blobs': new_count, 'new_bytes': new_bytes}
+
+
+def list_directory_files(path, sudo_password=None):
+    """Relative paths of the regular files of a directory, read through sudo when a password is given"""
+    if not sudo_password:
+        rel_paths = []
+        for root, dirs, files in os.walk(path):
+            for file in files:
+                abs_path = os.path.join(root, file)
+                if not os.path.islink(abs_path) and os.path.isfile(abs_path):
+                    rel_paths.append(os.path.relpath(abs_path, path))
+        return rel_paths
+    if not _sudo_test_directory(path, sudo_password):
+        return []
+    result = subprocess.run(['sudo', '-S', 'find', path, '-type', 'f', '-printf', '%P\\n'],
+                            input=f'{sudo_password}\n', text=True, capture_output=True, timeout=600)
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(result.returncode, result.args, stderr=result.stderr)
+    return [line for line in result.stdout.splitlines() if line]
+
+
+def iter_directory_files(path, sudo_password=None, rel_paths=None):
+    """Yield (relative path, readable stream) for the regular files of a directory, or only `rel_paths`.
+
+    With a sudo password the directory is read through `sudo tar`, its files usually belong to the
+    instance service user; the tar stream is unpacked member by member on the fly.
+    """
+    if not sudo_password:
+        if rel_paths is None:
+            rel_paths = list_directory_files(path)
+        for rel_path in rel_paths:
+            with open(os.path.join(path, rel_path), 'rb') as fileobj:
+                yield rel_path, fileobj
+        return
+    if rel_paths is None and not _sudo_test_directory(path, sudo_password):
+        return
+
+    with tempfile.NamedTemporaryFile('w', suffix='.lst') as file_list, tempfile.TemporaryFile() as stderr:
+        tar_cmd = ['sudo', '-S', 'tar', '-C', path, '-cf', '-']
+        if rel_paths is None:
+            tar_cmd.append('.')
+        else:
+            file_list.write('\n'.join(rel_paths) + '\n')
+            file_list.flush()
+            tar_cmd += ['--verbatim-files-from', '-T', file_list.name]
+        proc = subprocess.Popen(tar_cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr)
+        try:
+            proc.stdin.write(f'{sudo_password}\n'.encode())
+            proc.stdin.close()
+            with tarfile.open(fileobj=proc.stdout, mode='r|') as tar:
+                for member in tar:
+                    if not member.isfile():
+                        continue
+                    rel_path = os.path.normpath(member.name)
+                    if rel_path.startswith('..') or os.path.isabs(rel_path):
+                        continue
+                    yield rel_path, tar.extractfile(member)
+        finally:
+            proc.stdout.close()
+            returncode = proc.wait()
+        if returncode != 0:
+            stderr.seek(0)
+            raise subprocess.CalledProcessError(returncode, tar_cmd, stderr=stderr.read().decode(errors='replace'))
+
+
+def _sudo_test_directory(path, sudo_password):
+    result = subprocess.run(['sudo', '-S', 'test', '-d', path], input=f'{sudo_password}\n',
+                            text=True, capture_output=True, timeout=30)
+    return result.returncode == 0
+
+
+class BlobStore:
+    """Content addressed file store shared by the incremental backups of a backup directory.
+
+    Blobs are stored once under `<root>/<sha1[:2]>/<sha1>`, whatever the number of backups and
+    instances referencing them. Unreferenced blobs are removed by `collect_garbage`.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, digest):
+        return os.path.join(self.root, digest[:2], digest)
+
+    def claim(self, digest):
+        """Whether the blob exists; its mtime is refreshed so that a running GC keeps it"""
+        try:
+            os.utime(self.path(digest))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def add_stream(self, fileobj):
+        """Store a stream, hashing it on the way. Returns (digest, size, created)"""
+        tmp_dir = os.path.join(self.root, 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        sha1 = hashlib.sha1()
+        size = 0
+        with tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False) as tmp:
+            try:
+                while chunk := fileobj.read(CHUNK_SIZE):
+                    sha1.update(chunk)
+                    tmp.write(chunk)
+                    size += len(chunk)
+            except BaseException:
+                os.remove(tmp.name)
+                raise
+        digest = sha1.hexdigest()
+        if self.claim(digest):
+            os.remove(tmp.name)
+            return digest, size, False
+        os.makedirs(os.path.dirname(self.path(digest)), exist_ok=True)
+        os.replace(tmp.name, self.path(digest))
+        return digest, size, True
+
+    def collect_garbage(self, referenced, grace_seconds=86400):
+        """Remove the blobs missing from `referenced`.
+
+        Blobs touched during the grace period are kept: they may belong to a backup that is
+        still being written and not indexed yet. Returns (removed blobs, freed bytes).
+        """
+        removed = freed = 0
+        limit = time.time() - grace_seconds
+        for prefix in os.listdir(self.root) if os.path.isdir(self.root) else []:
+            prefix_dir = os.path.join(self.root, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for digest in os.listdir(prefix_dir):
+                blob_path = os.path.join(prefix_dir, digest)
+                if digest in referenced:
+                    continue
+                stat = os.stat(blob_path)
+                if stat.st_mtime < limit:
+                    os.remove(blob_path)
+                    removed += 1
+                    freed += stat.st_size
+        return removed, freed
+
+
+def file_checksum(path):
+    """SHA256 of a file, read chunk by chunk"""
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(CHUNK_SIZE):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def read_archive_manifest(zip_path):
+    with zipfile.ZipFile(zip_path) as zf:
+        return json.loads(zf.read('manifest.json'))
+
+
+def extract_dump_directory(zip_path, dest):
+    """Extract the directory format dump of an archive to `dest`, for pg_restore -j"""
+    os.makedirs(dest, exist_ok=True)
+    with zipfile.ZipFile(zip_path) as zf:
+        for info in zf.infolist():
+            if info.filename.startswith(f'{DUMP_DIRECTORY}/') and not info.is_dir():
+                target = os.path.join(dest, os.path.basename(info.filename))
+                with zf.open(info) as src, open(target, 'wb') as out:
+                    shutil.copyfileobj(src, out, CHUNK_SIZE)
+    return dest
+
+
+def extract_filestore(zip_path, dest, store=None):
+    """Write the filestore of an archive to `dest`, from its filestore/ entries or its blob index.
+
+    Returns the number of files written.
+    """
+    count = 0
+    with zipfile.ZipFile(zip_path) as zf:
+        if FILESTORE_INDEX in zf.namelist():
+            index = json.loads(zf.read(FILESTORE_INDEX))
+            entries = [(rel_path, lambda digest=digest: open(store.path(digest), 'rb'))
+                       for rel_path, digest in index['files'].items()]
+        else:
+            entries = [(info.filename[len('filestore/'):], lambda info=info: zf.open(info))
+                       for info in zf.infolist() if info.filename.startswith('filestore/') and not info.is_dir()]
+        for rel_path, opener in entries:
+            rel_path = os.path.normpath(rel_path)
+            if rel_path.startswith('..') or os.path.isabs(rel_path):
+                continue
+            target = os.path.join(dest, rel_path)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with opener() as src, open(target, 'wb') as out:
+                shutil.copyfileobj(src, out, CHUNK_SIZE)
+            count += 1
+    return count
+
+
+def read_filestore_index(zip_path):
+    """Filestore index of an incremental backup archive, None for a full backup"""
+    with zipfile.ZipFile(zip_path) as zf:
+        if FILESTORE_INDEX not in zf.namelist():
+            return None
+        return json.loads(zf.read(FILESTORE_INDEX))
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Unseekable write target collecting the bytes produced by zipfile until they are drained"""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_full_archive(zip_path, store):
+    """Rebuild the Odoo restorable zip of an incremental backup on the fly, as a stream of bytes.
+
+    The blobs are put back under filestore/ with their original paths; nothing is written to disk.
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(zip_path) as src:
+        index = json.loads(src.read(FILESTORE_INDEX))
+        with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED, allowZip64=True) as dest:
+            entries = [(info.filename, lambda info=info: src.open(info))
+                       for info in src.infolist() if info.filename != FILESTORE_INDEX]
+            entries += [(f'filestore/{rel_path}', lambda digest=digest: open(store.path(digest), 'rb'))
+                        for rel_path, digest in index['files'].items()]
+            for arcname, opener in entries:
+                with opener() as fileobj, dest.open(arcname, 'w', force_zip64=True) as out:
+                    while chunk := fileobj.read(CHUNK_SIZE):
+                        out.write(chunk)
+                        yield buffer.drain()
+        yield buffer.drain()
@@ -4,9 +4,15 @@ import base64
 import zipfile
 import tempfile
 import shutil
+import shlex
+import subprocess
+from contextlib import contextmanager
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
 
+from .addon_archive import AddonArchiveError, extract_members, inspect_archive
+from .addon_index import apply_changes, build_index, diff_indexes, dump_index, load_index
+
 _logger = logging.getLogger(__name__)
 
 
@@ -17,6 +23,8 @@ class CustomAddonLine(models.Model):
 
     instance_id = fields.Many2one('odoo.instance', string='Instance', required=True, ondelete='cascade')
     addon_name = fields.Char(string='Addon Name', readonly=True, help="Auto-detected from manifest file")
+    technical_name = fields.Char(string='Technical Name', readonly=True, copy=False,
+                                 help="Name of the addon directory in the instance, which is also its module name")
     
     # Upload methods
     upload_method = fields.Selection([
@@ -44,6 +52,13 @@ class CustomAddonLine(models.Model):
     addon_summary = fields.Char(string='Summary', readonly=True, help="Auto-detected from manifest")
     addon_depends = fields.Char(string='Dependencies', readonly=True, help="Auto-detected from manifest")
     last_updated = fields.Datetime(string='Last Updated', readonly=True, help="When the addon was last updated")
+    file_index = fields.Text(string='Installed Files Index', readonly=True, copy=False,
+                             help="Size, modification time and hash of each file of the installed addon")
+    source_index = fields.Text(string='Server Path Index', readonly=True, copy=False,
+                               help="Size, modification time and hash of each file in the server path")
+    version_id = fields.Many2one('custom.addon.version', string='Store Version', readonly=True, copy=False,
+                                 ondelete='set null', index=True,
+                                 help="Version of the shared addon store the instance addon directory links to")
     
     state = fields.Selection([
         ('draft', 'Draft'),
@@ -166,70 +181,81 @@ class CustomAddonLine(models.Model):
             else:
                 os.makedirs(addons_dir, exist_ok=True)
 
-        # Decode and extract
-        file_data = base64.b64decode(self.addon_file)
-        
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as temp_file:
-            temp_file.write(file_data)
-            temp_file_path = temp_file.name
+        config = self.env['saas.config'].search([], limit=1)
+        max_entries = config.addon_zip_max_entries or 10000
+        max_file_size = (config.addon_zip_max_file_mb or 50) * 1024 * 1024
+        max_total_size = (config.addon_zip_max_total_mb or 500) * 1024 * 1024
+        sudo_password = self.instance_id.root_sudo_password
 
-        try:
-            with zipfile.ZipFile(temp_file_path, 'r') as zip_ref:
-                # Check for manifest files
-                file_list = zip_ref.namelist()
-                manifest_files = [f for f in file_list if f.endswith('__manifest__.py') or f.endswith('__openerp__.py')]
-                
-                if not manifest_files:
-                    raise UserError(_("Invalid addon: No manifest file found"))
-                
-                # Extract to temporary directory first
-                temp_extract_dir = tempfile.mkdtemp()
-                zip_ref.extractall(temp_extract_dir)
-                
-                # Find the actual addon directory
-                addon_dir = self._find_addon_directory(temp_extract_dir)
-                if not addon_dir:
-                    raise UserError(_("Could not find addon directory with manifest file"))
-                
-                # Read manifest and get addon name
-                manifest_data = self._read_manifest(addon_dir)
-                addon_name = manifest_data.get('name', os.path.basename(addon_dir))
-                
-                # Final destination
-                final_addon_path = os.path.join(addons_dir, addon_name.replace(' ', '_').lower())
-                
-                # Remove existing and copy new
-                if os.path.exists(final_addon_path):
-                    try:
-                        shutil.rmtree(final_addon_path)
-                    except PermissionError:
-                        # Try with sudo if removal fails due to permissions
-                        if self.instance_id.root_sudo_password:
-                            self.instance_id.add_to_log(f"[INFO] Permission denied, using sudo to remove existing addon...")
-                            self._sudo_remove_directory(final_addon_path)
-                            _logger.info(f"[LAUNCHLY_SAAS - {self.instance_id.name}] Removed existing addon using sudo: {final_addon_path}")
-                        else:
-                            raise UserError(_("Permission denied removing existing addon and no sudo password available. Please provide sudo password in instance settings."))
-                
-                # Copy addon to final location (may need sudo for system directory)
+        # The archive index is validated before anything is written, then the members are
+        # extracted one by one into a staging directory on the filesystem of their final location
+        with self._open_addon_file() as archive, zipfile.ZipFile(archive) as zip_ref:
+            try:
+                prefix, members = inspect_archive(zip_ref, max_entries, max_file_size, max_total_size)
+            except AddonArchiveError as e:
+                raise UserError(str(e))
+            technical_name = self._get_technical_name(
+                prefix.rstrip('/') or os.path.splitext(os.path.basename(self.addon_filename or ''))[0])
+
+            if sudo_password:
+                staging_dir = self.env['custom.addon.version']._new_staging_dir(technical_name, sudo_password)
+            else:
                 try:
-                    shutil.copytree(addon_dir, final_addon_path)
+                    staging_dir = tempfile.mkdtemp(dir=addons_dir, prefix=f'.{technical_name}.')
                 except PermissionError:
-                    # Use sudo if permission denied
-                    if self.instance_id.root_sudo_password:
-                        self.instance_id.add_to_log(f"[INFO] Permission denied, using sudo to copy addon...")
-                        self._sudo_copy_directory(addon_dir, final_addon_path)
-                    else:
-                        raise UserError(_("Permission denied copying addon and no sudo password available. Please provide sudo password in instance settings."))
-                
-                # Update record
-                self._update_from_manifest(manifest_data, final_addon_path)
-                
-                # Clean up
-                shutil.rmtree(temp_extract_dir)
-                
-        finally:
-            os.unlink(temp_file_path)
+                    raise UserError(_("Permission denied copying addon and no sudo password available. Please provide sudo password in instance settings."))
+            try:
+                extract_members(zip_ref, members, prefix, staging_dir, max_file_size)
+            except AddonArchiveError as e:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                raise UserError(str(e))
+            except BaseException:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                raise
+
+        manifest_data = self._read_manifest(staging_dir)
+        if sudo_password:
+            self._install_from_store(staging_dir, manifest_data, technical_name, move=True)
+            return
+
+        # Swap the staging directory in with a rename, the previous copy is removed afterwards
+        final_addon_path = os.path.join(addons_dir, technical_name)
+        previous_path = None
+        os.chmod(staging_dir, 0o755)
+        try:
+            if os.path.lexists(final_addon_path):
+                previous_path = f"{staging_dir}.previous"
+                os.rename(final_addon_path, previous_path)
+            os.rename(staging_dir, final_addon_path)
+        except PermissionError:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise UserError(_("Permission denied copying addon and no sudo password available. Please provide sudo password in instance settings."))
+        if previous_path:
+            shutil.rmtree(previous_path, ignore_errors=True)
+
+        # Update record
+        self._update_from_manifest(manifest_data, final_addon_path)
+
+    @contextmanager
+    def _open_addon_file(self):
+        """Open the uploaded ZIP file without loading it in memory.
+
+        The upload is an attachment: its filestore file is read directly, only an upload stored in
+        the database is written to a temporary file first.
+        """
+        attachment = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_field', '=', 'addon_file'),
+            ('res_id', '=', self.id),
+        ], limit=1)
+        if attachment.store_fname:
+            with open(attachment._full_path(attachment.store_fname), 'rb') as archive:
+                yield archive
+            return
+        with tempfile.TemporaryFile(suffix='.zip') as archive:
+            archive.write(attachment.raw if attachment else base64.b64decode(self.addon_file))
+            archive.seek(0)
+            yield archive
 
     def _process_folder_files(self):
         """Process uploaded folder files"""
@@ -261,8 +287,13 @@ class CustomAddonLine(models.Model):
             
             # Read manifest
             manifest_data = self._read_manifest(addon_dir)
-            addon_name = manifest_data.get('name', 'custom_addon')
+            technical_name = self._get_technical_name(
+                os.path.basename(addon_dir) if addon_dir != temp_dir else 'custom_addon')
             
+            if self.instance_id.root_sudo_password:
+                self._install_from_store(addon_dir, manifest_data, technical_name)
+                return
+
             # Copy to final location
             addons_dir = self._get_custom_addons_directory()
             if not os.path.exists(addons_dir):
@@ -276,7 +307,7 @@ class CustomAddonLine(models.Model):
                 else:
                     os.makedirs(addons_dir, exist_ok=True)
                 
-            final_addon_path = os.path.join(addons_dir, addon_name.replace(' ', '_').lower())
+            final_addon_path = os.path.join(addons_dir, technical_name)
             
             if os.path.exists(final_addon_path):
                 try:
@@ -330,7 +361,11 @@ class CustomAddonLine(models.Model):
 
         # Read manifest
         manifest_data = self._read_manifest(self.server_path)
-        addon_name = manifest_data.get('name', os.path.basename(self.server_path))
+        technical_name = self._get_technical_name(os.path.basename(os.path.normpath(self.server_path)))
+
+        if self.instance_id.root_sudo_password:
+            self._install_from_store(self.server_path, manifest_data, technical_name)
+            return
 
         # Copy to instance addons directory
         addons_dir = self._get_custom_addons_directory()
@@ -345,7 +380,7 @@ class CustomAddonLine(models.Model):
             else:
                 os.makedirs(addons_dir, exist_ok=True)
 
-        final_addon_path = os.path.join(addons_dir, addon_name.replace(' ', '_').lower())
+        final_addon_path = os.path.join(addons_dir, technical_name)
 
         if os.path.exists(final_addon_path):
             try:
@@ -371,8 +406,58 @@ class CustomAddonLine(models.Model):
                 raise UserError(_("Permission denied copying addon and no sudo password available. Please provide sudo password in instance settings."))
 
         # Update record
+        self.source_index = self._build_file_index(self.server_path)
+        self._update_from_manifest(manifest_data, final_addon_path)
+
+    def _get_technical_name(self, source_name):
+        """Name of the addon directory in the instance, the same rule for every upload method.
+
+        A line keeps the name it was first installed under, Odoo would lose an installed module
+        whose directory is renamed. A new line takes the name of the uploaded addon directory.
+        """
+        if self.technical_name:
+            return self.technical_name
+        technical_name = (source_name or '').strip().replace(' ', '_').lower()
+        if not technical_name:
+            raise UserError(_("Could not find addon directory with manifest file"))
+        return technical_name
+
+    def _install_from_store(self, addon_dir, manifest_data, technical_name, move=False):
+        """Add the addon to the shared addon store and link the instance addon directory to it"""
+        from_server_path = addon_dir == self.server_path
+        index = build_index(addon_dir, load_index(self.source_index) if from_server_path else None)
+        if from_server_path:
+            self.source_index = dump_index(index)
+        version = self.env['custom.addon.version']._get_or_create(
+            technical_name, manifest_data.get('version', ''), addon_dir, index, self.instance_id.root_sudo_password,
+            move=move)
+        if version != self.version_id:
+            self.instance_id.add_to_log(f"[INFO] Linking addon '{technical_name}' to store version {version.store_path}")
+        final_addon_path = self._link_version(version)
         self._update_from_manifest(manifest_data, final_addon_path)
 
+    def _link_version(self, version):
+        """Point the instance addon directory to a store version, replacing the link in one rename"""
+        addons_dir = self._get_custom_addons_directory()
+        final_addon_path = os.path.join(addons_dir, version.name)
+        link_tmp = f"{final_addon_path}.launchly_link"
+        owner = f"{self.instance_id.name}:{self.instance_id.name}"
+        script = (f"mkdir -p {shlex.quote(addons_dir)} && chown {owner} {shlex.quote(addons_dir)} && "
+                  # A full copy made before the store existed is replaced by the link
+                  f"if [ -d {shlex.quote(final_addon_path)} ] && [ ! -L {shlex.quote(final_addon_path)} ]; "
+                  f"then rm -rf {shlex.quote(final_addon_path)}; fi && "
+                  f"ln -sfn {shlex.quote(version.store_path)} {shlex.quote(link_tmp)} && "
+                  f"mv -Tf {shlex.quote(link_tmp)} {shlex.quote(final_addon_path)}")
+        self.instance_id.excute_command_with_sudo(f"bash -c {shlex.quote(script)}")
+        self.write({
+            'version_id': version.id,
+            'addon_path': final_addon_path,
+            'addon_version': version.addon_version,
+            'file_index': version.file_index,
+            'last_updated': fields.Datetime.now(),
+        })
+        return final_addon_path
+
     def _find_addon_directory(self, base_dir):
         """Find directory containing manifest file"""
         manifest_files = ['__manifest__.py', '__openerp__.py']
@@ -425,6 +510,7 @@ class CustomAddonLine(models.Model):
         
         update_vals = {
             'addon_path': addon_path,
+            'technical_name': addon_technical_name,
             'is_extracted': True,
             'state': 'ready',
             'error_message': False,
@@ -434,7 +520,8 @@ class CustomAddonLine(models.Model):
             'addon_description': manifest_data.get('description', ''),
             'addon_summary': manifest_data.get('summary', ''),
             'addon_depends': ', '.join(manifest_data.get('depends', [])) if manifest_data.get('depends') else '',
-            'last_updated': fields.Datetime.now()
+            'last_updated': fields.Datetime.now(),
+            'file_index': self._build_file_index(addon_path, self.file_index if addon_path == self.addon_path else False),
         }
         
         self.write(update_vals)
@@ -459,7 +546,10 @@ class CustomAddonLine(models.Model):
         """Remove addon files and record using sudo if needed"""
         for record in self:
             try:
-                if record.addon_path and os.path.exists(record.addon_path):
+                if record.addon_path and os.path.islink(record.addon_path):
+                    # Shared store version: only the link of the instance goes away
+                    record.instance_id.excute_command_with_sudo(f"rm -f {shlex.quote(record.addon_path)}")
+                elif record.addon_path and os.path.exists(record.addon_path):
                     # Try normal removal first
                     try:
                         shutil.rmtree(record.addon_path)
@@ -570,6 +660,7 @@ class CustomAddonLine(models.Model):
 
             try:
                 record.instance_id.install_custom_addon_in_odoo([record.addon_name])
+                record.instance_id._invalidate_installed_modules()
                 record.instance_id.add_to_log(f"[SUCCESS] Addon '{record.addon_name}' installed successfully!")
                 record.write({'state': 'installed'})
             except Exception as e:
@@ -595,6 +686,7 @@ class CustomAddonLine(models.Model):
 
                 # Call the uninstall method
                 record.instance_id.uninstall_addon_in_odoo([record.addon_name])
+                record.instance_id._invalidate_installed_modules()
 
                 # Log success and update state
                 record.instance_id.add_to_log(f"[SUCCESS] Addon '{record.addon_name}' uninstalled successfully!")
@@ -695,6 +787,19 @@ class CustomAddonLine(models.Model):
 
         # Read source manifest
         source_manifest_data = self._read_manifest(self.server_path)
+        technical_name = self._get_technical_name(os.path.basename(os.path.normpath(self.server_path)))
+
+        if self.instance_id.root_sudo_password:
+            self._install_from_store(self.server_path, source_manifest_data, technical_name)
+            _logger.info(f"[LAUNCHLY_SAAS - {self.instance_id.name}] Successfully updated addon from server path: {self.server_path}")
+            return
+
+        # Same addon already installed and indexed: only copy what changed
+        final_addon_path = os.path.join(self._get_custom_addons_directory(), technical_name)
+        if self.file_index and self.addon_path == final_addon_path and os.path.isdir(self.addon_path):
+            self._sync_changed_files(source_manifest_data)
+            _logger.info(f"[LAUNCHLY_SAAS - {self.instance_id.name}] Successfully updated addon from server path: {self.server_path}")
+            return
         
         # Create backup of current addon
         backup_path = None
@@ -726,9 +831,8 @@ class CustomAddonLine(models.Model):
                         raise UserError(_("Permission denied removing addon directory and no sudo password available. Please provide sudo password in instance settings."))
 
             # Copy updated addon from server path
-            addon_name = source_manifest_data.get('name', os.path.basename(self.server_path))
             addons_dir = self._get_custom_addons_directory()
-            final_addon_path = os.path.join(addons_dir, addon_name.replace(' ', '_').lower())
+            final_addon_path = os.path.join(addons_dir, technical_name)
             
             # Ensure addons directory exists
             if not os.path.exists(addons_dir):
@@ -927,6 +1031,29 @@ class CustomAddonLine(models.Model):
                 record.instance_id.add_to_log(f"[ERROR] {error_msg}")
                 raise UserError(_(error_msg))
 
+    def _build_file_index(self, path, previous=False):
+        """Serialized index of a directory, False if it cannot be read"""
+        try:
+            return dump_index(build_index(path, load_index(previous)))
+        except OSError as e:
+            _logger.warning(f"[LAUNCHLY_SAAS - {self.instance_id.name}] Cannot index addon files in {path}: {str(e)}")
+            return False
+
+    def _get_index_changes(self):
+        """Refresh the indexes of the installed addon and of the server path, rehashing only the files
+        whose size or modification time changed, and return (added, modified, removed) paths"""
+        self.ensure_one()
+        installed = build_index(self.addon_path, load_index(self.file_index))
+        source = build_index(self.server_path, load_index(self.source_index))
+        vals = {}
+        if dump_index(installed) != (self.file_index or '{}'):
+            vals['file_index'] = dump_index(installed)
+        if dump_index(source) != (self.source_index or '{}'):
+            vals['source_index'] = dump_index(source)
+        if vals:
+            self.write(vals)
+        return diff_indexes(installed, source)
+
     def _compare_with_server_path(self):
         """Compare current addon with server path and return list of differences"""
         if not self.server_path or not self.addon_path:
@@ -935,158 +1062,80 @@ class CustomAddonLine(models.Model):
         differences = []
         
         try:
-            import filecmp
-            
-            # Compare directories
-            dcmp = filecmp.dircmp(self.addon_path, self.server_path)
-            
-            # Files only in server path (new files)
-            for file in dcmp.right_only:
-                differences.append(f"New file: {file}")
-            
-            # Files only in current addon (deleted files)
-            for file in dcmp.left_only:
-                differences.append(f"Deleted file: {file}")
-            
-            # Different files
-            for file in dcmp.diff_files:
-                differences.append(f"Modified file: {file}")
-            
-            # Recursively check subdirectories
-            for subdir in dcmp.common_dirs:
-                subdiff = self._compare_subdirectories(
-                    os.path.join(self.addon_path, subdir),
-                    os.path.join(self.server_path, subdir),
-                    subdir
-                )
-                differences.extend(subdiff)
-                
+            added, modified, removed = self._get_index_changes()
+            differences += [f"New file: {path}" for path in added]
+            differences += [f"Deleted file: {path}" for path in removed]
+            differences += [f"Modified file: {path}" for path in modified]
         except Exception as e:
             _logger.warning(f"[LAUNCHLY_SAAS - {self.instance_id.name}] Error comparing directories: {str(e)}")
             differences.append(f"Comparison error: {str(e)}")
         
         return differences
 
-    def _compare_subdirectories(self, current_dir, server_dir, relative_path):
-        """Recursively compare subdirectories"""
-        differences = []
-        
+    def _sudo_apply_changes(self, added, modified, removed):
+        """Copy the changed files and delete the removed ones with a single sudo script"""
+        owner = f"{self.instance_id.name}:{self.instance_id.name}"
+        lines = ["set -e"]
+        for rel_path in added + modified:
+            source = shlex.quote(os.path.join(self.server_path, rel_path))
+            dest = shlex.quote(os.path.join(self.addon_path, rel_path))
+            lines.append(f"mkdir -p \"$(dirname {dest})\" && cp -p {source} {dest}.launchly_tmp "
+                         f"&& chown {owner} {dest}.launchly_tmp && mv -f {dest}.launchly_tmp {dest}")
+        for rel_path in removed:
+            lines.append(f"rm -f {shlex.quote(os.path.join(self.addon_path, rel_path))}")
+        lines.append(f"find {shlex.quote(self.addon_path)} -mindepth 1 -type d -empty -delete")
+        # The script can be long, it is passed as a file rather than as an argument
+        with tempfile.NamedTemporaryFile('w', suffix='.sh', delete=False) as script:
+            script.write("\n".join(lines) + "\n")
         try:
-            import filecmp
-            
-            dcmp = filecmp.dircmp(current_dir, server_dir)
-            
-            for file in dcmp.right_only:
-                differences.append(f"New file: {relative_path}/{file}")
-            
-            for file in dcmp.left_only:
-                differences.append(f"Deleted file: {relative_path}/{file}")
-            
-            for file in dcmp.diff_files:
-                differences.append(f"Modified file: {relative_path}/{file}")
-            
-            for subdir in dcmp.common_dirs:
-                subdiff = self._compare_subdirectories(
-                    os.path.join(current_dir, subdir),
-                    os.path.join(server_dir, subdir),
-                    f"{relative_path}/{subdir}"
-                )
-                differences.extend(subdiff)
-                
-        except Exception as e:
-            differences.append(f"Subdirectory comparison error in {relative_path}: {str(e)}")
-        
-        return differences
+            result = subprocess.run(['sudo', '-S', 'bash', script.name], input=self.instance_id.root_sudo_password + '\n',
+                                    text=True, capture_output=True, timeout=300)
+        finally:
+            os.unlink(script.name)
+        if result.returncode != 0:
+            raise Exception(f"Failed to update addon files with sudo: {result.stderr}")
+
+    def _sync_changed_files(self, manifest_data):
+        """Bring the installed addon in line with the server path by copying only the changed files"""
+        added, modified, removed = self._get_index_changes()
+        if added or modified or removed:
+            self.instance_id.add_to_log(f"[INFO] Updating addon '{self.addon_name}': {len(added)} new, "
+                                        f"{len(modified)} modified and {len(removed)} deleted files")
+            try:
+                apply_changes(self.server_path, self.addon_path, added, modified, removed)
+            except PermissionError:
+                if not self.instance_id.root_sudo_password:
+                    raise UserError(_("Permission denied updating addon files and no sudo password available. Please provide sudo password in instance settings."))
+                self.instance_id.add_to_log(f"[INFO] Permission denied, using sudo to update addon files...")
+                self._sudo_apply_changes(added, modified, removed)
+        self._update_from_manifest(manifest_data, self.addon_path)
 
     @api.depends('addon_name', 'instance_id.state')
     def _compute_is_installed(self):
-        """Check if addon is installed in the running Odoo instance"""
+        """Check if addon is installed in the running Odoo instance, from its module table"""
+        installed_modules = self.instance_id._get_installed_modules()
+        to_installed = self.browse()
+        to_ready = self.browse()
         for record in self:
-            record.is_installed = False
-            
-            if not record.addon_name or record.instance_id.state != 'running':
-                continue
-                
-            try:
-                # Get addon technical name (folder name)
-                addon_technical_name = os.path.basename(record.addon_path) if record.addon_path else record.addon_name.replace(' ', '_').lower()
-                
-                # Check installation status via API
-                is_installed = record._check_addon_installation_status(addon_technical_name)
-                record.is_installed = is_installed
-                
-                # Update state based on installation status
-                if is_installed and record.state == 'ready':
-                    record.write({'state': 'installed'})
-                elif not is_installed and record.state == 'installed':
-                    record.write({'state': 'ready'})
-                    
-            except Exception as e:
-                _logger.warning(f"[LAUNCHLY_SAAS - {record.instance_id.name}] Could not check installation status for {record.addon_name}: {str(e)}")
+            modules = installed_modules.get(record.instance_id.id)
+            if not record.addon_name or modules is None:
+                # Unknown status (instance stopped or unreachable), the state is kept
                 record.is_installed = False
+                continue
 
-    def _check_addon_installation_status(self, addon_technical_name):
-        """Check if addon is installed via API call"""
-        try:
-            import requests
-            
-            # Get instance details
-            url = self.instance_id.instance_url
-            db_name = self.instance_id.database_name
-            username = self.instance_id.user_email
-            password = self.instance_id.user_phone if self.instance_id.user_phone else self.instance_id.user_password
-            
-            # Login to get session
-            login_url = f"{url}/web/session/authenticate"
-            login_data = {
-                'jsonrpc': '2.0',
-                'method': 'call',
-                'params': {
-                    'db': db_name,
-                    'login': username,
-                    'password': password
-                },
-                'id': 1
-            }
-            
-            session = requests.Session()
-            login_response = session.post(login_url, json=login_data, timeout=15)
-            
-            if login_response.status_code != 200:
-                return False
-            
-            login_result = login_response.json()
-            if not login_result.get('result') or login_result['result'].get('uid') is None:
-                return False
-            
-            # Search for the addon module and check its state
-            api_url = f"{url}/web/dataset/call_kw"
-            search_data = {
-                'jsonrpc': '2.0',
-                'method': 'call',
-                'params': {
-                    'model': 'ir.module.module',
-                    'method': 'search_read',
-                    'args': [[['name', '=', addon_technical_name]], ['state']],
-                    'kwargs': {}
-                },
-                'id': 2
-            }
-            
-            search_response = session.post(api_url, json=search_data, timeout=15)
-            if search_response.status_code == 200:
-                search_result = search_response.json()
-                modules = search_result.get('result', [])
-                
-                if modules:
-                    module_state = modules[0].get('state', 'uninstalled')
-                    return module_state == 'installed'
-            
-            return False
-            
-        except Exception as e:
-            _logger.debug(f"[LAUNCHLY_SAAS - {self.instance_id.name}] Error checking installation status: {str(e)}")
-            return False
+            # Get addon technical name (folder name)
+            addon_technical_name = record.technical_name or record.addon_name.replace(' ', '_').lower()
+            record.is_installed = addon_technical_name in modules
+
+            # Update state based on installation status
+            if record.is_installed and record.state == 'ready':
+                to_installed |= record
+            elif not record.is_installed and record.state == 'installed':
+                to_ready |= record
+        if to_installed:
+            to_installed.write({'state': 'installed'})
+        if to_ready:
+            to_ready.write({'state': 'ready'})
 
 
 class CustomAddonFile(models.Model):
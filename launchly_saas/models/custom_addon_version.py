@@ -0,0 +1,150 @@
+import os
+import shlex
+import shutil
+import subprocess
+import tempfile
+import logging
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+from .addon_index import build_tree, content_hash, dump_index, load_index, make_shared
+
+_logger = logging.getLogger(__name__)
+
+
+class CustomAddonVersion(models.Model):
+    _name = 'custom.addon.version'
+    _description = 'Custom Addon Version'
+    _order = 'name, id desc'
+
+    name = fields.Char(string='Technical Name', required=True, readonly=True, index=True)
+    addon_version = fields.Char(string='Version', readonly=True, help="Version from the manifest")
+    content_hash = fields.Char(string='Content Hash', required=True, readonly=True)
+    store_path = fields.Char(string='Store Path', required=True, readonly=True)
+    file_index = fields.Text(string='Files Index', readonly=True)
+    line_ids = fields.One2many('custom.addon.line', 'version_id', string='Instances Using It', readonly=True)
+    line_count = fields.Integer(string='Instances', compute='_compute_line_count')
+
+    _sql_constraints = [
+        ('name_content_uniq', 'unique (name, content_hash)', 'This addon version is already in the store !'),
+    ]
+
+    @api.depends('line_ids')
+    def _compute_line_count(self):
+        for version in self:
+            version.line_count = len(version.line_ids)
+
+    @api.model
+    def _get_store_root(self):
+        config = self.env['saas.config'].search([], limit=1)
+        return config.addon_store_path or '/opt/launchly_addons'
+
+    @api.model
+    def _ensure_store_root(self, sudo_password):
+        """Create the store directory, owned by the manager so versions are added without sudo"""
+        root = self._get_store_root()
+        if os.path.isdir(root) and os.access(root, os.W_OK):
+            return root
+        if not sudo_password:
+            raise UserError(_("The addon store %s is not writable and no sudo password is available.") % root)
+        script = (f"mkdir -p {shlex.quote(root)} && chown {os.getuid()}:{os.getgid()} {shlex.quote(root)} "
+                  f"&& chmod 755 {shlex.quote(root)}")
+        result = subprocess.run(['sudo', '-S', 'bash', '-c', script], input=f"{sudo_password}\n", text=True,
+                                capture_output=True, timeout=60)
+        if result.returncode != 0:
+            raise UserError(_("Could not create the addon store %s: %s") % (root, result.stderr.strip()))
+        return root
+
+    @api.model
+    def _new_staging_dir(self, name, sudo_password):
+        """Empty directory on the store filesystem, so an upload extracted in it is stored by a rename"""
+        directory = os.path.join(self._ensure_store_root(sudo_password), name)
+        os.makedirs(directory, exist_ok=True)
+        return tempfile.mkdtemp(dir=directory, prefix='.upload-')
+
+    @api.model
+    def _get_or_create(self, name, addon_version, source_dir, index, sudo_password, move=False):
+        """Version of an addon with the content of `source_dir`, added to the store if it is new.
+
+        Versions are content addressed: uploading the same files for many instances stores them
+        once. A new version hard links the files it shares with the latest stored version.
+        With `move`, `source_dir` is a staging directory from `_new_staging_dir`: it is renamed
+        into the store when the version is new and removed otherwise.
+        """
+        digest = content_hash(index)
+        version = self.search([('name', '=', name), ('content_hash', '=', digest)], limit=1)
+        if version and os.path.isdir(version.store_path):
+            if move:
+                shutil.rmtree(source_dir, ignore_errors=True)
+            return version
+
+        root = self._ensure_store_root(sudo_password)
+        store_path = os.path.join(root, name, digest[:16])
+        if move and os.path.isdir(store_path):
+            shutil.rmtree(source_dir, ignore_errors=True)
+        elif move:
+            make_shared(source_dir)
+            os.rename(source_dir, store_path)
+            _logger.info(f"[LAUNCHLY_SAAS] Stored addon {name} version {addon_version or ''} in {store_path}")
+        elif not os.path.isdir(store_path):
+            base = self.search([('name', '=', name), ('id', '!=', version.id)], limit=1)
+            base_ok = base and os.path.isdir(base.store_path)
+            staging = f"{store_path}.tmp-{os.getpid()}"
+            os.makedirs(os.path.dirname(store_path), exist_ok=True)
+            shutil.rmtree(staging, ignore_errors=True)
+            try:
+                build_tree(source_dir, staging, index,
+                           base.store_path if base_ok else None, load_index(base.file_index) if base_ok else None)
+                os.rename(staging, store_path)
+            except Exception:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+            _logger.info(f"[LAUNCHLY_SAAS] Stored addon {name} version {addon_version or ''} in {store_path}")
+
+        vals = {'addon_version': addon_version, 'store_path': store_path, 'file_index': dump_index(index)}
+        if version:
+            version.write(vals)
+            return version
+        return self.create(dict(vals, name=name, content_hash=digest))
+
+    def action_roll_out(self):
+        """Point every instance using another version of this addon to this one, then upgrade the
+        module on the running instances with a fleet operation"""
+        self.ensure_one()
+        lines = self.env['custom.addon.line'].search([
+            ('version_id.name', '=', self.name),
+            ('version_id', '!=', self.id),
+        ])
+        if not lines:
+            raise UserError(_("Every instance already uses this version."))
+        for line in lines:
+            line._link_version(self)
+        running = lines.instance_id.filtered(lambda i: i.state == 'running')
+        if not running:
+            return True
+        operation = self.env['odoo.fleet.operation'].create({
+            'action': 'upgrade_addons',
+            'addon_names': self.name,
+            'instance_ids': [(6, 0, running.ids)],
+        })
+        operation.action_run()
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': 'odoo.fleet.operation',
+            'res_id': operation.id,
+            'view_mode': 'form',
+            'target': 'current',
+        }
+
+    @api.model
+    def _cron_remove_unused_versions(self):
+        """Remove the stored versions no instance points to anymore, except the latest of each addon"""
+        latest = {}
+        for version in self.search([]):
+            latest.setdefault(version.name, version)
+        unused = self.search([('line_ids', '=', False)]).filtered(lambda v: latest[v.name] != v)
+        for version in unused:
+            shutil.rmtree(version.store_path, ignore_errors=True)
+            _logger.info(f"[LAUNCHLY_SAAS] Removed unused addon version {version.store_path}")
+        unused.unlink()
@@ -22,6 +22,11 @@ class OdooDbUser(models.Model):
     ], string='Password Status', default='draft', help="Status of password change operation")
     instance_state = fields.Selection( related='instance_id.state', string='Instance State', readonly=True,
                                        help="State of the instance this user belongs to")
+
+    _sql_constraints = [
+        ('instance_login_uniq', 'unique (instance_id, login)', 'A login can only be listed once per instance !'),
+    ]
+
     @api.onchange('new_password')
     def _onchange_new_password(self):
         """Ensure new password is not empty"""
@@ -31,36 +31,16 @@ class OdooInstance(models.Model):
 
             instance = self.sudo().with_context(skip_template_apply=True).create(instance_vals)
 
-            if not instance.http_port:
-                instance.http_port = instance._get_available_port()
-            if not instance.longpolling_port:
-                instance.longpolling_port = instance._get_available_port(int(instance.http_port) + 1)
-
             template = plan.template_id
             if template:
                 instance.write({'template_id': template.id})
-                instance.onchange_template_id()
-
-                odoo_var = instance.variable_ids.filtered(lambda r: r.name == '{{ODOO-VERSION}}')
-                plan_odoo_var = template.variable_ids.filtered(lambda r: r.name == '{{ODOO-VERSION}}')
-                if odoo_var and plan_odoo_var and plan_odoo_var.demo_value:
-                    odoo_var.demo_value = plan_odoo_var.demo_value
-
-                pg_var = instance.variable_ids.filtered(lambda r: r.name == '{{POSTGRES-VERSION}}')
-                plan_pg_var = template.variable_ids.filtered(lambda r: r.name == '{{POSTGRES-VERSION}}')
-                if pg_var and plan_pg_var and plan_pg_var.demo_value:
-                    pg_var.demo_value = plan_pg_var.demo_value
 
             instance._compute_instance_url()
             instance._compute_config_id()
             instance.invalidate_recordset()
 
-            try:
-                instance.create_odoo_environment()
-                instance.restart_instance()
-            except Exception as e:
-                _logger.warning('odoo setup failed for demo instance %s: %s', instance.id, str(e))
-                instance.write({'state': 'created'})
+            # The installation runs in the provisioning worker pool, not in this request
+            self.env['launchly.provision.job']._enqueue(instance, job_type='demo')
 
             # Optional: create CRM lead if crm module is installed
             if 'crm.lead' in self.env:
@@ -84,6 +64,7 @@ class OdooInstance(models.Model):
                 self._send_demo_welcome_email(instance_by_email, partner)
 
             _logger.info("Demo instance created with ID %s and partner %s", instance.id, partner.name)
+            return instance
 
         except Exception as e:
             _logger.error("Failed to create demo instance after delay: %s", str(e))
@@ -0,0 +1,271 @@
+import logging
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+
+from .odoo_instance import run_systemctl
+
+_logger = logging.getLogger(__name__)
+
+
+def _run_instance_action(task):
+    """Run the system part of a fleet action for one instance.
+
+    Runs in a worker thread: it only gets plain values (no records, no cursor) and
+    returns a plain result dict that is applied to the records by the calling thread.
+    """
+    started = time.monotonic()
+    result = {'instance_id': task['instance_id'], 'ok': False, 'timeout': False, 'message': '', 'output': None}
+    try:
+        if task['action'] == 'upgrade_addons':
+            response = requests.post(task['bridge_url'], json={
+                'jsonrpc': '2.0',
+                'method': 'call',
+                'params': {
+                    'token': task['bridge_token'],
+                    'commands': [{'op': 'upgrade_modules', 'names': task['addon_names']}],
+                },
+                'id': 1,
+            }, timeout=task['timeout'])
+            payload = response.json().get('result') or {}
+            if 'output' not in payload:
+                # Handled by the calling thread with the management script fallback
+                result['message'] = payload.get('error') or f"HTTP {response.status_code}"
+            else:
+                result['output'] = payload['output']
+                errors = [line for line in payload['output'] if line.startswith('ERROR|')]
+                result['ok'] = not errors
+                result['message'] = '\n'.join(errors) or f"Upgraded {', '.join(task['addon_names'])}"
+        else:
+            run_systemctl(task['action'], task['service'], task['sudo_password'], timeout=task['timeout'])
+            result['ok'] = True
+            result['message'] = f"systemctl {task['action']} succeeded"
+    except subprocess.TimeoutExpired:
+        result['timeout'] = True
+        result['message'] = f"Timed out after {task['timeout']}s"
+    except subprocess.CalledProcessError as e:
+        result['message'] = (e.stderr or str(e)).strip()
+    except Exception as e:
+        result['message'] = str(e)
+    result['duration'] = round(time.monotonic() - started, 2)
+    return result
+
+
+class FleetOperation(models.Model):
+    _name = 'odoo.fleet.operation'
+    _description = 'Fleet Operation'
+    _order = 'id desc'
+
+    name = fields.Char(string='Reference', required=True, readonly=True, default='New', copy=False)
+    action = fields.Selection([
+        ('start', 'Start'),
+        ('stop', 'Stop'),
+        ('restart', 'Restart'),
+        ('upgrade_addons', 'Upgrade Addons'),
+    ], string='Action', required=True, default='restart')
+    addon_names = fields.Char(string='Addons to Upgrade', help='Comma separated technical names')
+    instance_ids = fields.Many2many('odoo.instance', string='Instances')
+    concurrency = fields.Integer(string='Concurrency', default=lambda self: self._default_concurrency(),
+                                 help='Instances processed at the same time')
+    batch_size = fields.Integer(string='Batch Size', default=20,
+                                help='Instances per rolling batch, the error rate is checked after each batch')
+    timeout = fields.Integer(string='Timeout per Instance (s)', default=300)
+    max_error_rate = fields.Float(string='Max Error Rate (%)', default=20.0,
+                                  help='Remaining instances are skipped once the failure rate exceeds this value, 100 never skips')
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('aborted', 'Aborted'),
+    ], string='State', default='draft', required=True, readonly=True, copy=False)
+    date_start = fields.Datetime(string='Started', readonly=True, copy=False)
+    date_end = fields.Datetime(string='Finished', readonly=True, copy=False)
+    line_ids = fields.One2many('odoo.fleet.operation.line', 'operation_id', string='Results', readonly=True)
+    success_count = fields.Integer(string='Succeeded', compute='_compute_counts')
+    failed_count = fields.Integer(string='Failed', compute='_compute_counts')
+    skipped_count = fields.Integer(string='Skipped', compute='_compute_counts')
+    note = fields.Text(string='Note', readonly=True, copy=False)
+
+    @api.model
+    def _default_concurrency(self):
+        config = self.env['saas.config'].search([], limit=1)
+        return config.fleet_concurrency or 4
+
+    @api.depends('line_ids.state')
+    def _compute_counts(self):
+        for operation in self:
+            states = operation.line_ids.mapped('state')
+            operation.success_count = states.count('done')
+            operation.failed_count = states.count('failed') + states.count('timeout')
+            operation.skipped_count = states.count('skipped')
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            if vals.get('name', 'New') == 'New':
+                vals['name'] = self.env['ir.sequence'].next_by_code('odoo.fleet.operation') or 'New'
+        return super().create(vals_list)
+
+    @api.model
+    def _run_for(self, instances, action, **vals):
+        """Run an action over the instances right away and return the operation"""
+        operation = self.create(dict(vals, action=action, instance_ids=[(6, 0, instances.ids)]))
+        operation._execute()
+        return operation
+
+    def action_run(self):
+        """Queue the operation, the cron worker runs it in the background"""
+        for operation in self:
+            if operation.state != 'draft':
+                continue
+            if not operation.instance_ids:
+                raise UserError("Select at least one instance")
+            if operation.action == 'upgrade_addons' and not operation._get_addon_names():
+                raise UserError("Set the addons to upgrade")
+            operation.state = 'queued'
+        self.env.ref('launchly_saas.ir_cron_process_fleet_operations')._trigger()
+
+    @api.model
+    def _cron_process_operations(self):
+        for operation in self.search([('state', '=', 'queued')], order='id'):
+            operation._execute(commit=True)
+
+    def _get_addon_names(self):
+        self.ensure_one()
+        return [name.strip() for name in (self.addon_names or '').split(',') if name.strip()]
+
+    def _prepare_task(self, instance):
+        task = {
+            'instance_id': instance.id,
+            'action': self.action,
+            'service': instance.name,
+            'sudo_password': instance.root_sudo_password or '',
+            'timeout': max(self.timeout, 1),
+        }
+        if self.action == 'upgrade_addons':
+            task.update({
+                'bridge_url': f"http://127.0.0.1:{instance.http_port}/saas/bridge/execute?db={instance.database_name}",
+                'bridge_token': instance.bridge_token or '',
+                'addon_names': self._get_addon_names(),
+            })
+        return task
+
+    def _execute(self, commit=False):
+        """Run the action over the instances in rolling batches with a bounded thread pool.
+
+        Worker threads only run the system commands; records are read before and updated after
+        each batch by this thread, so a failing instance never aborts the others.
+        """
+        self.ensure_one()
+        self.write({'state': 'running', 'date_start': fields.Datetime.now()})
+        lines = self.env['odoo.fleet.operation.line'].create([
+            {'operation_id': self.id, 'instance_id': instance.id} for instance in self.instance_ids
+        ])
+        if commit:
+            self.env.cr.commit()
+
+        batch_size = max(self.batch_size, 1)
+        processed = failed = 0
+        for start in range(0, len(lines), batch_size):
+            batch = lines[start:start + batch_size]
+            tasks = [self._prepare_task(line.instance_id) for line in batch]
+            batch.write({'state': 'running'})
+            with ThreadPoolExecutor(max_workers=max(min(self.concurrency, len(tasks)), 1),
+                                    thread_name_prefix='launchly_fleet') as executor:
+                results = list(executor.map(_run_instance_action, tasks))
+
+            for line, result in zip(batch, results):
+                line._apply_result(result)
+            processed += len(batch)
+            failed += len(batch.filtered(lambda l: l.state in ('failed', 'timeout')))
+            if commit:
+                self.env.cr.commit()
+
+            error_rate = failed * 100.0 / processed
+            # Strictly above the threshold: a 100% threshold never aborts
+            if failed and error_rate > self.max_error_rate and processed < len(lines):
+                lines[processed:].write({'state': 'skipped', 'message': 'Skipped: error rate threshold exceeded'})
+                self.write({
+                    'state': 'aborted',
+                    'date_end': fields.Datetime.now(),
+                    'note': f"Aborted after {processed} instances: error rate {error_rate:.1f}% "
+                            f"exceeded the {self.max_error_rate:.1f}% threshold",
+                })
+                _logger.warning(f"[LAUNCHLY_SAAS] Fleet operation {self.name} aborted at {error_rate:.1f}% errors")
+                if commit:
+                    self.env.cr.commit()
+                return
+
+        self.write({'state': 'done', 'date_end': fields.Datetime.now()})
+        _logger.info(f"[LAUNCHLY_SAAS] Fleet operation {self.name} done: {processed - failed} succeeded, "
+                     f"{failed} failed")
+        if commit:
+            self.env.cr.commit()
+
+    def action_reset_to_draft(self):
+        self.filtered(lambda o: o.state in ('done', 'aborted')).line_ids.unlink()
+        self.filtered(lambda o: o.state in ('done', 'aborted')).write({
+            'state': 'draft', 'date_start': False, 'date_end': False, 'note': False,
+        })
+
+
+class FleetOperationLine(models.Model):
+    _name = 'odoo.fleet.operation.line'
+    _description = 'Fleet Operation Result'
+    _order = 'id'
+
+    operation_id = fields.Many2one('odoo.fleet.operation', string='Operation', required=True, ondelete='cascade',
+                                   index=True)
+    instance_id = fields.Many2one('odoo.instance', string='Instance', required=True, ondelete='cascade')
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+        ('timeout', 'Timed Out'),
+        ('skipped', 'Skipped'),
+    ], string='State', default='pending', required=True)
+    duration = fields.Float(string='Duration (s)')
+    message = fields.Text(string='Message')
+
+    def _apply_result(self, result):
+        """Record the worker result on the line and the instance"""
+        self.ensure_one()
+        instance = self.instance_id.with_context(launchly_operation=self.operation_id.name)
+        action = self.operation_id.action
+        try:
+            if action == 'upgrade_addons' and result['output'] is None:
+                # Bridge not reachable, upgrade with the management script instead
+                result['ok'] = instance.upgrade_custom_addon_in_odoo(self.operation_id._get_addon_names())
+                result['message'] = 'Upgraded through the management script' if result['ok'] else \
+                    'Upgrade through the management script failed, see the instance log'
+            elif result['ok']:
+                if action == 'stop':
+                    instance.write({'state': 'stopped', 'hibernated_since': False})
+                elif action in ('start', 'restart'):
+                    instance.write({'state': 'running', 'hibernated_since': False,
+                                    'last_activity_date': fields.Datetime.now()})
+                    if action == 'start':
+                        instance._after_service_start()
+                instance.add_to_log(f"[INFO] Fleet operation {self.operation_id.name}: {result['message']}")
+            else:
+                if action != 'upgrade_addons':
+                    instance.write({'state': 'error'})
+                instance.add_to_log(f"[ERROR] Fleet operation {self.operation_id.name} ({action}) failed: "
+                                    f"{result['message']}")
+        except Exception as e:
+            result['ok'] = False
+            result['message'] = f"{result['message']}\n{str(e)}".strip()
+            _logger.error(f"[LAUNCHLY_SAAS - {instance.name}] Fleet operation result failed: {str(e)}")
+
+        if result['ok']:
+            state = 'done'
+        else:
+            state = 'timeout' if result['timeout'] else 'failed'
+        self.write({'state': state, 'duration': result['duration'], 'message': result['message']})
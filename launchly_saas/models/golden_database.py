@@ -0,0 +1,153 @@
+import logging
+import os
+import re
+import subprocess
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+
+class OdooGoldenDatabase(models.Model):
+    _name = 'odoo.golden.database'
+    _description = 'Golden Template Database'
+    _order = 'template_id, country_id, is_demo'
+    _rec_name = 'database_name'
+
+    _sql_constraints = [
+        ('template_country_demo_uniq', 'unique (template_id, country_id, is_demo)',
+         'A golden database already exists for this template, country and demo flag !'),
+    ]
+
+    template_id = fields.Many2one('odoo.template', string='Template', required=True, ondelete='cascade')
+    odoo_version = fields.Selection(related='template_id.odoo_version', store=True)
+    country_id = fields.Many2one('res.country', string='Country',
+                                 help="Company country of the golden database. Leave empty for a generic one "
+                                      "used when no country specific golden database exists.")
+    is_demo = fields.Boolean(string='With Demo Data', default=False)
+    database_name = fields.Char(string='Database Name', compute='_compute_database_name', store=True)
+    state = fields.Selection([
+        ('draft', 'Not Built'),
+        ('building', 'Building'),
+        ('ready', 'Ready'),
+        ('error', 'Error'),
+    ], string='State', default='draft', readonly=True, copy=False)
+    build_date = fields.Datetime(string='Last Build', readonly=True, copy=False)
+    log = fields.Text(string='Build Log', readonly=True, copy=False)
+
+    @api.depends('template_id', 'template_id.odoo_version', 'country_id', 'is_demo')
+    def _compute_database_name(self):
+        for record in self:
+            if not record.template_id:
+                record.database_name = False
+                continue
+            country = (record.country_id.code or 'generic').lower()
+            demo = 'demo' if record.is_demo else 'nodemo'
+            db_name = f"golden_{record.template_id.odoo_version}_{record.template_id.id}_{country}_{demo}"
+            record.database_name = re.sub(r'[^0-9a-z_]+', '', db_name)[:63]
+
+    @api.model
+    def _find_ready(self, template, country, is_demo):
+        """Return the golden database to clone for the given template/country/demo key.
+
+        A country specific golden database is preferred; a generic one (no country) is used
+        otherwise since the installer rewrites the company country after cloning anyway.
+        """
+        if not template:
+            return self.browse()
+        domain = [('template_id', '=', template.id), ('is_demo', '=', bool(is_demo)), ('state', '=', 'ready')]
+        golden = self.search(domain + [('country_id', '=', country.id if country else False)], limit=1)
+        if not golden and country:
+            golden = self.search(domain + [('country_id', '=', False)], limit=1)
+        return golden
+
+    def _get_script_path(self):
+        """The golden database builder lives next to the instance installation script"""
+        config = self.env['saas.config'].search([], limit=1)
+        if not config or not config.script_path:
+            raise UserError("Installation script path must be configured before building golden databases")
+        return config, os.path.join(os.path.dirname(config.script_path), 'build_golden_db.sh')
+
+    def action_build(self):
+        """(Re)build the golden database by running a full `-i base` once for this key"""
+        config, script_path = self._get_script_path()
+        if not os.path.exists(script_path):
+            raise UserError(f"Golden database script not found: {script_path}")
+
+        for record in self:
+            if not record.template_id.source_path:
+                raise UserError(f"Template '{record.template_id.name}' has no Odoo source path")
+
+            record.write({'state': 'building', 'log': ''})
+            self.env.cr.commit()
+
+            shared_venv, wheel_cache = record.template_id._get_shared_venv_paths()
+
+            cmd = [
+                'sudo', '-S', 'bash', script_path,
+                record.database_name,
+                record.template_id.odoo_version,
+                record.template_id.source_path,
+                record.country_id.code or '',
+                'true' if record.is_demo else 'false',
+                shared_venv,
+                wheel_cache,
+            ]
+            _logger.info(f"[LAUNCHLY_SAAS - {record.database_name}] Building golden database")
+            try:
+                result = subprocess.run(
+                    cmd,
+                    input=(config.sudo_password or '') + '\n',
+                    capture_output=True,
+                    text=True,
+                    check=False,
+                )
+                output = (result.stdout or '') + (result.stderr or '')
+                if result.returncode == 0 and 'GOLDEN_DB_READY' in output:
+                    record.write({
+                        'state': 'ready',
+                        'build_date': fields.Datetime.now(),
+                        'log': output[-10000:],
+                    })
+                    _logger.info(f"[LAUNCHLY_SAAS - {record.database_name}] Golden database ready")
+                else:
+                    record.write({'state': 'error', 'log': output[-10000:]})
+                    _logger.error(
+                        f"[LAUNCHLY_SAAS - {record.database_name}] Golden database build failed "
+                        f"with code {result.returncode}")
+            except Exception as e:
+                record.write({'state': 'error', 'log': str(e)})
+                _logger.error(f"[LAUNCHLY_SAAS - {record.database_name}] Golden database build failed: {str(e)}")
+
+    def _drop_database(self):
+        config = self.env['saas.config'].search([], limit=1)
+        for record in self.filtered('database_name'):
+            # A template database cannot be dropped until it is flagged as a regular one again
+            try:
+                subprocess.run(
+                    ['sudo', '-S', '-u', 'postgres', 'psql', '-d', 'postgres',
+                     '-c', f"ALTER DATABASE {record.database_name} IS_TEMPLATE false;",
+                     '-c', f"DROP DATABASE IF EXISTS {record.database_name};"],
+                    input=(config.sudo_password or '') + '\n',
+                    capture_output=True,
+                    text=True,
+                    check=False,
+                )
+                subprocess.run(
+                    ['sudo', '-S', 'rm', '-rf', f'/opt/launchly_golden/data/filestore/{record.database_name}'],
+                    input=(config.sudo_password or '') + '\n',
+                    capture_output=True,
+                    text=True,
+                    check=False,
+                )
+            except Exception as e:
+                _logger.error(f"[LAUNCHLY_SAAS - {record.database_name}] Failed to drop golden database: {str(e)}")
+
+    def action_drop(self):
+        self._drop_database()
+        self.write({'state': 'draft', 'build_date': False})
+
+    def unlink(self):
+        self._drop_database()
+        return super().unlink()
@@ -1,8 +1,7 @@
 import os
 import subprocess
-import tempfile
-import zipfile
-import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
@@ -15,8 +14,114 @@ from email import encoders
 import smtplib
 import logging
 
+from .pg_access import tenant_cursor
+from .backup_stream import StreamingBackupWriter, BlobStore, ZIP_COMPRESSIONS, BLOB_STORE_DIR, read_filestore_index
+
 _logger = logging.getLogger(__name__)
 
+
+def _backup_instance(task):
+    """Back up one instance: stream its database dump and filestore into a zip archive.
+
+    Runs in a backup pool thread, so it only gets plain values (no records, no cursor) and
+    returns a plain result dict; a failing instance never stops the backups of the others.
+    """
+    started = time.monotonic()
+    logs = []
+    result = {'instance_id': task['instance_id'], 'ok': False, 'zip_path': False, 'size': 0, 'checksum': False,
+              'logs': logs}
+    result['date_start'] = fields.Datetime.now()
+    try:
+        name = task['name']
+        db_name = task['db_name']
+        db_user = task['dsn']['user']
+        filestore_path = task['filestore_path']
+        backup_dir = task['backup_dir']
+        os.makedirs(backup_dir, exist_ok=True)
+        now = datetime.now().strftime('%Y%m%d_%H%M%S')
+        zip_filename = f"{name}_backup_{now}.zip"
+        zip_path = os.path.join(backup_dir, zip_filename)
+
+        # Set up environment with PostgreSQL password
+        env = os.environ.copy()
+        env['PGPASSWORD'] = task['dsn']['password']
+
+        dump_cmd = [
+            'pg_dump',
+            '-h', 'localhost',  # Explicit host
+            '-p', '5432',       # Explicit port
+            '-U', db_user,      # Database user
+            '-d', db_name,      # Database name
+            '--no-owner',       # Don't include ownership commands
+            '--no-privileges',  # Don't include privilege commands
+        ]
+        if task['dump_format'] != 'directory':
+            # Plain SQL dump written to stdout and streamed into the archive
+            dump_cmd += ['-F', 'p']
+
+        logs.append(f"Dumping database for {name} directly from PostgreSQL...")
+        logs.append(f"Company name: '{task['company_name']}' -> DB user: '{db_user}'")
+        logs.append(f"Command: {' '.join(dump_cmd)}")
+
+        # Test database connection first, and read the manifest data on the way
+        try:
+            with tenant_cursor(task['dsn']) as cr:
+                cr.execute("SHOW server_version")
+                pg_version = cr.fetchone()[0].split()[0]
+                cr.execute("SELECT name, latest_version FROM ir_module_module WHERE state = 'installed'")
+                modules = dict(cr.fetchall())
+            logs.append("Database connection test successful")
+        except Exception as e:
+            logs.append(f"Database connection test failed: {e}")
+            raise Exception(f"Cannot connect to database {db_name} as user {db_user}")
+
+        # Same layout as the Odoo database manager zip: dump.sql, filestore/ and manifest.json
+        manifest = {
+            'odoo_dump': '1',
+            'db_name': db_name,
+            'version': '18.0',  # You can make this dynamic if needed
+            'version_info': [18, 0, 0, 'final', 0],
+            'major_version': '18.0',
+            'pg_version': pg_version,
+            'modules': modules,
+            'launchly_dump_format': task['dump_format'],
+        }
+        logs.append(f"Writing backup for {name} to {zip_path} ({task['compression']} compression)...")
+        try:
+            with StreamingBackupWriter(zip_path, task['compression'], task['compress_level']) as writer:
+                writer.add_bytes('manifest.json', json.dumps(manifest, indent=4))
+                if task['dump_format'] == 'directory':
+                    writer.add_pg_dump_directory(dump_cmd, env=env, jobs=task['dump_jobs'])
+                else:
+                    writer.add_pg_dump(dump_cmd, env=env)
+                logs.append("Database dump completed successfully")
+                _logger.info(f"[LAUNCHLY_SAAS - {name}] Streaming filestore from {filestore_path}")
+                if task['backup_mode'] == 'incremental':
+                    stats = writer.add_directory_blobs(
+                        filestore_path, BlobStore(os.path.join(backup_dir, BLOB_STORE_DIR)),
+                        sudo_password=task['sudo_password'])
+                    file_count = stats['files']
+                    logs.append(f"Filestore indexed: {stats['files']} files, {stats['new_blobs']} new "
+                                f"blobs ({stats['new_bytes']} bytes)")
+                else:
+                    file_count = writer.add_directory(filestore_path, 'filestore', sudo_password=task['sudo_password'])
+                    logs.append(f"Filestore added: {file_count} files")
+                if not file_count:
+                    _logger.info(f"No filestore found for database '{db_name}' at {filestore_path}")
+        except subprocess.CalledProcessError as e:
+            logs.append(f"{' '.join(e.cmd[:3])} failed with return code: {e.returncode}")
+            logs.append(f"stderr: {e.stderr}")
+            raise
+        result.update(ok=True, zip_path=zip_path, size=writer.size, checksum=writer.checksum)
+        logs.append(f"Backup for {name} complete at {zip_path}, size: {result['size']} bytes.")
+    except Exception as e:
+        logs.append(f"Backup failed for {task['name']}: {e}")
+        result['message'] = str(e)
+        _logger.error(f"[LAUNCHLY_SAAS - {task['name']}] Backup failed: {str(e)}")
+    result['duration'] = round(time.monotonic() - started, 2)
+    return result
+
+
 class OdooInstanceBackup(models.Model):
     _name = 'odoo.instance.backup'
     _description = 'Odoo Instance Backup'
@@ -44,288 +149,208 @@ class OdooInstanceBackup(models.Model):
     ], default='daily', string='Backup Frequency', help='Frequency of Backup Scheduling')
     confirmation_code = fields.Char(string='Portal Confirmation Code')
     backup_file_snapshot = fields.Text(string='Backup File Snapshot')
+    keep_daily = fields.Integer(string='Keep Daily', default=7, help='Number of most recent days with a backup kept')
+    keep_weekly = fields.Integer(string='Keep Weekly', default=4, help='Number of most recent weeks with a backup kept')
+    keep_monthly = fields.Integer(string='Keep Monthly', default=6,
+                                  help='Number of most recent months with a backup kept')
+    archive_ids = fields.One2many('odoo.instance.backup.archive', 'backup_id', string='Archives', readonly=True)
+    archive_count = fields.Integer(string='Archives', compute='_compute_archive_count')
+    result_ids = fields.One2many('odoo.instance.backup.result', 'backup_id', string='Results', readonly=True)
+    backup_mode = fields.Selection([
+        ('full', 'Full'),
+        ('incremental', 'Incremental Filestore'),
+    ], string='Backup Mode', default='full', required=True,
+        help='Incremental backups keep the attachments once in a content addressed store shared by all the '
+             'backups of the directory, each archive only holds the database dump and the filestore index')
+    dump_format = fields.Selection([
+        ('plain', 'Plain SQL'),
+        ('directory', 'Directory (parallel)'),
+    ], string='Dump Format', default='plain', required=True,
+        help='Plain SQL archives can also be restored from the Odoo database manager, directory dumps are '
+             'taken and restored with several parallel jobs')
+    dump_jobs = fields.Integer(string='Dump Jobs', default=4, help='Parallel pg_dump jobs for directory dumps')
+    compression = fields.Selection(selection='_get_compression_selection', string='Compression', default='deflate',
+                                   required=True, help='Zstandard is only offered when the Python runtime supports it')
+    compression_level = fields.Integer(string='Compression Level',
+                                       help='0-9 for gzip/deflate, 1-22 for zstd, empty for the default level')
+
+    def _compute_archive_count(self):
+        counts = dict(self.env['odoo.instance.backup.archive']._read_group(
+            [('backup_id', 'in', self.ids)], ['backup_id'], ['__count']))
+        for rec in self:
+            rec.archive_count = counts.get(rec, 0)
+
+    @api.model
+    def _get_compression_selection(self):
+        labels = {'stored': 'None (stored)', 'deflate': 'Gzip (deflate)', 'zstd': 'Zstandard'}
+        return [(key, labels[key]) for key in ZIP_COMPRESSIONS]
 
     def action_backup_instances(self):
-        import time
+        self._run_backups()
+
+    def _get_backup_pool_size(self, config):
+        """Concurrent instance backups: the configured value, or half the host cores (at most 4)"""
+        if config.backup_concurrency > 0:
+            return config.backup_concurrency
+        return max(1, min((os.cpu_count() or 2) // 2, 4))
+
+    def _estimate_backup_sizes(self, instances):
+        """Expected size of the next backup of each instance: the last successful backup, else the database size"""
+        sizes = {}
+        for result in self.env['odoo.instance.backup.result'].search(
+                [('instance_id', 'in', instances.ids), ('state', '=', 'success')], order='date_start'):
+            sizes[result.instance_id.id] = result.size
+        missing = instances.filtered(lambda i: i.id not in sizes and i.database_name)
+        if missing:
+            stats = self.env['launchly.postgres']._get_database_stats(missing.mapped('database_name'))
+            for instance in missing:
+                sizes[instance.id] = (stats.get(instance.database_name) or {}).get('size') or 0
+        return sizes
+
+    def _prepare_backup_task(self, instance):
+        self.ensure_one()
+        # Database user is derived from company name (same as in installation script)
+        dsn = instance._get_tenant_dsn()
+        return {
+            'backup_id': self.id,
+            'instance_id': instance.id,
+            'name': instance.name,
+            'company_name': instance.company_name or "",
+            'db_name': instance.database_name,
+            'dsn': dsn,
+            # Filestore path for direct installation (include database name subfolder)
+            'filestore_path': f'/opt/{instance.name}/data/filestore/{instance.database_name}',
+            'backup_dir': self.backup_path or '/tmp',
+            'backup_mode': self.backup_mode,
+            'dump_format': self.dump_format,
+            'dump_jobs': self.dump_jobs,
+            'compression': self.compression,
+            'compress_level': self.compression_level or None,
+            'sudo_password': instance.root_sudo_password,
+        }
+
+    def _run_backups(self):
+        """Back up the instances of every backup record with a bounded number of threads.
+
+        Large tenants run in their own lane of `backup_large_concurrency` threads so that they do
+        not all hit the disks at the same time, the smaller ones run in the remaining slots of the
+        pool and never wait behind them. Every instance gets its own result line, whatever
+        happened to the others.
+        """
+        config = self.env['saas.config'].search([], limit=1)
+        large_threshold = (config.backup_large_tenant_mb or 0) * 1024 * 1024
+        sizes = self._estimate_backup_sizes(self.instance_ids)
+
+        Archive = self.env['odoo.instance.backup.archive']
+        tasks = []
         for rec in self:
-            logs = []
-            backup_files = []
+            if not Archive.search_count([('backup_id', '=', rec.id)], limit=1):
+                # First run with the catalog: import the archives already in the directory
+                Archive._sync_directory(rec)
             for instance in rec.instance_ids:
+                task = rec._prepare_backup_task(instance)
+                task['estimated_size'] = sizes.get(instance.id, 0)
+                task['large'] = bool(large_threshold) and task['estimated_size'] >= large_threshold
+                tasks.append(task)
+        tasks.sort(key=lambda t: t['estimated_size'], reverse=True)
+        large_tasks = [task for task in tasks if task['large']]
+        small_tasks = [task for task in tasks if not task['large']]
+
+        pool_size = self._get_backup_pool_size(config)
+        large_workers = min(max(config.backup_large_concurrency, 1), pool_size, len(large_tasks))
+        small_workers = min(max(pool_size - large_workers, 1), len(small_tasks))
+        futures = {}
+        large_lane = ThreadPoolExecutor(max_workers=max(large_workers, 1), thread_name_prefix='launchly_backup_large')
+        small_lane = ThreadPoolExecutor(max_workers=max(small_workers, 1), thread_name_prefix='launchly_backup')
+        with large_lane, small_lane:
+            for lane, lane_tasks in ((large_lane, large_tasks), (small_lane, small_tasks)):
+                for task in lane_tasks:
+                    futures[(task['backup_id'], task['instance_id'])] = lane.submit(_backup_instance, task)
+        results = {key: future.result() for key, future in futures.items()}
+
+        for rec in self:
+            rec._apply_backup_results([results[(rec.id, instance.id)] for instance in rec.instance_ids])
+
+    def _apply_backup_results(self, results):
+        self.ensure_one()
+        self.env['odoo.instance.backup.result'].create([{
+            'backup_id': self.id,
+            'instance_id': result['instance_id'],
+            'state': 'success' if result['ok'] else 'failed',
+            'date_start': result['date_start'],
+            'duration': result['duration'],
+            'size': result['size'],
+            'file_path': result['zip_path'],
+            'message': result.get('message'),
+        } for result in results])
+
+        logs = [line for result in results for line in result['logs']]
+        Archive = self.env['odoo.instance.backup.archive']
+        instances = {instance.id: instance for instance in self.instance_ids}
+        archives = Archive.browse()
+        for result in results:
+            if result['ok']:
+                archives |= Archive._register(self, instances[result['instance_id']], result['zip_path'],
+                                              result['size'], result['checksum'], self.dump_format,
+                                              self.backup_mode, result['date_start'])
+        if any(not result['ok'] for result in results):
+            self.status = 'failed'
+        elif self.status == 'failed':
+            # Back to scheduled, the cron runs draft and failed records
+            self.status = 'draft'
+        if archives:
+            self.backup_full_path = archives[0].file_path
+            # Retention works on the catalog, the backup directory is not listed
+            for file_path in Archive._apply_retention(self):
+                logs.append(f"Removed old backup: {file_path}")
+            # Drop the incremental blobs no remaining archive refers to, full backups have no blob store
+            if self.backup_mode == 'incremental':
                 try:
-                    # Direct systemd service backup (no odoo containers)
-                    db_name = instance.database_name
-                    # Database user is derived from company name (same as in installation script)
-                    import re
-                    company_name = instance.company_name or ""
-                    db_user = re.sub(r'[^0-9A-Za-z]+', '', company_name).lower()
-                    # Database password is standardized as 'adminpwd' in installation script
-                    db_password = 'adminpwd'
-                    # Filestore path for direct installation (include database name subfolder)
-                    filestore_base_path = f'/opt/{instance.name}/data/filestore'
-                    filestore_path = f'{filestore_base_path}/{db_name}'
-                    now = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    backup_base = f"{instance.name}_backup_{now}"
-                    backup_dir = rec.backup_path or '/tmp'
-                    os.makedirs(backup_dir, exist_ok=True)
-                    backup_format = 'zip'  # Only zip supported for now
-                    with tempfile.TemporaryDirectory() as dump_dir:
-                        # 1. Dump the database using direct PostgreSQL access
-                        dump_sql_path = os.path.join(dump_dir, 'dump.sql')
-
-                        # Set up environment with PostgreSQL password
-                        env = os.environ.copy()
-                        env['PGPASSWORD'] = db_password
-
-                        dump_cmd = [
-                            'pg_dump',
-                            '-h', 'localhost',  # Explicit host
-                            '-p', '5432',       # Explicit port
-                            '-U', db_user,      # Database user
-                            '-d', db_name,      # Database name
-                            '--no-owner',       # Don't include ownership commands
-                            '--no-privileges',  # Don't include privilege commands
-                            '-F', 'p',          # Plain SQL format
-                            '-f', dump_sql_path # Output file
-                        ]
-
-                        logs.append(f"Dumping database for {instance.name} directly from PostgreSQL...")
-                        logs.append(f"Company name: '{company_name}' -> DB user: '{db_user}'")
-                        logs.append(f"Using database user: {db_user}, database: {db_name}, password: adminpwd")
-                        logs.append(f"Command: {' '.join(dump_cmd)}")
-
-                        # Test database connection first
-                        test_cmd = [
-                            'psql',
-                            '-h', 'localhost',
-                            '-p', '5432',
-                            '-U', db_user,
-                            '-d', db_name,
-                            '-c', 'SELECT version();'
-                        ]
-
-                        try:
-                            test_result = subprocess.run(test_cmd, env=env, capture_output=True, text=True, timeout=30)
-                            if test_result.returncode != 0:
-                                logs.append(f"Database connection test failed: {test_result.stderr}")
-                                logs.append(f"Test command: {' '.join(test_cmd)}")
-                                raise Exception(f"Cannot connect to database {db_name} as user {db_user}")
-                            else:
-                                logs.append("Database connection test successful")
-                        except subprocess.TimeoutExpired:
-                            raise Exception("Database connection test timed out")
-
-                        # Proceed with actual dump
-                        try:
-                            result = subprocess.run(dump_cmd, env=env, capture_output=True, text=True, timeout=300)
-                            if result.returncode != 0:
-                                logs.append(f"pg_dump failed with return code: {result.returncode}")
-                                logs.append(f"pg_dump stderr: {result.stderr}")
-                                logs.append(f"pg_dump stdout: {result.stdout}")
-                                raise subprocess.CalledProcessError(result.returncode, dump_cmd, result.stdout, result.stderr)
-                            else:
-                                logs.append(f"Database dump completed successfully, size: {os.path.getsize(dump_sql_path)} bytes")
-                        except subprocess.TimeoutExpired:
-                            raise Exception("Database dump timed out after 5 minutes")
-                        # 2. Copy the filestore using sudo if password available, otherwise try direct copy
-                        filestore_tmp = os.path.join(dump_dir, 'filestore')
-                        _logger.info(f"Starting filestore copy for {instance.name}")
-                        _logger.info(f"Source path: {filestore_path}")
-                        _logger.info(f"Destination path: {filestore_tmp}")
-                        
-                        # Create destination directory
-                        os.makedirs(filestore_tmp, exist_ok=True)
-                        
-                        if instance.root_sudo_password:
-                            # Use sudo from the beginning if we have the password
-                            _logger.info(f"Using sudo to copy filestore for {instance.name}")
-                            try:
-                                # Check if database-specific filestore exists with sudo
-                                sudo_test_cmd = ['sudo', '-S', 'test', '-d', filestore_path]
-                                test_result = subprocess.run(
-                                    sudo_test_cmd,
-                                    input=instance.root_sudo_password + '\n',
-                                    text=True,
-                                    capture_output=True,
-                                    timeout=30
-                                )
-                                
-                                if test_result.returncode == 0:
-                                    _logger.info(f"Database-specific filestore exists at {filestore_path}, copying with sudo...")
-                                    
-                                    # Copy with sudo (this will flatten the structure)
-                                    sudo_copy_cmd = ['sudo', '-S', 'cp', '-r', f'{filestore_path}/.', filestore_tmp]
-                                    copy_result = subprocess.run(
-                                        sudo_copy_cmd,
-                                        input=instance.root_sudo_password + '\n',
-                                        text=True,
-                                        capture_output=True,
-                                        timeout=300
-                                    )
-                                    
-                                    if copy_result.returncode != 0:
-                                        raise Exception(f"Sudo copy failed: {copy_result.stderr}")
-                                    
-                                    _logger.info(f"Filestore copied successfully with sudo")
-                    
-                                else:
-                                    # Check if base filestore directory exists and list contents
-                                    _logger.info(f"Database-specific filestore not found, checking base filestore directory...")
-                                    sudo_test_base_cmd = ['sudo', '-S', 'test', '-d', filestore_base_path]
-                                    base_test_result = subprocess.run(
-                                        sudo_test_base_cmd,
-                                        input=instance.root_sudo_password + '\n',
-                                        text=True,
-                                        capture_output=True,
-                                        timeout=30
-                                    )
-                                    
-                                    if base_test_result.returncode == 0:
-                                        # List contents of base filestore to see available databases
-                                        sudo_ls_cmd = ['sudo', '-S', 'ls', '-la', filestore_base_path]
-                                        ls_result = subprocess.run(
-                                            sudo_ls_cmd,
-                                            input=instance.root_sudo_password + '\n',
-                                            text=True,
-                                            capture_output=True,
-                                            timeout=30
-                                        )
-                                        
-                                        if ls_result.returncode == 0:
-                                            _logger.info(f"Base filestore directory contents:\n{ls_result.stdout}")
-                                        
-                                        _logger.info(f"No filestore found for database '{db_name}' at {filestore_path}")
-                                    else:
-                                        _logger.info(f"Base filestore directory does not exist at {filestore_base_path}")
-                                
-                                # Fix ownership regardless of copy result
-                                if os.path.exists(filestore_tmp) and os.listdir(filestore_tmp):
-                                    import pwd
-                                    current_user = pwd.getpwuid(os.getuid()).pw_name
-                                    chown_cmd = ['sudo', '-S', 'chown', '-R', f'{current_user}:{current_user}', filestore_tmp]
-                                    chown_result = subprocess.run(
-                                        chown_cmd,
-                                        input=instance.root_sudo_password + '\n',
-                                        text=True,
-                                        capture_output=True,
-                                        timeout=60
-                                    )
-                                    
-                                    if chown_result.returncode == 0:
-                                        _logger.info(f"Fixed ownership of copied filestore files")
-                                    else:
-                                        _logger.info(f"Warning: Could not fix ownership: {chown_result.stderr}")
-                                        
-                            except subprocess.TimeoutExpired:
-                                raise Exception("Filestore copy with sudo timed out")
-                            except Exception as e:
-                                _logger.info(f"Sudo copy failed: {str(e)}")
-                                raise Exception(f"Failed to copy filestore: {str(e)}")
-                        else:
-                            # Try direct copy without sudo
-                            _logger.info(f"No sudo password available, trying direct copy...")
-                            try:
-                                if os.path.exists(filestore_path):
-                                    shutil.copytree(filestore_path, filestore_tmp, dirs_exist_ok=True)
-                                    _logger.info(f"Filestore copied successfully without sudo")
-                                else:
-                                    _logger.info(f"Filestore does not exist at {filestore_path}")
-                            except PermissionError:
-                                raise Exception("Permission denied and no sudo password available")
-                            except Exception as e:
-                                raise Exception(f"Failed to copy filestore: {str(e)}")
-                        # 3. Create manifest.json (literal copy of module logic)
-                        manifest_path = os.path.join(dump_dir, 'manifest.json')
-                        # Get installed modules from the DB using direct PostgreSQL access
-                        try:
-                            query_cmd = [
-                                'psql',
-                                '-h', 'localhost',
-                                '-p', '5432',
-                                '-U', db_user,
-                                '-d', db_name,
-                                '-t', '-c', "SELECT name, latest_version FROM ir_module_module WHERE state = 'installed';"
-                            ]
-                            result = subprocess.run(query_cmd, env=env, capture_output=True, text=True, timeout=60)
-                            if result.returncode == 0:
-                                modules = {}
-                                for line in result.stdout.strip().split('\n'):
-                                    if line.strip():
-                                        parts = [p.strip() for p in line.split('|')]
-                                        if len(parts) == 2:
-                                            modules[parts[0]] = parts[1]
-                            else:
-                                logs.append(f"Could not fetch installed modules (psql failed): {result.stderr}")
-                                modules = {}
-                        except Exception as e:
-                            logs.append(f"Could not fetch installed modules: {e}")
-                            modules = {}
-                        manifest = {
-                            'odoo_dump': '1',
-                            'db_name': db_name,
-                            'version': '18.0',  # You can make this dynamic if needed
-                            'version_info': [18, 0, 0, 'final', 0],
-                            'major_version': '18.0',
-                            'pg_version': '13',  # You can make this dynamic if needed
-                            'modules': modules,
-                        }
-                        with open(manifest_path, 'w') as mf:
-                            json.dump(manifest, mf, indent=4)
-                        # 4. Zip the dump_dir (literal copy of module logic)
-                        zip_filename = f'{backup_base}.zip'
-                        zip_path = os.path.join(backup_dir, zip_filename)
-                        logs.append(f"Zipping backup for {instance.name} at {zip_path} ...")
-                        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-                            for root, dirs, files in os.walk(dump_dir):
-                                for file in files:
-                                    abs_path = os.path.join(root, file)
-                                    rel_path = os.path.relpath(abs_path, dump_dir)
-                                    zf.write(abs_path, rel_path)
-                        # Read zip as binary for UI download
-                        with open(zip_path, 'rb') as f:
-                            backup_data = f.read()
-                        backup_files.append((zip_filename, backup_data, zip_path))
-                        logs.append(f"Backup for {instance.name} complete at {zip_path}.")
-                        # --- Per-instance backup retention logic ---
-                        import fnmatch
-                        pattern = f'{instance.name}_backup_*.zip'
-                        files = [os.path.join(backup_dir, f) for f in os.listdir(backup_dir) if fnmatch.fnmatch(f, pattern)]
-                        files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
-                        keep_count = rec.days_to_remove if rec.days_to_remove > 0 else 1
-                        for file_path in files[keep_count:]:
-                            try:
-                                os.remove(file_path)
-                                logs.append(f"Removed old backup: {file_path}")
-                            except Exception as e:
-                                logs.append(f"Failed to remove backup {file_path}: {e}")
+                    collected = self._collect_blob_garbage(self.backup_path or '/tmp')
+                    if collected:
+                        logs.append(f"Blob store cleanup: removed {collected[0]} blobs ({collected[1]} bytes)")
                 except Exception as e:
-                    logs.append(f"Backup failed for {instance.name}: {e}")
-                    rec.status = 'failed'
-                    rec.log = '\n'.join(logs)
-                    return
-            # If all backups succeeded, attach the first backup file (or all, if you want to extend)
-            if backup_files:
-                # rec.backup_file = backup_files[0][1]  # Commented out: not storing backups in DB
-                # rec.backup_filename = backup_files[0][0]  # Commented out: not storing backups in DB
-                rec.backup_full_path = backup_files[0][2]
-                # Save all backup files to the backup_file field (commented out for now)
-                # If you want to store all backups in the DB, uncomment the following lines:
-                # import base64
-                # for zip_filename, backup_data, zip_path in backup_files:
-                #     rec.backup_file = base64.b64encode(backup_data)
-                #     rec.backup_filename = zip_filename
-                #     # For multiple files, consider using a one2many or ir.attachment
-                # Remove old backups if enabled
-                if rec.auto_remove and rec.days_to_remove and rec.backup_path:
-                    now = time.time()
-                    for filename in os.listdir(rec.backup_path):
-                        file_path = os.path.join(rec.backup_path, filename)
-                        if os.path.isfile(file_path):
-                            file_age_days = (now - os.path.getctime(file_path)) / 86400
-                            if file_age_days >= rec.days_to_remove:
-                                os.remove(file_path)
-                                logs.append(f"Removed old backup: {file_path}")
-            else:
-                rec.log = '\n'.join(logs)
+                    logs.append(f"Blob store cleanup skipped: {e}")
+        self.log = '\n'.join(logs)
+
+    @api.model
+    def _collect_blob_garbage(self, backup_dir):
+        """Mark and sweep the incremental blob store of a backup directory.
+
+        Every incremental archive of the directory in the catalog is marked, whatever backup record
+        or instance wrote it, since they all share the same store. Any unreadable archive aborts the
+        sweep rather than risking the removal of blobs it may reference.
+        """
+        store = BlobStore(os.path.join(backup_dir, BLOB_STORE_DIR))
+        if not os.path.isdir(store.root):
+            return None
+        Archive = self.env['odoo.instance.backup.archive']
+        archives = Archive.search([('backup_dir', '=', Archive._normalize_dir(backup_dir)),
+                                   ('backup_mode', '=', 'incremental')])
+        referenced = set()
+        for archive in archives:
+            index = read_filestore_index(archive.file_path)
+            if index:
+                referenced.update(index['files'].values())
+        return store.collect_garbage(referenced)
+
+    def action_sync_catalog(self):
+        for rec in self:
+            rec.env['odoo.instance.backup.archive']._sync_directory(rec)
+        return True
+
+    def action_restore(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'Restore Backup',
+            'res_model': 'instance.backup.restore.wizard',
+            'view_mode': 'form',
+            'target': 'new',
+            'context': {
+                'default_backup_id': self.id,
+            },
+        }
 
     def action_show_backup_files(self):
         """
@@ -346,11 +371,28 @@ class OdooInstanceBackup(models.Model):
     @api.model
     def cron_auto_backup(self, frequency='daily'):
         # Find all draft backup records with a backup_path set and matching frequency
+        # Failed records are retried, a failing instance must not stop the next scheduled backups
         backups = self.search([
-            ('status', '=', 'draft'),
+            ('status', 'in', ('draft', 'failed')),
             ('backup_path', '!=', False),
             ('backup_frequency', '=', frequency)
         ])
-        for backup in backups:
-            backup.action_backup_instances()
+        backups._run_backups()
 
+
+class OdooInstanceBackupResult(models.Model):
+    _name = 'odoo.instance.backup.result'
+    _description = 'Odoo Instance Backup Result'
+    _order = 'date_start desc, id desc'
+
+    backup_id = fields.Many2one('odoo.instance.backup', string='Backup', required=True, ondelete='cascade', index=True)
+    instance_id = fields.Many2one('odoo.instance', string='Instance', required=True, ondelete='cascade', index=True)
+    state = fields.Selection([
+        ('success', 'Success'),
+        ('failed', 'Failed'),
+    ], string='Status', required=True)
+    date_start = fields.Datetime(string='Started')
+    duration = fields.Float(string='Duration (s)')
+    size = fields.Float(string='Size (bytes)', digits=(16, 0))
+    file_path = fields.Char(string='Backup File')
+    message = fields.Text(string='Error')
@@ -0,0 +1,186 @@
+import fnmatch
+import os
+from datetime import datetime, timedelta
+import logging
+
+from odoo import models, fields, api, tools
+from odoo.exceptions import UserError
+
+from .backup_stream import file_checksum, read_archive_manifest, read_filestore_index
+
+_logger = logging.getLogger(__name__)
+
+
+class OdooInstanceBackupArchive(models.Model):
+    _name = 'odoo.instance.backup.archive'
+    _description = 'Backup Archive'
+    _order = 'date desc, id desc'
+
+    name = fields.Char(string='File Name', required=True, readonly=True)
+    backup_id = fields.Many2one('odoo.instance.backup', string='Backup', ondelete='set null', index=True,
+                                readonly=True)
+    instance_id = fields.Many2one('odoo.instance', string='Instance', ondelete='set null', readonly=True)
+    instance_name = fields.Char(string='Instance Name', required=True, readonly=True)
+    backup_dir = fields.Char(string='Backup Directory', required=True, readonly=True)
+    file_path = fields.Char(string='File Path', required=True, readonly=True)
+    date = fields.Datetime(string='Date', required=True, readonly=True)
+    size = fields.Float(string='Size (bytes)', digits=(16, 0), readonly=True)
+    checksum = fields.Char(string='SHA256', readonly=True)
+    dump_format = fields.Selection([
+        ('plain', 'Plain SQL'),
+        ('directory', 'Directory (parallel)'),
+    ], string='Dump Format', default='plain', readonly=True)
+    backup_mode = fields.Selection([
+        ('full', 'Full'),
+        ('incremental', 'Incremental Filestore'),
+    ], string='Backup Mode', default='full', readonly=True)
+    parent_id = fields.Many2one('odoo.instance.backup.archive', string='Previous Incremental', ondelete='set null',
+                                readonly=True,
+                                help='Previous incremental archive of the instance sharing the same blob store')
+
+    _sql_constraints = [
+        ('file_path_uniq', 'unique (file_path)', 'This archive is already in the catalog !'),
+    ]
+
+    def init(self):
+        # Listing and retention always look up the archives of one instance in one directory, newest first
+        tools.create_index(self._cr, 'odoo_instance_backup_archive_dir_instance_date_idx', self._table,
+                           ['backup_dir', 'instance_name', 'date DESC'])
+
+    @api.model
+    def _normalize_dir(self, backup_dir):
+        return os.path.abspath(backup_dir or '/tmp')
+
+    @api.model
+    def _register(self, backup, instance, zip_path, size, checksum, dump_format, backup_mode, date):
+        backup_dir = self._normalize_dir(os.path.dirname(zip_path))
+        parent = self.browse()
+        if backup_mode == 'incremental':
+            parent = self.search([('backup_dir', '=', backup_dir), ('instance_name', '=', instance.name),
+                                  ('backup_mode', '=', 'incremental')], limit=1)
+        return self.create({
+            'name': os.path.basename(zip_path),
+            'backup_id': backup.id,
+            'instance_id': instance.id,
+            'instance_name': instance.name,
+            'backup_dir': backup_dir,
+            'file_path': zip_path,
+            'date': date,
+            'size': size,
+            'checksum': checksum,
+            'dump_format': dump_format,
+            'backup_mode': backup_mode,
+            'parent_id': parent.id,
+        })
+
+    @api.model
+    def _sync_directory(self, backup):
+        """Reconcile the catalog with the backup directory in a single scan.
+
+        Archives of the record instances written before the catalog existed (or copied by hand)
+        are added, entries whose file disappeared are dropped. Archives of other instances are left
+        to the backup record of those instances, whose retention policy applies to them. Only
+        needed once per directory, or on demand.
+        """
+        backup_dir = self._normalize_dir(backup.backup_path)
+        if not os.path.isdir(backup_dir):
+            return 0
+        known = {archive.file_path: archive for archive in self.search([('backup_dir', '=', backup_dir)])}
+        instances = {instance.name: instance for instance in backup.instance_ids}
+        vals_list = []
+        on_disk = set()
+        for entry in os.scandir(backup_dir):
+            if not entry.is_file() or not fnmatch.fnmatch(entry.name, '*_backup_*.zip'):
+                continue
+            on_disk.add(entry.path)
+            if entry.path in known:
+                continue
+            instance_name = entry.name.rsplit('_backup_', 1)[0]
+            if instance_name not in instances:
+                continue
+            try:
+                manifest = read_archive_manifest(entry.path)
+                incremental = read_filestore_index(entry.path) is not None
+            except Exception as e:
+                _logger.warning(f"[LAUNCHLY_SAAS] Skipping unreadable backup archive {entry.path}: {str(e)}")
+                continue
+            stat = entry.stat()
+            vals_list.append({
+                'name': entry.name,
+                'backup_id': backup.id,
+                'instance_id': instances[instance_name].id,
+                'instance_name': instance_name,
+                'backup_dir': backup_dir,
+                'file_path': entry.path,
+                'date': datetime.utcfromtimestamp(stat.st_mtime),
+                'size': stat.st_size,
+                'dump_format': manifest.get('launchly_dump_format', 'plain'),
+                'backup_mode': 'incremental' if incremental else 'full',
+            })
+        self.create(vals_list)
+        self.browse([archive.id for path, archive in known.items() if path not in on_disk]).unlink()
+        return len(vals_list)
+
+    @api.model
+    def _gfs_keep(self, archives, keep_daily, keep_weekly, keep_monthly):
+        """Archives kept by a grandfather-father-son policy.
+
+        `archives` are the archives of one instance, newest first. The newest archive of each of the
+        last `keep_daily` days, `keep_weekly` ISO weeks and `keep_monthly` months holding a backup is
+        kept, and the newest archive overall is always kept.
+        """
+        keep = archives[:1]
+        for count, period in ((keep_daily, lambda d: d.date()),
+                              (keep_weekly, lambda d: d.isocalendar()[:2]),
+                              (keep_monthly, lambda d: (d.year, d.month))):
+            seen = set()
+            for archive in archives:
+                if len(seen) >= count:
+                    break
+                key = period(archive.date)
+                if key not in seen:
+                    seen.add(key)
+                    keep |= archive
+        return keep
+
+    @api.model
+    def _apply_retention(self, backup):
+        """Apply the retention policy of a backup record to its archives, from the catalog only"""
+        archives = self.search([('backup_id', '=', backup.id)])
+        max_date = False
+        if backup.auto_remove and backup.days_to_remove:
+            max_date = fields.Datetime.now() - timedelta(days=backup.days_to_remove)
+        to_remove = self.browse()
+        by_instance = {}
+        for archive in archives:
+            by_instance.setdefault(archive.instance_name, self.browse())
+            by_instance[archive.instance_name] |= archive
+        for instance_archives in by_instance.values():
+            keep = self._gfs_keep(instance_archives, backup.keep_daily, backup.keep_weekly, backup.keep_monthly)
+            if max_date:
+                # The age limit never removes the last archive of an instance
+                keep = keep.filtered(lambda a: a.date >= max_date) or instance_archives[:1]
+            to_remove |= instance_archives - keep
+        return to_remove._remove_files()
+
+    def _remove_files(self):
+        """Delete the archive files and their catalog entries, returns the removed file paths"""
+        removed = []
+        for archive in self:
+            try:
+                if os.path.exists(archive.file_path):
+                    os.remove(archive.file_path)
+                removed.append(archive.file_path)
+            except OSError as e:
+                _logger.warning(f"[LAUNCHLY_SAAS] Failed to remove backup {archive.file_path}: {str(e)}")
+        self.filtered(lambda a: a.file_path in removed).unlink()
+        return removed
+
+    def _verify_checksum(self):
+        """Check the archive file against the checksum recorded when it was written"""
+        self.ensure_one()
+        if not os.path.isfile(self.file_path):
+            raise UserError(f"Backup file {self.file_path} does not exist anymore")
+        if self.checksum and file_checksum(self.file_path) != self.checksum:
+            raise UserError(f"Backup file {self.name} is corrupted: its checksum does not match the catalog")
+        return True
@@ -1,7 +1,4 @@
 from odoo import models, fields, api, _
-import os
-from datetime import datetime
-import fnmatch
 
 class InstanceBackupFileWizard(models.TransientModel):
     _name = 'instance.backup.file.wizard'
@@ -13,24 +10,14 @@ class InstanceBackupFileWizard(models.TransientModel):
     @api.depends('backup_id')
     def _compute_file_ids(self):
         for wizard in self:
-            files = []
-            backup_path = wizard.backup_id.backup_path
-            if backup_path and os.path.isdir(backup_path):
-                file_list = []
-                for fname in os.listdir(backup_path):
-                    if fnmatch.fnmatch(fname, '*_backup_*.zip'):
-                        fpath = os.path.join(backup_path, fname)
-                        file_list.append((fname, fpath, os.path.getmtime(fpath)))
-                # Sort by newest first
-                file_list.sort(key=lambda x: x[2], reverse=True)
-                for fname, fpath, mtime in file_list:
-                    files.append((0, 0, {
-                        'name': fname,
-                        'size': os.path.getsize(fpath),
-                        'date': datetime.fromtimestamp(mtime),
-                        'download_url': f'/launchly_saas/download_backup?file={fname}&backup_id={wizard.backup_id.id}'
-                    }))
-            wizard.file_ids = files
+            # Read from the backup catalog, newest first, the backup directory is not scanned
+            archives = self.env['odoo.instance.backup.archive'].search([('backup_id', '=', wizard.backup_id.id)])
+            wizard.file_ids = [(0, 0, {
+                'name': archive.name,
+                'size': archive.size,
+                'date': archive.date,
+                'download_url': f'/launchly_saas/download_backup?file={archive.name}&backup_id={wizard.backup_id.id}'
+            }) for archive in archives]
 
 class InstanceBackupFileLine(models.TransientModel):
     _name = 'instance.backup.file.line'
@@ -38,7 +25,7 @@ class InstanceBackupFileLine(models.TransientModel):
 
     wizard_id = fields.Many2one('instance.backup.file.wizard', string='Wizard')
     name = fields.Char('Filename')
-    size = fields.Integer('Size (bytes)')
+    size = fields.Float('Size (bytes)', digits=(16, 0))
     date = fields.Datetime('Date Modified')
     download_url = fields.Char('Download URL')
     download_html = fields.Html('Download', compute='_compute_download_html')
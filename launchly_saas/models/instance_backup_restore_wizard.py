@@ -0,0 +1,231 @@
+import os
+import shlex
+import shutil
+import subprocess
+import tempfile
+import time
+import zipfile
+import logging
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+
+from .backup_stream import (BlobStore, BLOB_STORE_DIR, CHUNK_SIZE, extract_dump_directory, extract_filestore,
+                            read_archive_manifest)
+from .odoo_instance import TENANT_DB_PASSWORD, run_systemctl
+from .pg_access import close_tenant_pool, terminate_pooled_connections_sql
+
+_logger = logging.getLogger(__name__)
+
+
+class InstanceBackupRestoreWizard(models.TransientModel):
+    _name = 'instance.backup.restore.wizard'
+    _description = 'Restore Instance Backup'
+
+    backup_id = fields.Many2one('odoo.instance.backup', string='Backup', required=True)
+    archive_id = fields.Many2one('odoo.instance.backup.archive', string='Backup File', required=True,
+                                 domain="[('backup_id', '=', backup_id)]",
+                                 default=lambda self: self._default_archive())
+    mode = fields.Selection([
+        ('replace', 'Replace an existing instance'),
+        ('new', 'Restore as a new instance'),
+    ], string='Restore Mode', default='replace', required=True)
+    instance_id = fields.Many2one('odoo.instance', string='Instance',
+                                  help='Instance whose database and filestore are replaced')
+    source_instance_id = fields.Many2one('odoo.instance', string='Copy Settings From',
+                                         help='The new instance gets the template, plan and owner of this instance')
+    new_instance_name = fields.Char(string='New Instance Name')
+    new_company_name = fields.Char(string='New Company Name',
+                                   help='Company of the new instance, its database name and role are derived from it')
+    jobs = fields.Integer(string='Restore Jobs', default=4,
+                          help='Parallel pg_restore jobs, only used for directory format backups')
+
+    @api.model
+    def _default_archive(self):
+        return self.env['odoo.instance.backup.archive'].search(
+            [('backup_id', '=', self.env.context.get('default_backup_id'))], limit=1)
+
+    @api.onchange('archive_id')
+    def _onchange_archive_id(self):
+        if self.archive_id.instance_id and not self.instance_id:
+            self.instance_id = self.archive_id.instance_id
+        if self.archive_id.instance_id and not self.source_instance_id:
+            self.source_instance_id = self.archive_id.instance_id
+
+    def _get_archive_path(self):
+        """Path of the selected archive, checked against the checksum recorded in the catalog"""
+        self.ensure_one()
+        self.archive_id._verify_checksum()
+        return self.archive_id.file_path
+
+    def action_restore(self):
+        self.ensure_one()
+        zip_path = self._get_archive_path()
+        if self.mode == 'replace':
+            if not self.instance_id:
+                raise UserError("Select the instance to replace")
+            instance = self.instance_id
+            if not instance.root_sudo_password:
+                raise UserError("A sudo password is required to restore an instance")
+        else:
+            if not self.source_instance_id or not self.new_instance_name or not self.new_company_name:
+                raise UserError("Set the new instance and company names and the instance to copy the settings from")
+            self._check_new_database()
+            if not self.source_instance_id.root_sudo_password:
+                raise UserError("A sudo password is required to restore an instance")
+            instance = self.source_instance_id.copy({
+                'name': self.new_instance_name,
+                'company_name': self.new_company_name,
+                'state': 'draft',
+                'http_port': False,
+                'longpolling_port': False,
+                'user_done': False,
+                'includes_subdomain': False,
+                'subdomain_name': False,
+            })
+            instance.add_to_log(f"[INFO] Provisioning instance to restore {os.path.basename(zip_path)}")
+            instance.create_odoo_environment()
+
+        self._restore_into(instance, zip_path)
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': 'odoo.instance',
+            'res_id': instance.id,
+            'view_mode': 'form',
+            'target': 'current',
+        }
+
+    def _check_new_database(self):
+        """Refuse a new instance whose database or role would be the one of an existing instance,
+        the restore would then drop the database of that instance"""
+        Instance = self.env['odoo.instance'].with_context(active_test=False)
+        new_instance = Instance.new({'company_name': self.new_company_name})
+        db_name, db_user = new_instance.database_name, new_instance._get_db_user()
+        if not db_name or not db_user:
+            raise UserError("The new company name must contain letters or digits")
+        owner = Instance.search([('database_name', '=', db_name)], limit=1)
+        if not owner:
+            owner = Instance.search([('company_name', '!=', False)]).filtered(
+                lambda instance: instance._get_db_user() == db_user)[:1]
+        if owner:
+            raise UserError(f"The database {db_name} of company '{self.new_company_name}' is already used by "
+                            f"instance {owner.name}, choose another company name")
+
+    def _run_tenant_psql(self, instance, env, *commands):
+        """Run SQL commands on the maintenance database as the tenant role (it owns the tenant databases)"""
+        cmd = ['psql', '-h', 'localhost', '-U', instance._get_db_user(), '-d', 'postgres', '-v', 'ON_ERROR_STOP=1']
+        for command in commands:
+            cmd += ['-c', command]
+        result = subprocess.run(cmd, env=env, capture_output=True, text=True, timeout=300)
+        if result.returncode != 0:
+            raise UserError(f"Database command failed: {result.stderr.strip()}")
+
+    def _restore_database(self, instance, zip_path, manifest, db_name, env):
+        """Restore the dump of the archive into a new database `db_name`"""
+        db_user = instance._get_db_user()
+        if manifest.get('launchly_dump_format') == 'directory':
+            with tempfile.TemporaryDirectory(dir=os.path.dirname(zip_path)) as staging:
+                dump_dir = extract_dump_directory(zip_path, os.path.join(staging, 'dump'))
+                cmd = ['pg_restore', '-h', 'localhost', '-U', db_user, '-d', db_name,
+                       '-j', str(max(self.jobs, 1)), '--no-owner', '--no-privileges', '--exit-on-error', dump_dir]
+                result = subprocess.run(cmd, env=env, capture_output=True, text=True)
+                if result.returncode != 0:
+                    raise UserError(f"pg_restore failed: {result.stderr.strip()}")
+            return
+
+        # Plain SQL dumps are single threaded: stream dump.sql from the archive into psql
+        cmd = ['psql', '-h', 'localhost', '-U', db_user, '-d', db_name, '-q', '-v', 'ON_ERROR_STOP=1', '-f', '-']
+        with tempfile.TemporaryFile() as stderr:
+            proc = subprocess.Popen(cmd, env=env, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr)
+            try:
+                with zipfile.ZipFile(zip_path) as zf, zf.open('dump.sql') as dump:
+                    shutil.copyfileobj(dump, proc.stdin, CHUNK_SIZE)
+            except BrokenPipeError:
+                # psql stopped on the first error, reported below
+                pass
+            finally:
+                proc.stdin.close()
+                returncode = proc.wait()
+            if returncode != 0:
+                stderr.seek(0)
+                raise UserError(f"psql restore failed: {stderr.read().decode(errors='replace').strip()}")
+
+    def _stage_filestore(self, instance, zip_path, db_name):
+        """Unpack the filestore of the archive next to the instance filestore, the instance keeps
+        running. A missing blob or a bad member fails here, before anything is replaced.
+
+        :returns: (staged filestore path, file count)
+        """
+        backup_dir = os.path.dirname(zip_path)
+        store = BlobStore(os.path.join(backup_dir, BLOB_STORE_DIR))
+        target = f'/opt/{instance.name}/data/filestore/{db_name}'
+        staged = f'{target}.restoring'
+        staging = tempfile.mkdtemp(dir=backup_dir, prefix=f'{instance.name}_filestore_')
+        try:
+            count = extract_filestore(zip_path, staging, store)
+            script = (f"rm -rf {shlex.quote(staged)} && "
+                      f"mkdir -p {shlex.quote(os.path.dirname(target))} && "
+                      f"cp -a {shlex.quote(staging)} {shlex.quote(staged)} && "
+                      f"chown -R {instance.name}:{instance.name} {shlex.quote(staged)}")
+            instance.excute_command_with_sudo(f"bash -c {shlex.quote(script)}")
+            return staged, count
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def _swap_filestore(self, instance, staged, db_name):
+        """Move the staged filestore in place of the instance filestore"""
+        target = f'/opt/{instance.name}/data/filestore/{db_name}'
+        previous = f'{target}.before_restore'
+        script = (f"rm -rf {shlex.quote(previous)} && "
+                  f"if [ -d {shlex.quote(target)} ]; then mv {shlex.quote(target)} {shlex.quote(previous)}; fi && "
+                  f"mv {shlex.quote(staged)} {shlex.quote(target)} && "
+                  f"rm -rf {shlex.quote(previous)}")
+        instance.excute_command_with_sudo(f"bash -c {shlex.quote(script)}")
+
+    def _restore_into(self, instance, zip_path):
+        """Replace the database and filestore of an instance with the content of a backup archive.
+
+        The dump is restored into a side database and the filestore unpacked next to the current
+        one first; the instance is only stopped and its database and filestore swapped once both
+        succeeded, so a broken archive leaves the instance as it was.
+        """
+        manifest = read_archive_manifest(zip_path)
+        db_name = instance.database_name
+        restoring_db = f"{db_name[:50]}_restoring"
+        env = os.environ.copy()
+        env['PGPASSWORD'] = TENANT_DB_PASSWORD
+        started = time.monotonic()
+        instance.add_to_log(f"[INFO] Restoring backup {os.path.basename(zip_path)} "
+                            f"({manifest.get('launchly_dump_format', 'plain')} dump)")
+        _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Restoring backup {zip_path}")
+
+        staged = None
+        try:
+            self._run_tenant_psql(instance, env, f'DROP DATABASE IF EXISTS "{restoring_db}"',
+                                  f'CREATE DATABASE "{restoring_db}" TEMPLATE template0')
+            self._restore_database(instance, zip_path, manifest, restoring_db, env)
+            instance.add_to_log(f"[INFO] Database restored in {round(time.monotonic() - started)}s")
+            staged, count = self._stage_filestore(instance, zip_path, db_name)
+
+            run_systemctl('stop', instance.name, instance.root_sudo_password, timeout=120)
+            instance.state = 'stopped'
+            # Pooled management connections, of this and the other workers, would prevent the
+            # database from being dropped
+            close_tenant_pool(db_name)
+            self._run_tenant_psql(instance, env, terminate_pooled_connections_sql(db_name),
+                                  f'DROP DATABASE IF EXISTS "{db_name}"',
+                                  f'ALTER DATABASE "{restoring_db}" RENAME TO "{db_name}"')
+
+            self._swap_filestore(instance, staged, db_name)
+            staged = None
+            instance.add_to_log(f"[INFO] Filestore restored: {count} files")
+        except Exception as e:
+            if staged:
+                instance.excute_command_with_sudo(f"rm -rf {shlex.quote(staged)}", check=False)
+            instance.add_to_log(f"[ERROR] Restore failed: {str(e)}")
+            _logger.error(f"[LAUNCHLY_SAAS - {instance.name}] Restore failed: {str(e)}")
+            raise UserError(f"Restore of {instance.name} failed: {str(e)}")
+
+        instance.start_instance()
+        instance.add_to_log(f"[SUCCESS] Backup restored in {round(time.monotonic() - started)}s")
+        _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Backup restored in {round(time.monotonic() - started)}s")
@@ -0,0 +1,107 @@
+import re
+import logging
+
+from markupsafe import Markup
+
+from odoo import models, fields, api, tools
+
+_logger = logging.getLogger(__name__)
+
+LOG_LEVELS = [
+    ('debug', 'Debug'),
+    ('info', 'Info'),
+    ('success', 'Success'),
+    ('warning', 'Warning'),
+    ('error', 'Error'),
+]
+# Messages are still written with their level as a "[INFO] ..." style prefix
+LEVEL_PREFIX_RE = re.compile(r'^\s*\[(DEBUG|INFO|SUCCESS|WARNING|WARN|ERROR)\]\s*', re.IGNORECASE)
+# Key of the pending entries in the precommit data of the cursor
+PENDING_KEY = 'launchly_saas.instance_log_entries'
+
+
+class OdooInstanceLog(models.Model):
+    _name = 'odoo.instance.log'
+    _description = 'Instance Log Entry'
+    _order = 'id desc'
+    # Append only: no write audit columns
+    _log_access = False
+
+    instance_id = fields.Many2one('odoo.instance', string='Instance', required=True, ondelete='cascade',
+                                  readonly=True)
+    date = fields.Datetime(string='Date', required=True, readonly=True, default=fields.Datetime.now)
+    level = fields.Selection(LOG_LEVELS, string='Level', required=True, default='info', readonly=True)
+    message = fields.Text(string='Message', readonly=True)
+    operation = fields.Char(string='Operation', readonly=True, index='btree_not_null',
+                            help='Reference of the operation (provisioning job, fleet operation...) the entry belongs to')
+
+    def init(self):
+        # Display and retention read the entries of one instance, newest first
+        tools.create_index(self._cr, 'odoo_instance_log_instance_id_id_idx', self._table,
+                           ['instance_id', 'id DESC'])
+
+    @api.model
+    def _parse_level(self, message):
+        """Split a "[LEVEL] message" string into its level and message"""
+        match = LEVEL_PREFIX_RE.match(message)
+        if not match:
+            return 'info', message
+        level = match.group(1).lower()
+        return ('warning' if level == 'warn' else level), message[match.end():]
+
+    @api.model
+    def _queue(self, instances, message, level=None):
+        """Queue an entry for each instance; the queued entries are inserted together before the commit.
+
+        Logging is called for every command output, queuing avoids one insert per line and
+        never touches the instance rows.
+        """
+        message = str(message)
+        parsed_level, text = self._parse_level(message)
+        precommit = self.env.cr.precommit
+        pending = precommit.data.get(PENDING_KEY)
+        if pending is None:
+            pending = precommit.data[PENDING_KEY] = []
+            precommit.add(self._flush_pending)
+        now = fields.Datetime.now()
+        operation = self.env.context.get('launchly_operation')
+        for instance in instances:
+            pending.append({
+                'instance_id': instance.id,
+                'date': now,
+                'level': level or parsed_level,
+                'message': text,
+                'operation': operation or False,
+            })
+
+    @api.model
+    def _flush_pending(self):
+        pending = self.env.cr.precommit.data.pop(PENDING_KEY, [])
+        if not pending:
+            return
+        # Instances deleted in the same transaction lose their entries
+        existing = set(self.env['odoo.instance'].browse({vals['instance_id'] for vals in pending}).exists().ids)
+        self.sudo().create([vals for vals in pending if vals['instance_id'] in existing])
+
+    @api.model
+    def _render_html(self, entries):
+        """HTML rendering of entries in the format of the former log field"""
+        return Markup('').join(
+            Markup("</br>\n#%s [%s] %s") % (fields.Datetime.to_string(entry.date), entry.level.upper(), entry.message)
+            for entry in entries
+        )
+
+    @api.model
+    def _cron_trim_entries(self):
+        """Keep only the newest entries of each instance, as set in the configuration"""
+        config = self.env['saas.config'].search([], limit=1)
+        max_entries = config.log_max_entries or 2000
+        self.env.cr.execute("""
+            DELETE FROM odoo_instance_log log
+             USING (SELECT id, row_number() OVER (PARTITION BY instance_id ORDER BY id DESC) AS position
+                      FROM odoo_instance_log) ranked
+             WHERE log.id = ranked.id
+               AND ranked.position > %s
+        """, (max_entries,))
+        if self.env.cr.rowcount:
+            _logger.info(f"[LAUNCHLY_SAAS] Removed {self.env.cr.rowcount} old instance log entries")
@@ -0,0 +1,188 @@
+import logging
+from datetime import datetime, timedelta, timezone
+
+from psycopg2.extras import execute_values
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+
+class OdooInstanceMetric(models.Model):
+    _name = 'odoo.instance.metric'
+    _description = 'Instance Resource Metric'
+    _order = 'bucket desc'
+    _rec_name = 'bucket'
+
+    # Tier: (bucket length in seconds, saas.config field holding the retention in days)
+    _TIERS = {
+        'minute': (60, 'metric_minute_retention_days'),
+        'hour': (3600, 'metric_hour_retention_days'),
+        'day': (86400, 'metric_day_retention_days'),
+    }
+    _METRICS = ('cpu_avg', 'cpu_max', 'memory_avg', 'memory_max', 'memory_bytes_avg',
+                'io_read_rate', 'io_write_rate', 'pids_max')
+
+    _sql_constraints = [
+        ('instance_tier_bucket_uniq', 'unique (instance_id, tier, bucket)',
+         'Only one metric row per instance, tier and bucket is allowed !'),
+    ]
+
+    instance_id = fields.Many2one('odoo.instance', string='Instance', required=True, ondelete='cascade',
+                                  index=True, readonly=True)
+    plan_id = fields.Many2one(related='instance_id.plan_id', string='Plan')
+    tier = fields.Selection([
+        ('minute', '1 Minute'),
+        ('hour', '1 Hour'),
+        ('day', '1 Day'),
+    ], string='Resolution', required=True, index=True, readonly=True)
+    bucket = fields.Datetime(string='Time', required=True, readonly=True)
+    sample_count = fields.Integer(string='Samples', readonly=True)
+    cpu_avg = fields.Float(string='CPU Avg (%)', readonly=True, aggregator='avg')
+    cpu_max = fields.Float(string='CPU Max (%)', readonly=True, aggregator='max')
+    memory_avg = fields.Float(string='Memory Avg (%)', readonly=True, aggregator='avg')
+    memory_max = fields.Float(string='Memory Max (%)', readonly=True, aggregator='max')
+    memory_bytes_avg = fields.Float(string='Memory Avg (bytes)', readonly=True, aggregator='avg')
+    io_read_rate = fields.Float(string='Disk Read (bytes/s)', readonly=True, aggregator='avg')
+    io_write_rate = fields.Float(string='Disk Write (bytes/s)', readonly=True, aggregator='avg')
+    pids_max = fields.Integer(string='PIDs Max', readonly=True, aggregator='max')
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS odoo_instance_metric_tier_bucket_idx
+                ON odoo_instance_metric (tier, bucket)
+        """)
+
+    @api.model
+    def _record_samples(self, samples):
+        """Merge raw samples into the minute rows of their instance, in the current transaction.
+
+        A minute row is created by its first sample and its averages and maximums updated by the
+        next ones, whatever process (cron or user request) took them.
+
+        :param samples: list of (instance_id, timestamp, cpu, memory_percent, memory_bytes,
+                        io_read_rate, io_write_rate, pids)
+        """
+        rows = [
+            (instance_id, datetime.fromtimestamp(timestamp - timestamp % 60, timezone.utc).replace(tzinfo=None),
+             cpu, cpu, memory_percent, memory_percent, memory_bytes, io_read_rate, io_write_rate, int(pids),
+             self.env.uid, self.env.uid)
+            for instance_id, timestamp, cpu, memory_percent, memory_bytes, io_read_rate, io_write_rate, pids
+            in samples
+        ]
+        if not rows:
+            return
+        execute_values(self.env.cr, """
+            INSERT INTO odoo_instance_metric AS m (
+                instance_id, tier, bucket, sample_count, cpu_avg, cpu_max, memory_avg, memory_max,
+                memory_bytes_avg, io_read_rate, io_write_rate, pids_max,
+                create_uid, create_date, write_uid, write_date)
+            VALUES %s
+            ON CONFLICT (instance_id, tier, bucket) DO UPDATE SET
+                sample_count = m.sample_count + 1,
+                cpu_avg = (m.cpu_avg * m.sample_count + EXCLUDED.cpu_avg) / (m.sample_count + 1),
+                cpu_max = GREATEST(m.cpu_max, EXCLUDED.cpu_max),
+                memory_avg = (m.memory_avg * m.sample_count + EXCLUDED.memory_avg) / (m.sample_count + 1),
+                memory_max = GREATEST(m.memory_max, EXCLUDED.memory_max),
+                memory_bytes_avg = (m.memory_bytes_avg * m.sample_count + EXCLUDED.memory_bytes_avg)
+                                   / (m.sample_count + 1),
+                io_read_rate = (m.io_read_rate * m.sample_count + EXCLUDED.io_read_rate) / (m.sample_count + 1),
+                io_write_rate = (m.io_write_rate * m.sample_count + EXCLUDED.io_write_rate) / (m.sample_count + 1),
+                pids_max = GREATEST(m.pids_max, EXCLUDED.pids_max),
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+        """, rows, template="""(%s, 'minute', %s, 1, %s, %s, %s, %s, %s, %s, %s, %s,
+                              %s, now() at time zone 'UTC', %s, now() at time zone 'UTC')""")
+        self.invalidate_model()
+
+    @api.model
+    def _rollup(self, source_tier, target_tier):
+        """Aggregate the completed buckets of source_tier into target_tier rows (sample weighted)"""
+        self.env.cr.execute("""
+            INSERT INTO odoo_instance_metric (
+                instance_id, tier, bucket, sample_count, cpu_avg, cpu_max, memory_avg, memory_max,
+                memory_bytes_avg, io_read_rate, io_write_rate, pids_max,
+                create_uid, create_date, write_uid, write_date)
+            SELECT instance_id, %(target)s, date_trunc(%(target)s, bucket), SUM(sample_count),
+                   SUM(cpu_avg * sample_count) / NULLIF(SUM(sample_count), 0), MAX(cpu_max),
+                   SUM(memory_avg * sample_count) / NULLIF(SUM(sample_count), 0), MAX(memory_max),
+                   SUM(memory_bytes_avg * sample_count) / NULLIF(SUM(sample_count), 0),
+                   SUM(io_read_rate * sample_count) / NULLIF(SUM(sample_count), 0),
+                   SUM(io_write_rate * sample_count) / NULLIF(SUM(sample_count), 0),
+                   MAX(pids_max),
+                   %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+              FROM odoo_instance_metric src
+             WHERE tier = %(source)s
+               -- leave a few minutes for the last minute rows of the bucket to be flushed
+               AND bucket < date_trunc(%(target)s, now() at time zone 'UTC' - interval '5 minutes')
+               -- watermark of each instance, read from the unique (instance_id, tier, bucket) index
+               AND bucket >= COALESCE(
+                   (SELECT MAX(t.bucket) FROM odoo_instance_metric t
+                     WHERE t.instance_id = src.instance_id AND t.tier = %(target)s) + %(step)s,
+                   '-infinity'::timestamp)
+             GROUP BY instance_id, date_trunc(%(target)s, bucket)
+            ON CONFLICT (instance_id, tier, bucket) DO NOTHING
+        """, {
+            'source': source_tier,
+            'target': target_tier,
+            'step': timedelta(seconds=self._TIERS[target_tier][0]),
+            'uid': self.env.uid,
+        })
+        return self.env.cr.rowcount
+
+    @api.model
+    def _cron_rollup_metrics(self):
+        """Roll minute rows up into hours and hours into days, then apply the retention of each tier"""
+        hours = self._rollup('minute', 'hour')
+        days = self._rollup('hour', 'day')
+
+        config = self.env['saas.config'].search([], limit=1)
+        removed = 0
+        for tier, (step, retention_field) in self._TIERS.items():
+            retention_days = config[retention_field] if config else 0
+            if retention_days <= 0:
+                continue
+            self.env.cr.execute(
+                "DELETE FROM odoo_instance_metric WHERE tier = %s AND bucket < %s",
+                (tier, fields.Datetime.now() - timedelta(days=retention_days)))
+            removed += self.env.cr.rowcount
+        self.invalidate_model()
+        _logger.info(f"[LAUNCHLY_SAAS] Metrics rollup: {hours} hour rows, {days} day rows, {removed} expired rows removed")
+
+    @api.model
+    def get_metric_series(self, instance_ids, metric='cpu_avg', tier='hour', date_from=None, date_to=None):
+        """Return aligned series of one metric for many instances.
+
+        :returns: {'buckets': [iso datetimes], 'series': {instance_id: [value or None per bucket]}}
+        """
+        if metric not in self._METRICS:
+            raise ValueError(f"Unknown metric '{metric}'")
+        step = timedelta(seconds=self._TIERS[tier][0])
+        date_to = fields.Datetime.to_datetime(date_to) or fields.Datetime.now()
+        date_from = fields.Datetime.to_datetime(date_from) or date_to - step * 60
+
+        # Buckets are aligned on the tier length (UTC), like date_trunc in the rollups
+        epoch = datetime(1970, 1, 1)
+        first = epoch + step * ((date_from - epoch) // step)
+        buckets = []
+        bucket = first
+        while bucket <= date_to:
+            buckets.append(bucket)
+            bucket += step
+        positions = {bucket: index for index, bucket in enumerate(buckets)}
+
+        series = {instance_id: [None] * len(buckets) for instance_id in instance_ids}
+        self.env.cr.execute(f"""
+            SELECT instance_id, bucket, {metric}
+              FROM odoo_instance_metric
+             WHERE tier = %s AND instance_id IN %s AND bucket >= %s AND bucket <= %s
+        """, (tier, tuple(instance_ids) or (0,), first, date_to))
+        for instance_id, bucket, value in self.env.cr.fetchall():
+            index = positions.get(bucket)
+            if index is not None:
+                series[instance_id][index] = value
+
+        return {
+            'buckets': [fields.Datetime.to_string(bucket) for bucket in buckets],
+            'series': series,
+        }
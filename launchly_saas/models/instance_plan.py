@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 from odoo import models, fields, api
 
 class InstancePlan(models.Model):
@@ -8,6 +10,21 @@ class InstancePlan(models.Model):
     is_demo = fields.Boolean(string='Create with Demo Data', default=False)
     allowed_users_count = fields.Integer(string='Allowed Users Count', default=1)
     allowed_modules_count = fields.Integer(string='Allowed Modules Count', default=100)
+    use_golden_db = fields.Boolean(string='Clone From Golden Database', default=True,
+                                   help='Clone new instances from the ready golden database of the template '
+                                        'instead of initializing the database from scratch.')
+    hibernate_after_hours = fields.Integer(string='Hibernate After Idle (hours)', default=0,
+                                           help='Instances of this plan without user activity for this long are '
+                                                'stopped and started again by their next web request. '
+                                                '0 keeps them running.')
+    avg_cpu_usage = fields.Float(string='Avg CPU per Instance (%)', compute='_compute_resource_profile',
+                                 help='Average CPU usage of the instances of this plan over the last 7 days')
+    peak_cpu_usage = fields.Float(string='Peak CPU per Instance (%)', compute='_compute_resource_profile',
+                                  help='Highest hourly CPU peak of an instance of this plan over the last 7 days')
+    avg_memory_usage = fields.Float(string='Avg Memory per Instance (%)', compute='_compute_resource_profile',
+                                    help='Average memory usage of the instances of this plan over the last 7 days')
+    peak_memory_usage = fields.Float(string='Peak Memory per Instance (%)', compute='_compute_resource_profile',
+                                     help='Highest hourly memory peak of an instance of this plan over the last 7 days')
     template_id = fields.Many2one(
         'odoo.template',
         string='odoo Compose Template',
@@ -20,6 +37,37 @@ class InstancePlan(models.Model):
         store=True
     )
 
+    def _compute_resource_profile(self):
+        """Resource profile of the plan from the hourly metrics history, used for instance placement"""
+        groups = self.env['odoo.instance.metric']._read_group(
+            [('tier', '=', 'hour'),
+             ('instance_id.plan_id', 'in', self.ids),
+             ('bucket', '>=', fields.Datetime.now() - timedelta(days=7))],
+            ['instance_id'],
+            ['__count', 'cpu_avg:avg', 'cpu_max:max', 'memory_avg:avg', 'memory_max:max'],
+        )
+        # plan id -> [rows, cpu sum, cpu peak, memory sum, memory peak]
+        profiles = {}
+        for instance, count, cpu_avg, cpu_max, memory_avg, memory_max in groups:
+            profile = profiles.setdefault(instance.plan_id.id, [0, 0.0, 0.0, 0.0, 0.0])
+            profile[0] += count
+            profile[1] += (cpu_avg or 0.0) * count
+            profile[2] = max(profile[2], cpu_max or 0.0)
+            profile[3] += (memory_avg or 0.0) * count
+            profile[4] = max(profile[4], memory_max or 0.0)
+        for plan in self:
+            count, cpu_sum, cpu_max, memory_sum, memory_max = profiles.get(plan.id, (0, 0.0, 0.0, 0.0, 0.0))
+            plan.avg_cpu_usage = cpu_sum / count if count else 0.0
+            plan.peak_cpu_usage = cpu_max
+            plan.avg_memory_usage = memory_sum / count if count else 0.0
+            plan.peak_memory_usage = memory_max
+
+    def action_view_metrics(self):
+        self.ensure_one()
+        action = self.env['ir.actions.actions']._for_xml_id('launchly_saas.action_odoo_instance_metric')
+        action['domain'] = [('plan_id', '=', self.id)]
+        return action
+
     @api.depends('template_id')
     def _compute_config_id(self):
         for record in self:
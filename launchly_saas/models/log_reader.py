@@ -0,0 +1,92 @@
+import json
+import os
+import subprocess
+from datetime import datetime
+
+# Size of the blocks read backwards from the end of a log file
+TAIL_BLOCK_SIZE = 64 * 1024
+# New log file content read at once when following; beyond that only the end is shown
+MAX_FOLLOW_BYTES = 1024 * 1024
+
+
+def _file_cursor(stat, offset):
+    """Position in a log file, bound to its inode so that a rotated file is read from the start"""
+    return f"{stat.st_ino}:{offset}"
+
+
+def tail_file(path, max_lines=200):
+    """Last `max_lines` lines of a file, read backwards block by block from its end.
+
+    :returns: (text, cursor) where the cursor is the position to follow the file from
+    """
+    with open(path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        end = position = stat.st_size
+        data = b''
+        # One more line than wanted: the first one is usually cut by the block boundary
+        while position > 0 and data.count(b'\n') <= max_lines:
+            step = min(TAIL_BLOCK_SIZE, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    lines = data.splitlines(keepends=True)[-max_lines:]
+    return b''.join(lines).decode('utf-8', errors='replace'), _file_cursor(stat, end)
+
+
+def follow_file(path, cursor):
+    """Content appended to a file since `cursor` (from tail_file or a previous call).
+
+    A rotated or truncated file is read again from its start. When more than MAX_FOLLOW_BYTES
+    were written in between, only the last lines are returned.
+
+    :returns: (text, new cursor)
+    """
+    inode, _sep, offset = (cursor or '').partition(':')
+    with open(path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        offset = int(offset) if offset.isdigit() and inode == str(stat.st_ino) else 0
+        if offset > stat.st_size:
+            offset = 0
+        if stat.st_size - offset > MAX_FOLLOW_BYTES:
+            return tail_file(path)
+        f.seek(offset)
+        data = f.read(stat.st_size - offset)
+    # Keep an unfinished last line for the next call
+    complete = data.rfind(b'\n') + 1
+    return data[:complete].decode('utf-8', errors='replace'), _file_cursor(stat, offset + complete)
+
+
+def read_journal(service, sudo_password=None, after_cursor=None, lines=100, timeout=30):
+    """Journal entries of a systemd service as text lines, with the cursor of the last entry.
+
+    Without a cursor the last `lines` entries are returned, otherwise only the entries written
+    after it (at most `lines` too).
+
+    :returns: (text, cursor), the cursor is unchanged when there is no new entry
+    """
+    cmd = ['journalctl', '-u', service, '-o', 'json', '--no-pager', '-n', str(lines)]
+    if after_cursor:
+        cmd.append(f'--after-cursor={after_cursor}')
+    if sudo_password:
+        result = subprocess.run(['sudo', '-S'] + cmd, input=f'{sudo_password}\n', capture_output=True, text=True,
+                                timeout=timeout)
+    else:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(result.returncode, cmd, result.stdout, result.stderr)
+
+    text_lines = []
+    cursor = after_cursor
+    for raw in result.stdout.splitlines():
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            continue
+        message = entry.get('MESSAGE') or ''
+        if isinstance(message, list):
+            # Binary messages are exported as byte arrays
+            message = bytes(message).decode('utf-8', errors='replace')
+        timestamp = datetime.fromtimestamp(int(entry.get('__REALTIME_TIMESTAMP', 0)) / 1e6)
+        text_lines.append(f"{timestamp:%Y-%m-%d %H:%M:%S} {message}\n")
+        cursor = entry.get('__CURSOR') or cursor
+    return ''.join(text_lines), cursor
@@ -1,4 +1,4 @@
-from odoo import models, fields, api
+from odoo import models, fields
 
 class OdooAddonLine(models.Model):
     _name = 'odoo.addon.line'
@@ -18,6 +18,10 @@ class OdooAddonLine(models.Model):
     display_name = fields.Char(string='Display Name')
     # Add more fields as needed (e.g., author, website, etc.)
 
+    _sql_constraints = [
+        ('instance_name_uniq', 'unique (instance_id, name)', 'An addon can only be listed once per instance !'),
+    ]
+
     def action_install(self):
         for addon in self:
             if addon.state != 'installed':
@@ -29,22 +33,3 @@ class OdooAddonLine(models.Model):
             if addon.state == 'installed':
                 addon.instance_id.uninstall_addon_in_odoo([addon.name])
                 addon.state = 'uninstalled'
-
-    @api.model
-    def cron_cleanup_duplicates(self):
-        """
-        Delete duplicate addon lines with same name, version and license.
-        Keeps the first created one.
-        """
-        # group by name, version, license and get first IDs
-        self.env.cr.execute("""
-                    SELECT MIN(id) as keep_id, name, license
-                    FROM odoo_addon_line
-                    GROUP BY name, license
-                """)
-        keep_ids = [row[0] for row in self.env.cr.fetchall()]
-
-        # delete all except the ones we keep
-        duplicates = self.search([('id', 'not in', keep_ids)])
-        if duplicates:
-            duplicates.unlink()
\ No newline at end of file
@@ -1,6 +1,5 @@
 import logging
 import os
-import socket
 import subprocess
 import secrets
 import string
@@ -11,13 +10,64 @@ import shutil
 import pytz
 import re
 import json
+import shlex
 import psycopg2
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from cryptography import x509
 from psycopg2 import sql
+from psycopg2.errors import LockNotAvailable
+from psycopg2.extras import execute_values
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError, UserError
+from .pg_access import tenant_cursor, close_tenant_pool, terminate_pooled_connections_sql
+from .log_reader import follow_file, read_journal, tail_file
 
 _logger = logging.getLogger(__name__)
 
+# cgroup v2 directory holding one sub-cgroup per systemd service
+CGROUP_SERVICES_ROOT = '/sys/fs/cgroup/system.slice'
+# Password of the PostgreSQL role owning each instance database (standardized by the installer)
+TENANT_DB_PASSWORD = 'adminpwd'
+# Service log display: lines loaded by a full refresh, and lines kept while following
+LOG_TAIL_LINES = 200
+JOURNAL_TAIL_LINES = 100
+LOG_DISPLAY_MAX_LINES = 2000
+# How long a log viewer keeps the instance followed after its last ping
+LOG_FOLLOW_WINDOW = timedelta(minutes=2)
+# Users who logged in within this window count as active
+ACTIVE_USERS_WINDOW = timedelta(days=1)
+# Seconds a request to a hibernated instance waits for the service to answer
+WAKE_TIMEOUT = 90
+# Installed modules read from an instance database are reused for this many seconds
+INSTALLED_MODULES_TTL = 30
+# Instance databases read at the same time when refreshing installed modules
+INSTALLED_MODULES_WORKERS = 8
+
+# {database name: (time.monotonic() of the read, frozenset of installed module names)}
+_installed_modules_cache = {}
+
+
+def _read_installed_modules(dsn):
+    with tenant_cursor(dsn) as cr:
+        cr.execute("SELECT name FROM ir_module_module WHERE state IN ('installed', 'to upgrade', 'to remove')")
+        return frozenset(name for name, in cr.fetchall())
+
+
+def run_systemctl(action, service, sudo_password, timeout=None):
+    """Run `systemctl <action> <service>` through sudo, raises CalledProcessError or TimeoutExpired.
+
+    Plain function (no ORM access) so that it can also run in fleet operation worker threads.
+    """
+    return subprocess.run(
+        ['sudo', '-S', 'systemctl', action, service],
+        input=f"{sudo_password}\n",
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=timeout,
+    )
+
 
 class OdooInstance(models.Model):
     _name = 'odoo.instance'
@@ -28,8 +78,8 @@ class OdooInstance(models.Model):
     active = fields.Boolean(default=True)
 
     state = fields.Selection(
-        [('draft', 'Draft'), ('stopped', 'Stopped'), ('running', 'Running'), ('installing', 'Installing'),
-         ('installed', 'Installed'), ('error', 'Error')],
+        [('draft', 'Draft'), ('stopped', 'Stopped'), ('hibernated', 'Hibernated'), ('running', 'Running'),
+         ('installing', 'Installing'), ('installed', 'Installed'), ('error', 'Error')],
         string='State', default='draft')
 
     # User Information Fields
@@ -49,10 +99,21 @@ class OdooInstance(models.Model):
 
     http_port = fields.Char(string='HTTP Port')
     longpolling_port = fields.Char(string='Longpolling Port')
+    port_lease_ids = fields.One2many('odoo.port.lease', 'instance_id', string='Port Leases', readonly=True)
     instance_url = fields.Char(string='Instance URL', compute='_compute_instance_url', store=True)
     custom_addon_line = fields.One2many('custom.addon.line', 'instance_id', string='Custom Addons')
-    log = fields.Html(string='Log')
+    log_entry_ids = fields.One2many('odoo.instance.log', 'instance_id', string='Log Entries', readonly=True,
+                                    copy=False)
+    log = fields.Html(string='Log', compute='_compute_log', sanitize=False,
+                      help="Latest log entries, the full history is in the log entries")
     odoo_logs = fields.Text(string='Odoo Service Logs', readonly=True)
+    journal_cursor = fields.Char(string='Journal Cursor', readonly=True, copy=False,
+                                 help="journalctl cursor of the last service log entry shown")
+    log_file_cursor = fields.Char(string='Log File Cursor', readonly=True, copy=False,
+                                  help="Inode and offset of the log file already shown")
+    log_follow_until = fields.Datetime(string='Follow Logs Until', readonly=True, copy=False)
+    log_follower_ids = fields.Many2many('res.partner', 'odoo_instance_log_follower_rel', 'instance_id', 'partner_id',
+                                        string='Log Viewers', readonly=True, copy=False)
     odoo_conf_content = fields.Text(string='Odoo Configuration File Content',
                                     help="Content of the odoo.conf file")
     addons_path = fields.Char(string='Addons Path', related='template_id.source_path', store=True)
@@ -63,6 +124,8 @@ class OdooInstance(models.Model):
     root_sudo_password = fields.Char(string='Root Sudo Password', related='config_id.sudo_password')
     user_done = fields.Boolean(string='User Setup Done', default=False,
                                help="Indicates if user setup script has been successfully executed")
+    bridge_token = fields.Char(string='Management Bridge Token', readonly=True, copy=False, groups='base.group_system',
+                               help="Shared secret used to call the management bridge addon of the instance")
     is_demo = fields.Boolean(string='Create with Demo Data', default=False,
                              help="If enabled, the database will be created with demo data")
     prevent_installing_modules = fields.Boolean(string='Prevent Installing Modules', default=False,
@@ -72,12 +135,17 @@ class OdooInstance(models.Model):
     http_ip = fields.Char(related='config_id.http_ip')
     # Active Users Tracking
     active_users_count = fields.Integer(string='Active Users Count', default=0,
-                                        help="Number of users active in the last 10 minutes")
+                                        help="Number of users who logged in during the last day")
     user_activity_status = fields.Selection([
         ('inactive', 'Inactive'),
         ('active', 'Active')
     ], string='User Activity Status', default='inactive',
-        help="Status based on user activity in the last 10 minutes")
+        help="Status based on user logins during the last day")
+    last_activity_date = fields.Datetime(string='Last Activity', readonly=True, copy=False,
+                                         help="Last login or presence of a user in the instance, or last start of its service")
+    hibernated_since = fields.Datetime(string='Hibernated Since', readonly=True, copy=False)
+    wake_token = fields.Char(string='Wake-up Token', readonly=True, copy=False, groups='base.group_system',
+                             help="Secret of the wake-up URL called by nginx when the instance is hibernated")
 
     # Subdomain Fields
     includes_subdomain = fields.Boolean(string='Include Subdomain', default=False,
@@ -88,8 +156,14 @@ class OdooInstance(models.Model):
                                help="HTTPS URL with custom domain")
     nginx_config_path = fields.Char(string='Nginx Config Path', compute='_compute_nginx_config_path', store=True,
                                     help="Path to the Nginx configuration file")
-    ssl_certificate_expiry = fields.Datetime(string='SSL Certificate Expiry', compute='_compute_ssl_certificate_expiry',
-                                             help="SSL certificate expiration date")
+    ssl_certificate_expiry = fields.Datetime(string='SSL Certificate Expiry', readonly=True, copy=False,
+                                             help="SSL certificate expiration date, refreshed daily")
+    ssl_certificate_state = fields.Selection([
+        ('none', 'No Certificate'),
+        ('valid', 'Valid'),
+        ('expiring', 'Expiring Soon'),
+        ('expired', 'Expired'),
+    ], string='SSL Certificate Status', default='none', readonly=True, copy=False, index=True)
     config_id = fields.Many2one(
         'saas.config',
         string='Configuration',
@@ -130,6 +204,16 @@ class OdooInstance(models.Model):
     net_io = fields.Char(string="Network I/O", readonly=True, help="Network I/O usage")
     block_io = fields.Char(string="Block I/O", readonly=True, help="Block I/O usage")
     pids_count = fields.Integer(string="PIDs", readonly=True, help="Number of PIDs used by instance service")
+    db_connections_count = fields.Integer(string="DB Connections", readonly=True,
+                                          help="Open connections to the instance database")
+    cpu_usage_usec = fields.Float(string="CPU Time (usec)", readonly=True, copy=False,
+                                  help="Cumulative cgroup CPU time at the last resource sample")
+    resource_sampled_at = fields.Float(string="Last Resource Sample", readonly=True, copy=False,
+                                       help="Unix timestamp of the last cgroup resource sample")
+    io_read_bytes = fields.Float(string="Disk Read (bytes)", readonly=True, copy=False,
+                                 help="Cumulative cgroup disk reads at the last resource sample")
+    io_write_bytes = fields.Float(string="Disk Write (bytes)", readonly=True, copy=False,
+                                  help="Cumulative cgroup disk writes at the last resource sample")
 
     # Helper computed fields for progress bars (0-100)
     cpu_usage_bar = fields.Integer(string="CPU Usage Bar (%)", compute="_compute_cpu_usage_bar", store=False)
@@ -188,7 +272,62 @@ class OdooInstance(models.Model):
 
         return f"{int(size)}{units[unit_index]}" if size == int(size) else f"{size:.1f}{units[unit_index]}"
 
+    def _get_db_user(self):
+        """PostgreSQL role owning the instance database, standardized from the company name"""
+        self.ensure_one()
+        # Lowercase, remove all non-alphanumeric characters
+        return re.sub(r'[^0-9A-Za-z]+', '', self.company_name or "").lower()
+
+    def _get_tenant_dsn(self):
+        """Connection parameters of the instance database, with the instance role"""
+        self.ensure_one()
+        return {
+            'dbname': self.database_name,
+            'user': self._get_db_user(),
+            'password': TENANT_DB_PASSWORD,
+            'host': 'localhost',
+            'connect_timeout': 5,
+        }
+
+    def _tenant_cursor(self):
+        """Cursor on a pooled connection to the instance database"""
+        self.ensure_one()
+        return tenant_cursor(self._get_tenant_dsn())
+
+    def _get_tenant_storage_bytes(self):
+        """Return (database bytes, filestore bytes) from the instance database, None if unreachable.
+
+        The filestore size is the sum of the stored attachment sizes, each file counted once since
+        attachments with the same content share their store_fname. This costs one indexed query
+        instead of walking the filestore tree with du.
+        """
+        self.ensure_one()
+        if not self.database_name or not self.company_name:
+            return None
+        try:
+            with self._tenant_cursor() as cr:
+                cr.execute("""
+                    SELECT pg_database_size(current_database()),
+                           COALESCE((SELECT SUM(file_size)
+                                       FROM (SELECT DISTINCT ON (store_fname) file_size
+                                               FROM ir_attachment
+                                              WHERE store_fname IS NOT NULL
+                                              ORDER BY store_fname) AS files), 0)
+                """)
+                db_bytes, filestore_bytes = cr.fetchone()
+            return int(db_bytes), int(filestore_bytes)
+        except psycopg2.Error as e:
+            _logger.info(f"[LAUNCHLY_SAAS - {self.name}] Cannot read storage usage from instance database: {str(e)}")
+            return None
+
     def _get_filestore_size(self):
+        """Get the size of the filestore, from the attachments table or with du as a fallback."""
+        storage = self._get_tenant_storage_bytes()
+        if storage is not None:
+            return self._bytes_to_human_readable(storage[1])
+        return self._get_filestore_size_from_disk()
+
+    def _get_filestore_size_from_disk(self):
         """Get the size of the filestore directory."""
         try:
             filestore_path = f'/opt/{self.name}/data/filestore/{self.database_name}'
@@ -218,29 +357,22 @@ class OdooInstance(models.Model):
 
     def _get_db_size(self):
         """Fetch database size and filestore size, return combined information."""
+        storage = self._get_tenant_storage_bytes()
+        if storage is not None:
+            db_size = self._bytes_to_human_readable(storage[0])
+            filestore_size = self._bytes_to_human_readable(storage[1])
+            total_size = self._bytes_to_human_readable(sum(storage))
+            return f"{total_size} ({db_size} + {filestore_size} filestore)"
+
         try:
             db_name = self.database_name or self.name
             if not db_name:
                 return "N/A"
 
-            # Check if database exists
-            check_cmd = f"-u postgres psql -d postgres -t -c \"SELECT 1 FROM pg_database WHERE datname = '{db_name}';\""
-            check_result = self.excute_command_with_sudo(check_cmd, check=False)
-
-            if check_result.returncode != 0 or not check_result.stdout.strip():
-                filestore_size = self._get_filestore_size()
-                total_size = self._calculate_total_storage_size("0B", filestore_size)
-                return f"{total_size} (0B + {filestore_size} filestore)"
-
-            # Get database size
-            query_cmd = f"-u postgres psql -d postgres -t -c \"SELECT pg_size_pretty(pg_database_size('{db_name}'));\""
-            db_result = self.excute_command_with_sudo(query_cmd, check=False)
-
-            if db_result.returncode != 0:
-                return "N/A"
-
-            db_size = db_result.stdout.strip() or "0B"
-            filestore_size = self._get_filestore_size()
+            # Size of the database from the server statistics, the database may not exist (yet)
+            stats = self.env['launchly.postgres']._get_database_stats([db_name]).get(db_name)
+            db_size = self._bytes_to_human_readable(stats['size'] or 0) if stats else "0B"
+            filestore_size = self._get_filestore_size_from_disk()
             total_size = self._calculate_total_storage_size(db_size, filestore_size)
 
             return f"{total_size} ({db_size} + {filestore_size} filestore)"
@@ -248,6 +380,41 @@ class OdooInstance(models.Model):
         except Exception:
             return "N/A"
 
+    def _refresh_database_stats(self):
+        """Refresh storage usage and database connections of many instances at once.
+
+        Database sizes and connection counts come from one query on the server statistics,
+        the filestore size from one pooled query per instance database.
+        """
+        instances = self.filtered('database_name')
+        stats = self.env['launchly.postgres']._get_database_stats(instances.mapped('database_name'))
+        rows = []
+        for instance in instances:
+            db_stats = stats.get(instance.database_name)
+            if not db_stats:
+                continue
+            # The database is reachable whatever the state of the Odoo service, du is only a fallback
+            storage = instance._get_tenant_storage_bytes()
+            db_bytes = db_stats['size'] or 0
+            filestore = self._bytes_to_human_readable(storage[1]) if storage else instance._get_filestore_size_from_disk()
+            db_size = self._bytes_to_human_readable(db_bytes)
+            total_size = self._calculate_total_storage_size(db_size, filestore)
+            rows.append((instance.id, f"{total_size} ({db_size} + {filestore} filestore)", db_stats['connections']))
+
+        if rows:
+            execute_values(self.env.cr, """
+                UPDATE odoo_instance AS i
+                   SET storage_usage = v.storage_usage,
+                       db_connections_count = v.connections
+                  FROM (VALUES %s) AS v(id, storage_usage, connections)
+                 WHERE i.id = v.id
+            """, rows)
+            self.browse([row[0] for row in rows]).invalidate_recordset(['storage_usage', 'db_connections_count'])
+
+    @api.model
+    def _cron_refresh_database_stats(self):
+        self.search([('state', 'in', ('running', 'stopped', 'hibernated'))])._refresh_database_stats()
+
     def get_instance_resource_usage(self):
         self.ensure_one()
         usage = {
@@ -319,8 +486,150 @@ class OdooInstance(models.Model):
 
         return usage
 
-    def update_resource_fields(self):
+    @api.model
+    def _read_host_memory_total(self):
+        """Total host memory in bytes, from /proc/meminfo"""
+        try:
+            with open('/proc/meminfo') as meminfo:
+                for line in meminfo:
+                    if line.startswith('MemTotal:'):
+                        return int(line.split()[1]) * 1024
+        except (OSError, ValueError):
+            pass
+        return 0
+
+    def _read_cgroup_usage(self):
+        """Read the raw cgroup v2 counters of the instance service, None when not available.
+
+        The cgroup files are world readable, so no process (and no sudo) is needed.
+        """
+        self.ensure_one()
+        cgroup_path = os.path.join(CGROUP_SERVICES_ROOT, f"{self.name}.service")
+        if not os.path.isdir(cgroup_path):
+            return None
+
+        def read(filename):
+            with open(os.path.join(cgroup_path, filename)) as cgroup_file:
+                return cgroup_file.read()
+
+        try:
+            usage = {'cpu_usec': 0, 'memory': 0, 'memory_max': 0, 'io_read': 0, 'io_write': 0, 'pids': 0}
+            for line in read('cpu.stat').splitlines():
+                key, value = line.split()
+                if key == 'usage_usec':
+                    usage['cpu_usec'] = int(value)
+                    break
+            usage['memory'] = int(read('memory.current').strip())
+            memory_max = read('memory.max').strip()
+            usage['memory_max'] = int(memory_max) if memory_max.isdigit() else 0
+            usage['pids'] = int(read('pids.current').strip())
+            # io.stat: one line per device, e.g. "8:0 rbytes=1 wbytes=2 rios=3 wios=4 ..."
+            for line in read('io.stat').splitlines():
+                for stat_item in line.split()[1:]:
+                    key, _sep, value = stat_item.partition('=')
+                    if key == 'rbytes':
+                        usage['io_read'] += int(value)
+                    elif key == 'wbytes':
+                        usage['io_write'] += int(value)
+        except (OSError, ValueError) as e:
+            _logger.warning(f"[LAUNCHLY_SAAS - {self.name}] Failed to read cgroup stats: {str(e)}")
+            return None
+        return usage
+
+    def _sample_resources(self):
+        """Sample CPU, memory, block I/O and PIDs of all instances in one pass and bulk write them.
+
+        CPU percent is computed from the cgroup CPU time delta since the previous sample
+        (100% = one core busy), disk rates from the I/O counter deltas. The samples are merged
+        into the minute metric rows in the same transaction. Returns the instances without a
+        cgroup (stopped, or cgroup v1 hosts) which must fall back to the process based
+        `get_instance_resource_usage`.
+        """
+        mem_total = self._read_host_memory_total()
+        mib = 1024 * 1024
+        rows = []
+        samples = []
+        fallback = self.browse()
         for instance in self:
+            usage = instance._read_cgroup_usage() if instance.state == 'running' else None
+            if usage is None:
+                fallback |= instance
+                continue
+            now = time.time()
+            cpu_percent = 0.0
+            elapsed = now - (instance.resource_sampled_at or 0.0)
+            cpu_delta = usage['cpu_usec'] - (instance.cpu_usage_usec or 0.0)
+            # No previous sample, or the service restarted and its counter was reset
+            if instance.resource_sampled_at and elapsed > 0 and cpu_delta >= 0:
+                cpu_percent = round(cpu_delta / (elapsed * 1000000) * 100, 2)
+            io_read_rate = io_write_rate = 0.0
+            io_read_delta = usage['io_read'] - (instance.io_read_bytes or 0.0)
+            io_write_delta = usage['io_write'] - (instance.io_write_bytes or 0.0)
+            if instance.resource_sampled_at and elapsed > 0 and io_read_delta >= 0 and io_write_delta >= 0:
+                io_read_rate = io_read_delta / elapsed
+                io_write_rate = io_write_delta / elapsed
+            memory_limit = usage['memory_max'] or mem_total
+            rows.append((
+                instance.id,
+                cpu_percent,
+                round(usage['memory'] * 100.0 / mem_total, 2) if mem_total else 0.0,
+                f"{usage['memory'] // mib}MiB / {memory_limit // mib}MiB",
+                f"{self._bytes_to_human_readable(usage['io_read'])} / "
+                f"{self._bytes_to_human_readable(usage['io_write'])}",
+                usage['pids'],
+                float(usage['cpu_usec']),
+                now,
+                float(usage['io_read']),
+                float(usage['io_write']),
+            ))
+            samples.append((instance.id, now, rows[-1][1], rows[-1][2], usage['memory'],
+                            io_read_rate, io_write_rate, usage['pids']))
+
+        if rows:
+            execute_values(self.env.cr, """
+                UPDATE odoo_instance AS i
+                   SET cpu_usage_percent = v.cpu,
+                       memory_usage_percent = v.mem_percent,
+                       memory_usage = v.mem_usage,
+                       block_io = v.block_io,
+                       pids_count = v.pids,
+                       cpu_usage_usec = v.cpu_usec,
+                       resource_sampled_at = v.sampled_at,
+                       io_read_bytes = v.io_read,
+                       io_write_bytes = v.io_write
+                  FROM (VALUES %s) AS v(id, cpu, mem_percent, mem_usage, block_io, pids, cpu_usec, sampled_at,
+                                        io_read, io_write)
+                 WHERE i.id = v.id
+            """, rows)
+            self.browse([row[0] for row in rows]).invalidate_recordset([
+                'cpu_usage_percent', 'memory_usage_percent', 'memory_usage', 'block_io', 'pids_count',
+                'cpu_usage_usec', 'resource_sampled_at', 'io_read_bytes', 'io_write_bytes',
+            ])
+            self.env['odoo.instance.metric']._record_samples(samples)
+        return fallback
+
+    @api.model
+    def _cron_sample_resources(self):
+        """Refresh the usage fields of every running instance"""
+        instances = self.search([('state', '=', 'running')])
+        fallback = instances._sample_resources()
+        if fallback:
+            # The process based sampling is too expensive to run fleet wide, it stays on demand only
+            _logger.info(f"[LAUNCHLY_SAAS] {len(fallback)} running instances without cgroup stats, "
+                         f"use 'Get Resources' to refresh them")
+
+    def action_view_metrics(self):
+        self.ensure_one()
+        action = self.env['ir.actions.actions']._for_xml_id('launchly_saas.action_odoo_instance_metric')
+        action['domain'] = [('instance_id', '=', self.id)]
+        action['context'] = {'search_default_tier_minute': 1, 'default_instance_id': self.id}
+        return action
+
+    def update_resource_fields(self):
+        """Refresh the usage fields, from cgroup stats when available, and the storage usage"""
+        fallback = self._sample_resources()
+        (self - fallback)._refresh_database_stats()
+        for instance in fallback:
             usage = instance.get_instance_resource_usage()
             instance.cpu_usage_percent = usage["cpu"]
             instance.memory_usage_percent = usage["mem_percent"]
@@ -351,11 +660,6 @@ class OdooInstance(models.Model):
             else:
                 record.config_id = False
 
-    @api.onchange('name')
-    def onchange_name(self):
-        self.http_port = self._get_available_port()
-        self.longpolling_port = self._get_available_port(int(self.http_port) + 1)
-
     @api.depends('name')
     def _compute_user_path(self):
         for instance in self:
@@ -370,81 +674,140 @@ class OdooInstance(models.Model):
             # data path is /opt/<instance_name>/data
             instance.instance_data_path = os.path.join(instance.user_path, 'data')
 
-    def add_to_log(self, message):
-        """Agrega un mensaje al registro (log) y lo limpia si supera 1000 caracteres."""
+    @api.depends('log_entry_ids')
+    def _compute_log(self):
+        Log = self.env['odoo.instance.log']
+        for instance in self:
+            entries = Log.search([('instance_id', '=', instance.id)], limit=100) if instance.id else Log
+            instance.log = Log._render_html(entries)
+
+    def add_to_log(self, message, level=None):
+        """Add an entry to the instance log.
+
+        Entries are queued and inserted together when the transaction commits; the level is
+        taken from a "[INFO]" style prefix of the message unless given.
+        """
         # Log to Odoo backend for debugging
         _logger.info(f"[LAUNCHLY_SAAS - {self.name}] {message}")
-
-        now = datetime.now()
-        new_log = "</br> \n#" + str(now.strftime("%m/%d/%Y, %H:%M:%S")) + " " + str(message) + " " + str(self.log)
-        if len(new_log) > 10000:
-            new_log = "</br>" + str(now.strftime("%m/%d/%Y, %H:%M:%S")) + " " + str(message)
-        self.log = new_log
+        self.env['odoo.instance.log']._queue(self, message, level=level)
 
     def clear_log(self):
-        """Clear the log field for selected instances"""
+        """Clear the log entries of the selected instances"""
+        self.env['odoo.instance.log'].sudo().search([('instance_id', 'in', self.ids)]).unlink()
         for instance in self:
-            instance.log = ""
             _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Log cleared by user")
-        # return {
-        #     'type': 'ir.actions.client',
-        #     'tag': 'reload',
-        # }
+
+    def _get_log_file_path(self):
+        self.ensure_one()
+        return f"/var/log/{self.name}.log"
 
     def refresh_odoo_logs(self):
-        """Refresh systemd service logs from journalctl and log files"""
+        """Reload the last systemd service logs and log file lines, and remember where they end"""
         for instance in self:
+            logs = ""
+            journal_cursor = False
+            file_cursor = False
             try:
-                service_name = f"{instance.name}.service"
-                logs = ""
-
-                # Get systemd service logs using journalctl
-                journal_cmd = f"journalctl -u {service_name} --lines=100 --no-pager"
-                _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Fetching systemd logs: {journal_cmd}")
-
-                if instance.root_sudo_password:
-                    journal_result = instance.excute_command_with_sudo(journal_cmd, shell=True, check=False)
-                else:
-                    journal_result = instance.excute_command(journal_cmd, shell=True, check=False)
+                _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Fetching systemd logs")
+                journal, journal_cursor = read_journal(f"{instance.name}.service", instance.root_sudo_password,
+                                                       lines=JOURNAL_TAIL_LINES)
+                logs += "=== SYSTEMD SERVICE LOGS ===\n" + journal + "\n"
+            except subprocess.TimeoutExpired:
+                logs += "Timeout while fetching systemd logs\n"
+                _logger.error(f"[LAUNCHLY_SAAS - {instance.name}] Timeout while fetching systemd logs")
+            except Exception as e:
+                logs += f"Error fetching systemd logs: {str(e)}\n"
+                _logger.error(f"[LAUNCHLY_SAAS - {instance.name}] Error fetching systemd logs: {str(e)}")
 
-                if journal_result.returncode == 0:
-                    if journal_result.stdout:
-                        logs += "=== SYSTEMD SERVICE LOGS ===\n" + journal_result.stdout + "\n"
-                    if journal_result.stderr:
-                        logs += "=== SYSTEMD STDERR ===\n" + journal_result.stderr + "\n"
+            # Only the end of the log file is read, whatever its size
+            log_file_path = instance._get_log_file_path()
+            try:
+                if os.path.exists(log_file_path):
+                    tail, file_cursor = tail_file(log_file_path, LOG_TAIL_LINES)
+                    logs += "\n=== ODOO LOG FILE ===\n" + tail
                 else:
-                    logs += f"Error fetching systemd logs: {journal_result.stderr}\n"
-
-                # Try to get Odoo log file from the systemd log location
-                log_file_path = f"/var/log/{instance.name}.log"
-                try:
-                    if os.path.exists(log_file_path):
-                        _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Reading Odoo log file: {log_file_path}")
-                        # Read last 200 lines of the log file
-                        with open(log_file_path, 'r') as f:
-                            file_lines = f.readlines()
-                            last_lines = file_lines[-200:] if len(file_lines) > 200 else file_lines
-                            odoo_logs = ''.join(last_lines)
-                            logs += "\n=== ODOO LOG FILE ===\n" + odoo_logs
-                    else:
-                        logs += f"\n=== ODOO LOG FILE ===\nLog file not found at: {log_file_path}"
-                except Exception as log_error:
-                    logs += f"\n=== ODOO LOG FILE ===\nError reading log file: {str(log_error)}"
+                    logs += f"\n=== ODOO LOG FILE ===\nLog file not found at: {log_file_path}"
+            except Exception as log_error:
+                logs += f"\n=== ODOO LOG FILE ===\nError reading log file: {str(log_error)}"
+
+            instance.write({
+                'odoo_logs': logs or "No logs available",
+                'journal_cursor': journal_cursor,
+                'log_file_cursor': file_cursor,
+            })
+            _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Systemd logs refreshed successfully")
 
-                instance.odoo_logs = logs if logs else "No logs available"
-                _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Systemd logs refreshed successfully")
+    def _fetch_new_logs(self):
+        """Append the service log lines written since the last read, and push them to the log viewers.
 
-            except subprocess.TimeoutExpired:
-                instance.odoo_logs = "Timeout while fetching systemd logs"
-                _logger.error(f"[LAUNCHLY_SAAS - {instance.name}] Timeout while fetching systemd logs")
+        Journal entries are read after the stored cursor and the log file from the stored offset,
+        so each call only transfers what is new.
+        """
+        for instance in self:
+            if not instance.journal_cursor and not instance.log_file_cursor:
+                instance.refresh_odoo_logs()
+                continue
+            new_text = ""
+            vals = {}
+            try:
+                journal, cursor = read_journal(f"{instance.name}.service", instance.root_sudo_password,
+                                               after_cursor=instance.journal_cursor, lines=500)
+                new_text += journal
+                if cursor != instance.journal_cursor:
+                    vals['journal_cursor'] = cursor
             except Exception as e:
-                instance.odoo_logs = f"Error fetching systemd logs: {str(e)}"
-                _logger.error(f"[LAUNCHLY_SAAS - {instance.name}] Error fetching systemd logs: {str(e)}")
+                _logger.warning(f"[LAUNCHLY_SAAS - {instance.name}] Error following systemd logs: {str(e)}")
+            log_file_path = instance._get_log_file_path()
+            try:
+                if os.path.exists(log_file_path):
+                    text, cursor = follow_file(log_file_path, instance.log_file_cursor)
+                    new_text += text
+                    if cursor != instance.log_file_cursor:
+                        vals['log_file_cursor'] = cursor
+            except Exception as e:
+                _logger.warning(f"[LAUNCHLY_SAAS - {instance.name}] Error following log file: {str(e)}")
+
+            if new_text:
+                lines = ((instance.odoo_logs or "") + new_text).splitlines(keepends=True)
+                vals['odoo_logs'] = ''.join(lines[-LOG_DISPLAY_MAX_LINES:])
+                for partner in instance.log_follower_ids:
+                    self.env['bus.bus']._sendone(partner, 'launchly_saas.instance_logs', {
+                        'instance_id': instance.id,
+                        'text': new_text,
+                    })
+            if vals:
+                instance.write(vals)
+
+    def action_follow_logs(self):
+        """Called by the log viewer while it is open: keep the instance logs followed for a while"""
+        partner = self.env.user.partner_id
+        self.sudo().write({
+            'log_follow_until': fields.Datetime.now() + LOG_FOLLOW_WINDOW,
+            'log_follower_ids': [(4, partner.id)],
+        })
+        # Start following now rather than at the next scheduled run
+        self.env.ref('launchly_saas.ir_cron_follow_instance_logs')._trigger()
+        return True
 
-        # return {
-        #     'type': 'ir.actions.client',
-        #     'tag': 'reload',
-        # }
+    @api.model
+    def _cron_follow_logs(self, duration=50, interval=5):
+        """Push new service log lines of the followed instances for about a minute.
+
+        The cron runs every minute; viewers renew their follow window while they are open, the
+        instances nobody looks at anymore drop out of the loop.
+        """
+        deadline = time.monotonic() + duration
+        while True:
+            now = fields.Datetime.now()
+            expired = self.search([('log_follower_ids', '!=', False), ('log_follow_until', '<', now)])
+            if expired:
+                expired.write({'log_follower_ids': [(5, 0, 0)], 'log_follow_until': False})
+            instances = self.search([('log_follow_until', '>=', now)])
+            instances._fetch_new_logs()
+            self.env.cr.commit()
+            if not instances or time.monotonic() + interval > deadline:
+                break
+            time.sleep(interval)
 
     def clear_odoo_logs(self):
         """Clear the odoo_logs field for selected instances"""
@@ -583,34 +946,41 @@ class OdooInstance(models.Model):
                     'target': 'new',
                 }
 
-    def _get_available_port(self, start_port=8069, end_port=9000):
-        # Define el rango de puertos en el que deseas buscar disponibles
-        # buscar todos los puertos de las instancias
-        instances = self.env['odoo.instance'].search([])
-        # crear una lista con los puertos de las instancias
-        ports = []
-        for instance in instances:
-            ports.append(int(instance.http_port))
-            ports.append(int(instance.longpolling_port))
-
-        for port in range(start_port, end_port + 1):
-            # Si el puerto ya está en uso, continúa con el siguiente
-            if port in ports:
+    def _ensure_port_leases(self):
+        """Make sure the instance ports are leased, leasing a free http/longpolling pair when it has none"""
+        Lease = self.env['odoo.port.lease'].sudo()
+        for instance in self:
+            wanted = {}
+            if instance.http_port and instance.http_port.isdigit():
+                wanted['http'] = int(instance.http_port)
+            if instance.longpolling_port and instance.longpolling_port.isdigit():
+                wanted['longpolling'] = int(instance.longpolling_port)
+
+            # A port leased by another instance (two legacy instances sharing it) is not reused,
+            # the instance gets a new pair instead
+            taken = Lease.search([('port', 'in', list(wanted.values())), ('instance_id', '!=', instance.id)])
+            for lease in taken:
+                instance.add_to_log(f"[WARNING] Port {lease.port} is used by instance '{lease.instance_id.name}', "
+                                    f"leasing new ports")
+                wanted = {kind: port for kind, port in wanted.items() if port != lease.port}
+
+            leases = instance.sudo().port_lease_ids
+            if len(wanted) == 2:
+                # Keep the chosen ports, only (re)lease the ones that changed
+                leases.filtered(lambda lease: wanted[lease.kind] != lease.port).unlink()
+                leased = {lease.kind: lease.port for lease in leases.exists()}
+                Lease._lease_ports(instance, {kind: port for kind, port in wanted.items()
+                                             if leased.get(kind) != port})
                 continue
-            # Intenta crear un socket en el puerto
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(1)  # Establece un tiempo de espera para la conexión
 
-            try:
-                # Intenta vincular el socket al puerto
-                sock.bind(("0.0.0.0", port))
-                return port  # Si tiene éxito, el puerto está disponible
-            except Exception as e:
-                # Si no tiene éxito, el puerto ya está en uso
-                pass
-            finally:
-                sock.close()
-        self.add_to_log("[ERROR] No se encontraron puertos disponibles en el rango especificado.")
+            leases.unlink()
+            leases = Lease._allocate_pair(instance)
+            ports = {lease.kind: lease.port for lease in leases}
+            instance.write({
+                'http_port': str(ports['http']),
+                'longpolling_port': str(ports['longpolling']),
+            })
+            _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Leased ports {ports['http']}/{ports['longpolling']}")
 
     def _create_host_directories(self):
         """Create host directories with proper permissions for Odoo service using sudo"""
@@ -975,18 +1345,12 @@ try:
 except Exception as e:
     print("ERROR|{{}}".format(str(e)))
     '''
-                script_path = os.path.join(instance.instance_data_path, "odoo_init", "update_addons.py")
-                instance.create_file(script_path, script_content)
-                instance.chmod_with_sudo(script_path, 0o755)
-                # Execute script directly using instance's Python environment
-                venv_python = f"/opt/{instance.name}/venv/bin/python3"
-                cmd = f"{venv_python} {script_path}"
-
-                if instance.root_sudo_password:
-                    result = instance.excute_command_with_sudo(cmd, shell=True, check=False)
+                # Prefer the management bridge of the running instance, fall back to a one-shot script
+                result = instance._run_management_script(
+                    'update_addons.py', script_content, [{'op': 'update_module_list'}])
+                if not result.via_bridge and instance.root_sudo_password:
+                    # A separate process updated the list, the running server must reload its registry
                     instance.restart_odoo_service()
-                else:
-                    result = instance.excute_command(cmd, shell=True, check=False)
 
                 if result.returncode == 0:
                     output = result.stdout.strip().splitlines()
@@ -1000,11 +1364,9 @@ except Exception as e:
                             instance.add_to_log("[INFO] New addons should now be visible in the Apps menu")
 
                             # Recompute installation status for all custom addon lines
-                            for addon_line in instance.custom_addon_line:
-                                addon_line._compute_is_installed()
+                            instance._invalidate_installed_modules()
+                            instance.custom_addon_line._compute_is_installed()
 
-                            # Clean up
-                            instance.remove_file_with_sudo(script_path)
                             return True
                         elif line.startswith("ERROR|"):
                             instance.add_to_log(f"[ERROR] Script error: {line.split('|', 1)[1]}")
@@ -1070,6 +1432,9 @@ except Exception as e:
                 _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Updated instance with generated passwords")
 
             try:
+                # Instances destroyed or created before port leases existed get their ports leased again
+                instance._ensure_port_leases()
+
                 # Create host directories for addons and configurations
                 _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Creating host directories...")
                 instance._create_host_directories()
@@ -1179,15 +1544,24 @@ except Exception as e:
         if not self.template_id or not self.template_id.odoo_version:
             raise UserError(f"Template with Odoo version must be configured for instance '{self.name}'")
         odoo_version = self.template_id.odoo_version
-        company_name = self.company_name or ""
-        # Lowercase, remove all non-alphanumeric characters
-        db_user = re.sub(r'[^0-9A-Za-z]+', '', company_name).lower()
+        db_user = self._get_db_user()
         # Prepare enhanced addons path including repositories
         enhanced_addons_path = self._get_enhanced_addons_path_for_script()
 
         # Prepare the command with user credentials for admin setup
         country_code = self.country_id.code if self.country_id else "US"
         is_demo = "true" if self.is_demo else "false"
+        shared_venv, wheel_cache = self.template_id._get_shared_venv_paths()
+        skip_packages = os.path.isfile(os.path.join(shared_venv, '.launchly-ready'))
+        if skip_packages:
+            self.add_to_log(f"[INFO] Reusing shared virtualenv: {shared_venv}")
+        else:
+            self.add_to_log(f"[INFO] Shared virtualenv will be built: {shared_venv}")
+        golden_db = self._get_golden_database()
+        if golden_db:
+            self.add_to_log(f"[INFO] Cloning database from golden template: {golden_db.database_name}")
+        else:
+            self.add_to_log("[INFO] No golden database available, the database will be fully initialized")
         cmd = [
             'sudo', '-S', script_path,
             self.name,  # instance name
@@ -1196,12 +1570,16 @@ except Exception as e:
             str(self.http_port),  # http port
             self.database_name,  # db name
             db_user,  # db user (standardized)
-            'adminpwd',  # db password (standardized)
+            TENANT_DB_PASSWORD,  # db password (standardized)
             self.admin_password,  # admin password
             self.user_email,  # user email for admin login
             self.user_phone or self.user_password,  # user phone/password for admin password
             country_code,  # country code
-            is_demo  # demo data flag
+            is_demo,  # demo data flag
+            golden_db.database_name or '',  # golden template database to clone (optional)
+            shared_venv,  # shared virtualenv for this version/requirements
+            wheel_cache,  # local wheel cache backing the shared virtualenv
+            "true" if skip_packages else "false",  # skip apt/pip when the virtualenv is ready
         ]
 
         self.add_to_log("[INFO] " + "=" * 60)
@@ -1370,6 +1748,131 @@ except Exception as e:
 
         return ",".join(paths)
 
+    def _get_golden_database(self):
+        """Get the ready golden database matching this instance template, country and demo flag"""
+        self.ensure_one()
+        if self.plan_id and not self.plan_id.use_golden_db:
+            return self.env['odoo.golden.database']
+        return self.env['odoo.golden.database']._find_ready(self.template_id, self.country_id, self.is_demo)
+
+    def _call_management_bridge(self, commands, timeout=600):
+        """Run management commands inside the running instance through the saas_instance_bridge addon.
+
+        Returns the output lines (same protocol as the management scripts), or None when the bridge
+        is not reachable so that the caller can fall back to a one-shot script.
+        """
+        self.ensure_one()
+        if self.state != 'running' or not self.http_port or not self.bridge_token:
+            return None
+        import requests
+        url = f"http://127.0.0.1:{self.http_port}/saas/bridge/execute?db={self.database_name}"
+        payload = {
+            'jsonrpc': '2.0',
+            'method': 'call',
+            'params': {'token': self.bridge_token, 'commands': commands},
+            'id': 1,
+        }
+        try:
+            response = requests.post(url, json=payload, timeout=timeout)
+            if response.status_code != 200:
+                return None
+            result = response.json().get('result') or {}
+        except Exception as e:
+            _logger.info(f"[LAUNCHLY_SAAS - {self.name}] Management bridge not reachable: {str(e)}")
+            return None
+        if 'output' not in result:
+            _logger.warning(f"[LAUNCHLY_SAAS - {self.name}] Management bridge refused the call: {result.get('error')}")
+            return None
+        return result['output']
+
+    def _run_management_script(self, script_name, script_content, bridge_commands=None):
+        """Run a management operation, through the bridge when possible, otherwise as a one-shot script.
+
+        The returned CompletedProcess always has a text stdout and a `via_bridge` attribute.
+        """
+        self.ensure_one()
+        if bridge_commands:
+            lines = self._call_management_bridge(bridge_commands)
+            if lines is not None:
+                _logger.info(f"[LAUNCHLY_SAAS - {self.name}] {script_name} executed through the management bridge")
+                result = subprocess.CompletedProcess(args=script_name, returncode=0, stdout='\n'.join(lines), stderr='')
+                result.via_bridge = True
+                return result
+
+        script_path = os.path.join(self.instance_data_path, "odoo_init", script_name)
+        self.create_file(script_path, script_content)
+        self.chmod_with_sudo(script_path, 0o755)
+        # Execute script directly using instance's Python environment
+        venv_python = f"/opt/{self.name}/venv/bin/python3"
+        try:
+            if self.root_sudo_password:
+                result = self.excute_command_with_sudo(f"-u {self.name} {venv_python} {script_path}",
+                                                       shell=True, check=False)
+            else:
+                result = self.excute_command(f"sudo -u {self.name} {venv_python} {script_path}",
+                                             shell=True, check=False)
+                result.stdout = result.stdout.decode('utf-8') if result.stdout else ''
+                result.stderr = result.stderr.decode('utf-8') if result.stderr else ''
+        finally:
+            self.remove_file_with_sudo(script_path)
+        result.via_bridge = False
+        return result
+
+    def _deploy_management_bridge(self):
+        """Copy the saas_instance_bridge addon into the instance and install it with its token"""
+        from odoo.modules.module import get_module_path
+        for instance in self:
+            source_path = get_module_path('saas_instance_bridge')
+            if not source_path:
+                instance.add_to_log("[WARNING] saas_instance_bridge addon not found, management scripts will be used")
+                continue
+            if not instance.bridge_token:
+                instance.bridge_token = secrets.token_urlsafe(32)
+
+            addons_dir = f"/opt/{instance.name}/custom-addons"
+            dest_path = os.path.join(addons_dir, 'saas_instance_bridge')
+            try:
+                instance.excute_command_with_sudo(f"mkdir -p {addons_dir}", check=False)
+                instance.excute_command_with_sudo(f"rm -rf {dest_path}", check=False)
+                instance.excute_command_with_sudo(f"cp -r {source_path} {dest_path}", check=True)
+                instance.excute_command_with_sudo(f"chown -R {instance.name}:{instance.name} {dest_path}", check=False)
+            except Exception as e:
+                instance.add_to_log(f"[WARNING] Failed to copy management bridge addon: {str(e)}")
+                continue
+
+            script_content = f'''#!/usr/bin/env python3
+import sys
+
+# Add Odoo source path to Python path (from the source installation)
+odoo_source_path = '{instance._get_source_path_from_template()}'
+sys.path.insert(0, odoo_source_path)
+
+import odoo
+from odoo import api, SUPERUSER_ID
+odoo.tools.config.parse_config(['-c', '/etc/{instance.name}.conf'])
+try:
+    from odoo.modules.registry import Registry
+    registry = Registry.new('{instance.database_name}')
+    with registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {{}})
+        env['ir.module.module'].update_list()
+        env['ir.config_parameter'].set_param('saas_instance_bridge.token', '{instance.bridge_token}')
+        cr.commit()
+        bridge = env['ir.module.module'].search([('name', '=', 'saas_instance_bridge')], limit=1)
+        if bridge and bridge.state != 'installed':
+            bridge.button_immediate_install()
+        print("SUCCESS|Management bridge installed")
+except Exception as e:
+    print("ERROR|{{}}".format(str(e)))
+'''
+            result = instance._run_management_script('install_bridge.py', script_content)
+            if result.returncode == 0 and "SUCCESS|" in (result.stdout or ''):
+                instance.add_to_log("[SUCCESS] Management bridge installed")
+                # The running server must load the routes of the new module
+                instance.restart_odoo_service()
+            else:
+                instance.add_to_log(f"[WARNING] Management bridge not installed: {result.stdout or result.stderr}")
+
     def _get_source_path_from_template(self):
         """Get Odoo source path from template"""
         if self.template_id and self.template_id.source_path:
@@ -1387,11 +1890,14 @@ except Exception as e:
 
     def start_instance(self):
         """Start the Odoo instance using systemd"""
-        for instance in self:
-            if instance.state == 'running':
-                instance.add_to_log("[INFO] Instance is already running")
-                return
-
+        for instance in self.filtered(lambda i: i.state == 'running'):
+            instance.add_to_log("[INFO] Instance is already running")
+        to_start = self.filtered(lambda i: i.state != 'running')
+        if len(to_start) > 1:
+            # Several instances are started in parallel, with one result per instance
+            self.env['odoo.fleet.operation']._run_for(to_start, 'start')
+            return True
+        for instance in to_start:
             _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Starting instance")
             instance.add_to_log("[INFO] Starting Odoo service...")
 
@@ -1407,24 +1913,12 @@ except Exception as e:
                     check=True
                 )
 
-                instance.state = 'running'
+                instance.write({'state': 'running', 'hibernated_since': False,
+                                'last_activity_date': fields.Datetime.now()})
                 instance.add_to_log("[INFO] Odoo service started successfully")
                 _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Instance started successfully")
 
-                # Process any pending custom addons that were added before instance creation
-                instance._process_pending_custom_addons()
-
-                # User setup is now handled by bash script, only do addon management
-                if not instance.user_done:
-                    instance.add_to_log("[INFO] Setting up addon limits and refreshing addon list...")
-                    instance._set_user_limit_in_instance()
-                    instance._set_module_limit_in_instance()
-                    instance.refresh_addons_list()
-                    instance.user_done = True
-                    _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Addon setup completed")
-                else:
-                    instance.add_to_log("[INFO] User setup already completed, skipping user configuration")
-                    _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] User setup already done, skipping")
+                instance._after_service_start()
 
             except subprocess.CalledProcessError as e:
                 instance.state = 'error'
@@ -1441,8 +1935,31 @@ except Exception as e:
         # This method is no longer needed but kept for compatibility
         return True
 
+    def _after_service_start(self):
+        """Addon management run once the service of the instance is started"""
+        for instance in self:
+            # Process any pending custom addons that were added before instance creation
+            instance._process_pending_custom_addons()
+
+            # User setup is now handled by bash script, only do addon management
+            if not instance.user_done:
+                instance.add_to_log("[INFO] Setting up addon limits and refreshing addon list...")
+                instance._deploy_management_bridge()
+                instance._set_user_limit_in_instance()
+                instance._set_module_limit_in_instance()
+                instance.refresh_addons_list()
+                instance.user_done = True
+                _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Addon setup completed")
+            else:
+                instance.add_to_log("[INFO] User setup already completed, skipping user configuration")
+                _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] User setup already done, skipping")
+
     def stop_instance(self):
         """Stop Odoo systemd service for the instance"""
+        if len(self) > 1:
+            # Several instances are stopped in parallel, with one result per instance
+            self.env['odoo.fleet.operation']._run_for(self, 'stop')
+            return True
         for instance in self:
             _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Stopping Odoo service")
             instance.add_to_log("[INFO] Stopping Odoo service")
@@ -1461,7 +1978,7 @@ except Exception as e:
 
                 _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Service stopped successfully")
                 instance.add_to_log("[INFO] Odoo service stopped successfully!")
-                instance.write({'state': 'stopped'})
+                instance.write({'state': 'stopped', 'hibernated_since': False})
 
             except subprocess.CalledProcessError as e:
                 _logger.error(f"[LAUNCHLY_SAAS - {instance.name}] Failed to stop service: {str(e)}")
@@ -1474,6 +1991,9 @@ except Exception as e:
 
     def restart_instance(self):
         """Restart Odoo systemd service for the instance"""
+        if len(self) > 1:
+            self.env['odoo.fleet.operation']._run_for(self, 'restart')
+            return True
         for instance in self:
             _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Restarting instance")
             instance.add_to_log("[INFO] Restarting Odoo service...")
@@ -1490,7 +2010,8 @@ except Exception as e:
                     check=True
                 )
 
-                instance.state = 'running'
+                instance.write({'state': 'running', 'hibernated_since': False,
+                                'last_activity_date': fields.Datetime.now()})
                 instance.add_to_log("[INFO] Odoo service restarted successfully")
                 _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Instance restarted successfully")
 
@@ -1565,7 +2086,7 @@ except Exception as e:
                 if result.stdout:
                     stdout_str = result.stdout
                     _logger.info(f"[LAUNCHLY_SAAS - {self.name}] Sudo command output: {stdout_str}")
-                    self.add_to_log(f"[INFO] Sudo command output: {stdout_str}")
+                    self.add_to_log(f"Sudo command output: {stdout_str}", level='debug')
 
                 _logger.info(
                     f"[LAUNCHLY_SAAS - {self.name}] Sudo command executed successfully with return code: {result.returncode}")
@@ -1598,7 +2119,7 @@ except Exception as e:
             if result.stdout:
                 stdout_str = result.stdout.decode('utf-8')
                 _logger.info(f"[LAUNCHLY_SAAS - {self.name}] Command output: {stdout_str}")
-                self.add_to_log(f"[INFO] Command output: {stdout_str}")
+                self.add_to_log(f"Command output: {stdout_str}", level='debug')
 
             _logger.info(
                 f"[LAUNCHLY_SAAS - {self.name}] Command executed successfully with return code: {result.returncode}")
@@ -1798,6 +2319,8 @@ except Exception as e:
             vals['user_password'] = self._generate_random_password()
         if not vals.get('admin_password'):
             vals['admin_password'] = self._generate_random_password()
+        if not vals.get('bridge_token'):
+            vals['bridge_token'] = secrets.token_urlsafe(32)
         plan_id = vals.get('plan_id')
         skip_template = self.env.context.get('skip_template_apply')
         if plan_id:
@@ -1810,6 +2333,7 @@ except Exception as e:
                     vals['template_id'] = plan.template_id.id
 
         instance = super().create(vals)
+        instance._ensure_port_leases()
         # Always copy addons from plan, regardless of skip_template
         if instance.plan_id:
             for custom_addon in instance.plan_id.custom_addon_line_ids:
@@ -1914,9 +2438,13 @@ except Exception as e:
                     _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Dropping database...")
                     instance.add_to_log("[INFO] Dropping database...")
 
+                    # Pooled management connections, of this and the other workers, would prevent
+                    # the database from being dropped
+                    close_tenant_pool(instance.database_name)
                     drop_db_cmd = [
                         'sudo', '-u', 'postgres', 'psql',
                         '-d', 'postgres',
+                        '-c', terminate_pooled_connections_sql(instance.database_name),
                         '-c', f"DROP DATABASE IF EXISTS {instance.database_name};"
                     ]
 
@@ -2118,10 +2646,15 @@ except Exception as e:
 
                 # Clear logs
                 instance.odoo_logs = ""
-                instance.log = ""
+                instance.journal_cursor = False
+                instance.log_file_cursor = False
+                instance.sudo().log_entry_ids.unlink()
+
+                # Give the ports back, new ones are leased when the instance is recreated
+                instance.sudo().port_lease_ids.unlink()
 
                 # Set state to draft (needs to be recreated)
-                instance.write({'state': 'draft'})
+                instance.write({'state': 'draft', 'http_port': False, 'longpolling_port': False})
 
                 _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Instance destroyed successfully")
                 instance.add_to_log("[SUCCESS] Instance completely destroyed!")
@@ -2211,7 +2744,8 @@ except Exception as e:
                 instance.add_to_log(f"[INFO] Installing addons {addon_names} via internal script...")
 
                 # Convert addon_names to a Python list string for the script
-                addon_names_str = str(addon_names) if isinstance(addon_names, list) else str([addon_names])
+                addon_list = list(addon_names) if isinstance(addon_names, (list, tuple)) else [addon_names]
+                addon_names_str = str(addon_list)
 
                 script_content = f'''#!/usr/bin/env python3
 import os
@@ -2266,19 +2800,9 @@ except Exception as e:
     print("ERROR|Script execution failed: {{}}".format(str(e)))
     '''
 
-                script_path = os.path.join(instance.instance_data_path, "odoo_init", "install_addons.py")
-                instance.create_file(script_path, script_content)
-                instance.chmod_with_sudo(script_path, 0o755)
-
-                # Execute script directly using instance's Python environment
-                venv_python = f"/opt/{instance.name}/venv/bin/python3"
-
-                if instance.root_sudo_password:
-                    cmd = f"sudo -u {instance.name} {venv_python} {script_path}"
-                    result = instance.excute_command_with_sudo(cmd, shell=True, check=False)
-                else:
-                    cmd = f"-u {instance.name} {venv_python} {script_path}"
-                    result = instance.excute_command(cmd, shell=True, check=False)
+                # Prefer the management bridge of the running instance, fall back to a one-shot script
+                result = instance._run_management_script(
+                    'install_addons.py', script_content, [{'op': 'install_modules', 'names': addon_list}])
 
                 if result.returncode == 0:
                     output = result.stdout.strip().splitlines()
@@ -2315,9 +2839,6 @@ except Exception as e:
                     _logger.info(
                         f"[LAUNCHLY_SAAS - {instance.name}] Install completed: {success_count} success, {warning_count} warnings, {error_count} errors")
 
-                    # Clean up
-                    instance.remove_file_with_sudo(script_path)
-
                     return error_count == 0  # Return True only if no errors occurred
 
                 else:
@@ -2340,7 +2861,8 @@ except Exception as e:
                 _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Upgrading addons {addon_names} via superuser script")
                 instance.add_to_log(f"[INFO] Upgrading addons {addon_names} via internal script...")
 
-                addon_names_str = str(addon_names) if isinstance(addon_names, list) else str([addon_names])
+                addon_list = list(addon_names) if isinstance(addon_names, (list, tuple)) else [addon_names]
+                addon_names_str = str(addon_list)
 
                 script_content = f'''#!/usr/bin/env python3
 import os
@@ -2386,17 +2908,9 @@ except Exception as e:
     print("ERROR|Script execution failed: {{}}".format(str(e)))
     '''
 
-                script_path = os.path.join(instance.instance_data_path, "odoo_init", "upgrade_addons.py")
-                instance.create_file(script_path, script_content)
-                instance.chmod_with_sudo(script_path, 0o755)
-                # Execute script directly using instance's Python environment
-                venv_python = f"/opt/{instance.name}/venv/bin/python3"
-                cmd = f"-u {instance.name} {venv_python} {script_path}"
-
-                if instance.root_sudo_password:
-                    result = instance.excute_command_with_sudo(cmd, shell=True, check=False)
-                else:
-                    result = instance.excute_command(cmd, shell=True, check=False)
+                # Prefer the management bridge of the running instance, fall back to a one-shot script
+                result = instance._run_management_script(
+                    'upgrade_addons.py', script_content, [{'op': 'upgrade_modules', 'names': addon_list}])
 
                 if result.returncode == 0:
                     output = result.stdout.strip().splitlines()
@@ -2432,8 +2946,6 @@ except Exception as e:
                     _logger.info(
                         f"[LAUNCHLY_SAAS - {instance.name}] Upgrade completed: {success_count} success, {warning_count} warnings, {error_count} errors")
 
-                    instance.remove_file_with_sudo(script_path)
-
                     return error_count == 0
 
                 else:
@@ -2445,6 +2957,37 @@ except Exception as e:
                 instance.add_to_log(f"[ERROR] Error upgrading addons: {str(e)}")
                 return False
 
+    def _sync_mirror_lines(self, lines, key_field, rows, create_defaults=None):
+        """Apply the rows read from the instance to the lines mirroring them, keeping the ids of the
+        unchanged lines (and the many2many links pointing to them).
+
+        :param lines: current lines of the instance
+        :param key_field: field identifying a line within the instance (unique per instance)
+        :param rows: {key: vals} read from the instance
+        :param create_defaults: extra values of the created lines only
+        :returns: (created, updated, removed) counts
+        """
+        self.ensure_one()
+        existing = {line[key_field]: line for line in lines}
+        vals_list = []
+        # The lines getting the same changes (typically a new state) are written together
+        changed_ids = defaultdict(list)
+        for key, vals in rows.items():
+            line = existing.pop(key, None)
+            if line is None:
+                vals_list.append(dict(create_defaults or {}, instance_id=self.id, **vals))
+                continue
+            changes = {name: value for name, value in vals.items() if (line[name] or False) != (value or False)}
+            if changes:
+                changed_ids[tuple(sorted(changes.items()))].append(line.id)
+        for changes, ids in changed_ids.items():
+            lines.browse(ids).write(dict(changes))
+        updated = sum(len(ids) for ids in changed_ids.values())
+        stale = lines.browse([line.id for line in existing.values()])
+        stale.unlink()
+        lines.browse().create(vals_list)
+        return len(vals_list), updated, len(stale)
+
     def refresh_db_users(self):
         """Refresh the list of database users from inside the Odoo instance without requiring admin login"""
         for instance in self:
@@ -2491,18 +3034,9 @@ except Exception as e:
     print("ERROR|{{}}".format(str(e)))
     '''
 
-                script_path = os.path.join(instance.instance_data_path, "odoo_init", "refresh_users.py")
-                instance.create_file(script_path, script_content)
-                instance.chmod_with_sudo(script_path, 0o755)
-                # Execute script directly using instance's Python environment
-                venv_python = f"/opt/{instance.name}/venv/bin/python3"
-
-                if instance.root_sudo_password:
-                    cmd = f"sudo -u {instance.name} {venv_python} {script_path}"
-                    result = instance.excute_command_with_sudo(cmd, shell=True, check=False)
-                else:
-                    cmd = f"-u {instance.name} {venv_python} {script_path}"
-                    result = instance.excute_command(cmd, shell=True, check=False)
+                # Prefer the management bridge of the running instance, fall back to a one-shot script
+                result = instance._run_management_script(
+                    'refresh_users.py', script_content, [{'op': 'list_users'}])
 
                 if result.returncode == 0:
                     output = result.stdout.strip().splitlines()
@@ -2510,24 +3044,21 @@ except Exception as e:
                         instance.add_to_log("[ERROR] No output returned from script")
                         return False
 
-                    # Clear existing db_users records for this instance
-                    instance.db_users.unlink()
-
-                    success_count = 0
+                    rows = {}
                     for line in output:
                         if line.startswith("USER|"):
                             parts = line.split("|")
                             if len(parts) == 8:
-                                login_date = None
+                                login_date = False
                                 if parts[7]:
                                     try:
-                                        login_date = datetime.strptime(parts[7], "%Y-%m-%d %H:%M:%S.%f")
+                                        login_date = datetime.strptime(
+                                            parts[7], "%Y-%m-%d %H:%M:%S.%f").replace(microsecond=0)
                                     except ValueError as e:
                                         instance.add_to_log(
                                             f"[WARNING] Failed to parse login_date for user {parts[2]}: {str(e)}")
 
-                                instance.env['odoo.db.user'].create({
-                                    'instance_id': instance.id,
+                                rows[parts[2]] = {
                                     'user_id': int(parts[1]),
                                     'login': parts[2],
                                     'email': parts[3],
@@ -2535,19 +3066,20 @@ except Exception as e:
                                     'name': parts[5],
                                     'active': parts[6] == 'True',
                                     'login_date': login_date,
-                                    'current_password': '***HIDDEN***',
-                                })
-                                success_count += 1
+                                }
                         elif line.startswith("ERROR|"):
                             instance.add_to_log(f"[ERROR] Script error: {line.split('|', 1)[1]}")
                             return False
 
+                    users = self.env['odoo.db.user'].with_context(active_test=False).search(
+                        [('instance_id', '=', instance.id)])
+                    created, updated, removed = instance._sync_mirror_lines(
+                        users, 'login', rows, {'current_password': '***HIDDEN***'})
+                    success_count = len(rows)
+                    instance.add_to_log(f"[INFO] Database users: {created} added, {updated} updated, {removed} removed")
                     instance.add_to_log(f"[SUCCESS] Refreshed {success_count} database users via script")
                     _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Refreshed {success_count} users")
 
-                    # Clean up
-                    instance.remove_file_with_sudo(script_path)
-
                     return True
 
                 else:
@@ -2614,24 +3146,15 @@ except Exception as e:
     sys.exit(1)
 '''
 
-                # Write the script to a temporary file
-                script_path = os.path.join(instance.instance_data_path, "odoo_init", "change_password.py")
-                instance.create_file(script_path, script_content)
-                instance.chmod_with_sudo(script_path, 0o755)
-
-                # Execute script directly using instance's Python environment
-                venv_python = f"/opt/{instance.name}/venv/bin/python3"
-
-                if instance.root_sudo_password:
-                    cmd = f"sudo -u {instance.name} {venv_python} {script_path}"
-                    result = instance.excute_command_with_sudo(cmd, shell=True, check=False)
-                else:
-                    cmd = f"-u {instance.name} {venv_python} {script_path}"
-                    result = instance.excute_command(cmd, shell=True, check=False)
+                # Prefer the management bridge of the running instance, fall back to a one-shot script
+                result = instance._run_management_script(
+                    'change_password.py', script_content,
+                    [{'op': 'set_password', 'login': user_login, 'password': new_password}])
 
                 if result.returncode == 0:
                     output = result.stdout if result.stdout else ''
-                    if "SUCCESS:" in output:
+                    # The script prints "SUCCESS:", the bridge answers with the "SUCCESS|" protocol
+                    if "SUCCESS:" in output or "SUCCESS|" in output:
                         instance.add_to_log(f"[SUCCESS] Password changed for user: {user_login}")
                         _logger.info(
                             f"[LAUNCHLY_SAAS - {instance.name}] Password changed successfully for user: {user_login}")
@@ -2640,7 +3163,6 @@ except Exception as e:
                         db_user = instance.db_users.filtered(lambda u: u.login == user_login)
                         if db_user:
                             db_user.current_password = new_password
-                        instance.remove_file_with_sudo(script_path)
                         return True
                     else:
                         instance.add_to_log(f"[ERROR] Failed to change password: {output}")
@@ -2654,49 +3176,95 @@ except Exception as e:
                 instance.add_to_log(f"[ERROR] Error changing user password: {str(e)}")
                 return False
 
-    def count_active_users(self):
-        """Count users that were active in the last 10 minutes"""
+    def _get_active_users_counts(self):
+        """Count the users of each instance that logged in during the last day.
+
+        One aggregate query per instance database on its pooled connection: res_users_log holds a
+        row per login, so no user is read or synchronized.
+
+        :returns: {instance id: count}, instances whose database cannot be reached count 0
+        """
+        since = datetime.utcnow() - ACTIVE_USERS_WINDOW
+        counts = {}
         for instance in self:
+            counts[instance.id] = 0
+            if not instance.database_name:
+                continue
             try:
-                instance.refresh_db_users()
-                from datetime import datetime, timedelta
-                import pytz
-                now_utc = datetime.now(pytz.UTC)
-                threshold_time = now_utc - timedelta(days=1)
-                active_count = 0
-                for user in instance.db_users:
-                    if user.login_date and user.active:
-                        if isinstance(user.login_date, str):
-                            try:
-                                if 'T' in user.login_date:
-                                    if user.login_date.endswith('Z'):
-                                        login_datetime = datetime.fromisoformat(user.login_date.replace('Z', '+00:00'))
-                                    elif '+' in user.login_date or user.login_date.count(':') == 2:
-                                        login_datetime = datetime.fromisoformat(user.login_date)
-                                    else:
-                                        login_datetime = datetime.fromisoformat(user.login_date + '+00:00')
-                                else:
-                                    login_datetime = datetime.strptime(user.login_date, '%Y-%m-%d %H:%M:%S')
-                                    login_datetime = pytz.UTC.localize(login_datetime)
-                            except (ValueError, TypeError):
-                                continue
-                        else:
-                            login_datetime = user.login_date
-                        if login_datetime.tzinfo is None:
-                            login_datetime = pytz.UTC.localize(login_datetime)
-                        elif login_datetime.tzinfo != pytz.UTC:
-                            login_datetime = login_datetime.astimezone(pytz.UTC)
-                        if login_datetime >= threshold_time:
-                            active_count += 1
-                instance.active_users_count = active_count
-                instance.user_activity_status = 'active' if active_count > 0 else 'inactive'
-                _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Active users count updated: {active_count}")
-                return active_count
-            except Exception as e:
+                with instance._tenant_cursor() as cr:
+                    cr.execute("""
+                        SELECT count(DISTINCT l.create_uid)
+                          FROM res_users_log l
+                          JOIN res_users u ON u.id = l.create_uid
+                         WHERE u.active
+                           AND l.create_date >= %s
+                    """, (since,))
+                    counts[instance.id] = cr.fetchone()[0]
+            except psycopg2.Error as e:
                 _logger.error(f"[LAUNCHLY_SAAS - {instance.name}] Error counting active users: {str(e)}")
-                instance.active_users_count = 0
-                instance.user_activity_status = 'inactive'
-                return 0
+        return counts
+
+    def _get_installed_modules(self):
+        """Installed modules of each running instance, read from the instance databases.
+
+        One query per database for all its modules, the databases missing from the short lived
+        cache are read concurrently on their pooled connections.
+
+        :returns: {instance id: frozenset of module names}, None for an instance that is not
+                  running or whose database cannot be reached
+        """
+        now = time.monotonic()
+        modules = {}
+        to_read = {}
+        for instance in self:
+            modules[instance.id] = None
+            if instance.state != 'running' or not instance.database_name:
+                continue
+            cached = _installed_modules_cache.get(instance.database_name)
+            if cached and now - cached[0] < INSTALLED_MODULES_TTL:
+                modules[instance.id] = cached[1]
+            else:
+                to_read[instance] = instance._get_tenant_dsn()
+        if not to_read:
+            return modules
+
+        def read(dsn):
+            try:
+                return _read_installed_modules(dsn)
+            except psycopg2.Error as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=min(INSTALLED_MODULES_WORKERS, len(to_read)),
+                                thread_name_prefix='launchly_modules') as executor:
+            results = executor.map(read, to_read.values())
+            for instance, result in zip(to_read, results):
+                if isinstance(result, psycopg2.Error):
+                    _logger.warning(f"[LAUNCHLY_SAAS - {instance.name}] Cannot read installed modules: {str(result)}")
+                    continue
+                _installed_modules_cache[instance.database_name] = (now, result)
+                modules[instance.id] = result
+        return modules
+
+    def _invalidate_installed_modules(self):
+        """Forget the cached installed modules, after installing or removing modules"""
+        for instance in self:
+            _installed_modules_cache.pop(instance.database_name, None)
+
+    def count_active_users(self):
+        """Update the active users count of the instances, returns the count of the last one"""
+        counts = self._get_active_users_counts()
+        # One write per distinct count instead of one per instance
+        by_count = {}
+        for instance_id, count in counts.items():
+            by_count.setdefault(count, []).append(instance_id)
+        for count, instance_ids in by_count.items():
+            self.browse(instance_ids).write({
+                'active_users_count': count,
+                'user_activity_status': 'active' if count > 0 else 'inactive',
+            })
+        for instance in self:
+            _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Active users count updated: {counts[instance.id]}")
+        return counts[self[-1].id] if self else 0
 
     def refresh_active_users(self):
         """Manual method to refresh active users count - callable from UI"""
@@ -2712,12 +3280,162 @@ except Exception as e:
     def cron_check_active_users(self):
         """Cron job method to check active users for all running instances"""
         running_instances = self.search([('state', '=', 'running')])
-        for instance in running_instances:
+        running_instances.count_active_users()
+        _logger.info(f"[LAUNCHLY_SAAS CRON] Checked active users for {len(running_instances)} instances")
+
+    def _get_last_activity_dates(self):
+        """Last login or presence of a user in each instance database.
+
+        :returns: {instance id: datetime or None}, None as well when the database cannot be reached
+        """
+        dates = {}
+        for instance in self:
+            dates[instance.id] = None
+            if not instance.database_name:
+                continue
             try:
-                instance.count_active_users()
-                _logger.info(f"[LAUNCHLY_SAAS CRON] Checked active users for instance: {instance.name}")
-            except Exception as e:
-                _logger.error(f"[LAUNCHLY_SAAS CRON] Error checking active users for {instance.name}: {str(e)}")
+                with instance._tenant_cursor() as cr:
+                    # Presence moved from bus to mail in Odoo 18
+                    cr.execute("""
+                        SELECT (SELECT max(create_date) FROM res_users_log),
+                               COALESCE(to_regclass('mail_presence'), to_regclass('bus_presence'))::text
+                    """)
+                    last_login, presence_table = cr.fetchone()
+                    last_presence = None
+                    if presence_table:
+                        cr.execute(sql.SQL("SELECT max(last_presence) FROM {}").format(sql.Identifier(presence_table)))
+                        last_presence = cr.fetchone()[0]
+                dates[instance.id] = max(filter(None, [last_login, last_presence]), default=None)
+            except psycopg2.Error as e:
+                _logger.warning(f"[LAUNCHLY_SAAS - {instance.name}] Cannot read last user activity: {str(e)}")
+        return dates
+
+    def _hibernate(self):
+        """Stop the service of idle instances; their vhost wakes them up on the next request"""
+        for instance in self:
+            try:
+                run_systemctl('stop', instance.name, instance.root_sudo_password, timeout=120)
+            except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+                error = getattr(e, 'stderr', None) or str(e)
+                _logger.error(f"[LAUNCHLY_SAAS - {instance.name}] Failed to hibernate instance: {error}")
+                instance.add_to_log(f"[ERROR] Failed to hibernate instance: {error}")
+                continue
+            instance.write({'state': 'hibernated', 'hibernated_since': fields.Datetime.now()})
+            instance.add_to_log(f"[INFO] Instance hibernated, idle since {instance.last_activity_date}")
+            _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Instance hibernated")
+
+    def _wait_until_healthy(self, timeout):
+        """Wait until the instance answers HTTP requests, returns False after `timeout` seconds"""
+        self.ensure_one()
+        import requests
+        url = f"http://127.0.0.1:{self.http_port}/web/health"
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if requests.get(url, timeout=5).status_code < 500:
+                    return True
+            except requests.RequestException:
+                pass
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(1)
+
+    def _wake(self):
+        """Start a hibernated instance, returns True when this call started it.
+
+        Called by the wake-up route for each request nginx could not proxy. The start runs in its
+        own short transaction holding the instance row with NOWAIT: a concurrent request finds the
+        row locked or the instance already running and returns False right away, the caller
+        answers it with a retry later. Instances whose subscription is over are never started.
+        """
+        self.ensure_one()
+        subscriptions = self.env['launchly.subscription'].sudo().search([('instance_id', '=', self.id)])
+        if subscriptions and not subscriptions.filtered(lambda s: s.state == 'active'):
+            return False
+        with self.env.registry.cursor() as cr:
+            instance = self.with_env(self.env(cr=cr))
+            try:
+                with cr.savepoint(flush=False):
+                    cr.execute("SELECT state FROM odoo_instance WHERE id = %s FOR UPDATE NOWAIT", (self.id,))
+                    state = cr.fetchone()[0]
+            except LockNotAvailable:
+                # Another request is starting it
+                return False
+            if state != 'hibernated':
+                return False
+
+            _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Waking up hibernated instance")
+            instance.add_to_log("[INFO] Waking up hibernated instance on an incoming request")
+            try:
+                run_systemctl('start', instance.name, instance.root_sudo_password, timeout=60)
+            except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+                error = getattr(e, 'stderr', None) or str(e)
+                _logger.error(f"[LAUNCHLY_SAAS - {instance.name}] Failed to wake up instance: {error}")
+                instance.add_to_log(f"[ERROR] Failed to wake up instance: {error}")
+                return False
+            instance.write({'state': 'running', 'hibernated_since': False,
+                            'last_activity_date': fields.Datetime.now()})
+        return True
+
+    @api.model
+    def _cron_hibernate_idle_instances(self):
+        """Hibernate the running instances idle for longer than the threshold of their plan.
+
+        Only instances whose vhost has the wake-up directives are hibernated, the others would
+        stay unreachable.
+        """
+        config = self.env['saas.config'].search([], limit=1)
+        if not config.wake_url:
+            return
+        instances = self.search([
+            ('state', '=', 'running'),
+            ('plan_id.hibernate_after_hours', '>', 0),
+            ('includes_subdomain', '=', True),
+            ('subdomain_name', '!=', False),
+            ('wake_token', '!=', False),
+        ])
+        dates = instances._get_last_activity_dates()
+        now = fields.Datetime.now()
+        idle = self.browse()
+        for instance in instances:
+            if dates[instance.id] is None and not instance.last_activity_date:
+                # Never seen active: its database may just be unreachable
+                continue
+            last_activity = max(filter(None, [dates[instance.id], instance.last_activity_date]))
+            if last_activity != instance.last_activity_date:
+                instance.last_activity_date = last_activity
+            if now - last_activity >= timedelta(hours=instance.plan_id.hibernate_after_hours):
+                idle |= instance
+        idle._hibernate()
+        if idle:
+            _logger.info(f"[LAUNCHLY_SAAS CRON] Hibernated {len(idle)} idle instances")
+
+    def _get_nginx_wake_directives(self):
+        """nginx server directives sending the requests nginx cannot proxy to the wake-up route of
+        the manager, empty when no wake-up URL is configured"""
+        self.ensure_one()
+        wake_url = (self.config_id.wake_url or '').rstrip('/')
+        if not wake_url:
+            return ""
+        if not self.wake_token:
+            self.wake_token = secrets.token_urlsafe(32)
+        return f"""
+    # A hibernated instance is started by its first request
+    # 502 only: nginx could not connect, the request never reached the instance
+    error_page 502 = @launchly_wake;
+
+    location @launchly_wake {{
+        rewrite ^ /launchly_saas/wake/{self.id}/{self.wake_token} break;
+        proxy_pass {wake_url};
+        proxy_set_header X-Launchly-Uri $request_uri;
+        proxy_read_timeout {WAKE_TIMEOUT + 30}s;
+    }}
+"""
+
+    def action_refresh_nginx_config(self):
+        """Rewrite the vhost of the instance, e.g. to add the wake-up directives to an older vhost"""
+        self._create_subdomain_config()
+        return True
 
     @api.depends('subdomain_name')
     def _compute_domained_url(self):
@@ -2735,35 +3453,113 @@ except Exception as e:
             else:
                 instance.nginx_config_path = ""
 
-    @api.depends('subdomain_name')
-    def _compute_ssl_certificate_expiry(self):
+    def _get_ssl_certificate_path(self):
+        self.ensure_one()
+        return f"/etc/letsencrypt/live/{self.subdomain_name}.{self.config_id.domain}/fullchain.pem"
+
+    @api.model
+    def _read_root_files(self, paths, sudo_password):
+        """Content of several root-only files with a single sudo call.
+
+        :returns: {path: bytes} for the files that could be read
+        """
+        if not paths:
+            return {}
+        # With -v, tail prints a "==> path <==" header before each file
+        result = subprocess.run(['sudo', '-S', 'tail', '-v', '-n', '+1', '--'] + list(paths),
+                                input=f"{sudo_password}\n".encode(), capture_output=True, timeout=60)
+        contents = {}
+        for path, content in re.findall(rb'==> (.+?) <==\n(.*?)(?=\n==> .+? <==\n|\Z)', result.stdout, re.S):
+            contents[path.decode()] = content
+        return contents
+
+    def _refresh_ssl_certificate_expiry(self):
+        """Read the expiry date of the certificates of the instances, all files in one batch.
+
+        The PEM is parsed in process; instances whose certificate is missing are reset.
+        """
+        config = self.env['saas.config'].search([], limit=1)
+        renew_days = config.ssl_renew_days or 30
+        with_subdomain = self.filtered(lambda i: i.includes_subdomain and i.subdomain_name)
+        paths = {instance.id: instance._get_ssl_certificate_path() for instance in with_subdomain}
+        if config.sudo_password:
+            contents = self._read_root_files(sorted(set(paths.values())), config.sudo_password)
+        else:
+            contents = {}
+            for path in set(paths.values()):
+                try:
+                    with open(path, 'rb') as f:
+                        contents[path] = f.read()
+                except OSError:
+                    continue
+
+        now = datetime.utcnow()
         for instance in self:
-            if instance.includes_subdomain and instance.subdomain_name:
+            expiry = False
+            content = contents.get(paths.get(instance.id))
+            if content:
                 try:
-                    cert_path = f"/etc/letsencrypt/live/{instance.subdomain_name}.{instance.config_id.domain}/fullchain.pem"
-                    if os.path.exists(cert_path):
-                        # Get certificate expiry date using openssl
-                        cmd = f"openssl x509 -enddate -noout -in {cert_path}"
-                        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=10)
-                        if result.returncode == 0:
-                            # Parse the output: notAfter=Jan 1 00:00:00 2025 GMT
-                            output = result.stdout.strip()
-                            if 'notAfter=' in output:
-                                date_str = output.split('notAfter=')[1]
-                                # Convert to datetime
-                                expiry_date = datetime.strptime(date_str, '%b %d %H:%M:%S %Y %Z')
-                                instance.ssl_certificate_expiry = expiry_date
-                            else:
-                                instance.ssl_certificate_expiry = False
-                        else:
-                            instance.ssl_certificate_expiry = False
-                    else:
-                        instance.ssl_certificate_expiry = False
-                except Exception as e:
+                    certificate = x509.load_pem_x509_certificate(content)
+                    expiry = getattr(certificate, 'not_valid_after_utc', None) or certificate.not_valid_after
+                    expiry = expiry.replace(tzinfo=None)
+                except ValueError as e:
                     _logger.warning(f"[LAUNCHLY_SAAS - {instance.name}] Error reading SSL certificate expiry: {str(e)}")
-                    instance.ssl_certificate_expiry = False
+            if not expiry:
+                state = 'none'
+            elif expiry <= now:
+                state = 'expired'
+            elif expiry <= now + timedelta(days=renew_days):
+                state = 'expiring'
             else:
-                instance.ssl_certificate_expiry = False
+                state = 'valid'
+            if instance.ssl_certificate_expiry != expiry or instance.ssl_certificate_state != state:
+                instance.write({'ssl_certificate_expiry': expiry, 'ssl_certificate_state': state})
+
+    def _renew_ssl_certificates(self, force=False):
+        """Renew the certificates of the instances with one certbot run per certificate in a single
+        sudo call, then reload nginx once.
+
+        :param force: renew even a certificate certbot does not consider due yet (explicit renewal)
+        """
+        instances = self.filtered(lambda i: i.includes_subdomain and i.subdomain_name)
+        if not instances:
+            return
+        config = self.env['saas.config'].search([], limit=1)
+        if not config.sudo_password:
+            if force:
+                raise UserError("Sudo password is not configured in SaaS Configuration.")
+            _logger.warning("[LAUNCHLY_SAAS] SSL certificate renewal skipped, no sudo password configured")
+            return
+        domains = [f"{instance.subdomain_name}.{instance.config_id.domain}" for instance in instances]
+        options = "--non-interactive --no-random-sleep-on-renew" + (" --force-renewal" if force else "")
+        script = "; ".join(
+            f"certbot renew --cert-name {shlex.quote(domain)} {options}"
+            for domain in domains
+        ) + "; systemctl reload nginx"
+        _logger.info(f"[LAUNCHLY_SAAS] Renewing {len(domains)} SSL certificates")
+        result = subprocess.run(['sudo', '-S', 'bash', '-c', script], input=f"{config.sudo_password}\n",
+                                capture_output=True, text=True, timeout=300 + 120 * len(domains))
+        if result.returncode != 0:
+            _logger.warning(f"[LAUNCHLY_SAAS] SSL certificate renewal reported errors: {result.stderr.strip()}")
+        instances._refresh_ssl_certificate_expiry()
+        for instance in instances:
+            if instance.ssl_certificate_state == 'valid':
+                instance.add_to_log(f"[SUCCESS] SSL certificate renewed until {instance.ssl_certificate_expiry}")
+            else:
+                instance.add_to_log("[WARNING] SSL certificate renewal failed, check the certbot logs")
+
+    def action_renew_ssl_certificate(self):
+        self._renew_ssl_certificates(force=True)
+        return True
+
+    @api.model
+    def _cron_check_ssl_certificates(self):
+        """Refresh the stored certificate expiry dates and renew the certificates close to expiry"""
+        instances = self.search([('includes_subdomain', '=', True), ('subdomain_name', '!=', False)])
+        instances._refresh_ssl_certificate_expiry()
+        due = instances.filtered(lambda i: i.ssl_certificate_state in ('expiring', 'expired'))
+        if due:
+            due._renew_ssl_certificates()
 
     @api.constrains('http_port')
     def _check_port_range(self):
@@ -2822,6 +3618,7 @@ except Exception as e:
             instance.add_to_log(f"[INFO] Creating subdomain configuration for {domain}")
 
             try:
+                wake_directives = instance._get_nginx_wake_directives()
                 # Create Nginx configuration (HTTP-only first, SSL added after certificate generation)
                 nginx_config_http = f"""# HTTP server block for {domain}
 server {{
@@ -2840,7 +3637,7 @@ server {{
         proxy_set_header X-Forwarded-Host $host;
         proxy_set_header X-Forwarded-Port $server_port;
     }}
-}}"""
+{wake_directives}}}"""
 
                 # Write HTTP-only Nginx configuration file first
                 config_path = f"/etc/nginx/sites-available/{domain}"
@@ -2936,7 +3733,7 @@ server {{
 
         add_header Content-Security-Policy "upgrade-insecure-requests" always;
     }}
-}}"""
+{wake_directives}}}"""
 
                     # Update to HTTPS configuration
                     try:
@@ -2982,7 +3779,7 @@ server {{
                     instance.add_to_log(f"[ERROR] Nginx configuration test or reload failed: {str(nginx_error)}")
 
                 # Refresh SSL certificate expiry
-                instance._compute_ssl_certificate_expiry()
+                instance._refresh_ssl_certificate_expiry()
 
                 _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Subdomain configuration completed for {domain}")
                 instance.add_to_log(f"[SUCCESS] Subdomain configuration completed: {domain}")
@@ -3045,6 +3842,8 @@ server {{
                     _logger.warning(f"[LAUNCHLY_SAAS - {instance.name}] Failed to reload Nginx: {str(reload_error)}")
                     instance.add_to_log(f"[WARNING] Failed to reload Nginx: {str(reload_error)}")
 
+                instance.write({'ssl_certificate_expiry': False, 'ssl_certificate_state': 'none'})
+
                 _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Subdomain configuration removed for {domain}")
                 instance.add_to_log(f"[SUCCESS] Subdomain configuration removed: {domain}")
 
@@ -3133,28 +3932,19 @@ try:
 except Exception as e:
     print("ERROR|{{}}".format(str(e)))
 '''
-                script_path = os.path.join(instance.instance_data_path, "odoo_init", "refresh_addons.py")
-                instance.create_file(script_path, script_content)
-                instance.chmod_with_sudo(script_path, 0o755)
-                # Execute script directly using instance's Python environment
-                venv_python = f"/opt/{instance.name}/venv/bin/python3"
-                if instance.root_sudo_password:
-                    cmd = f"sudo -u {instance.name} {venv_python} {script_path}"
-                    result = instance.excute_command_with_sudo(cmd, shell=True, check=False)
-                else:
-                    cmd = f"-u {instance.name} {venv_python} {script_path}"
-                    result = instance.excute_command(cmd, shell=True, check=False)
+                # Prefer the management bridge of the running instance, fall back to a one-shot script
+                result = instance._run_management_script(
+                    'refresh_addons.py', script_content, [{'op': 'list_modules'}])
+
                 if result.returncode == 0:
                     output = result.stdout.strip().splitlines()
                     if not output:
                         instance.add_to_log("[ERROR] No output returned from script")
                         return False
 
-                    # Clear existing addon_line records for this instance
-                    instance.addon_line.unlink()
-
                     # Dictionary to track addon states for custom addon line updates
                     addon_states = {}
+                    rows = {}
 
                     for line in output:
                         if line.startswith("ADDON|"):
@@ -3166,9 +3956,7 @@ except Exception as e:
                                 # Store addon state for custom addon line updates
                                 addon_states[addon_name] = addon_state
 
-                                # Create odoo.addon.line record
-                                instance.env['odoo.addon.line'].create({
-                                    'instance_id': instance.id,
+                                rows[addon_name] = {
                                     'name': addon_name,
                                     'state': 'installed' if addon_state == 'installed' else 'uninstalled',
                                     'summary': parts[3],
@@ -3177,11 +3965,16 @@ except Exception as e:
                                     'application': parts[6].lower() == 'true',
                                     'license': parts[7],
                                     'display_name': parts[8],
-                                })
+                                }
                         elif line.startswith("ERROR|"):
                             instance.add_to_log(f"[ERROR] Script error: {line.split('|', 1)[1]}")
                             return False
 
+                    # All the lines of the instance, the addon_line field only shows the LGPL ones
+                    addon_lines = self.env['odoo.addon.line'].search([('instance_id', '=', instance.id)])
+                    created, updated, removed = instance._sync_mirror_lines(addon_lines, 'name', rows)
+                    instance.add_to_log(f"[INFO] Addons: {created} added, {updated} updated, {removed} removed")
+
                     # Update custom addon lines with real state from the running instance
                     for custom_addon in instance.custom_addon_line:
                         if custom_addon.addon_name in addon_states:
@@ -3207,8 +4000,6 @@ except Exception as e:
                                     f"[INFO] Custom addon '{custom_addon.addon_name}' not found in instance, changed state from installed to ready")
 
                     instance.add_to_log("[SUCCESS] Refreshed addons list and updated custom addon states via script")
-                    # Clean up
-                    instance.remove_file_with_sudo(script_path)
                     return True
                 else:
                     instance.add_to_log(f"[ERROR] Script failed: {result.stderr}")
@@ -3230,7 +4021,8 @@ except Exception as e:
                 instance.add_to_log(f"[INFO] Uninstalling addons {addon_names} via internal script...")
 
                 # Convert addon_names to a Python list string for the script
-                addon_names_str = str(addon_names) if isinstance(addon_names, list) else str([addon_names])
+                addon_list = list(addon_names) if isinstance(addon_names, (list, tuple)) else [addon_names]
+                addon_names_str = str(addon_list)
 
                 script_content = f'''#!/usr/bin/env python3
 import os
@@ -3279,19 +4071,9 @@ except Exception as e:
     print("ERROR|Script execution failed: {{}}".format(str(e)))
     '''
 
-                script_path = os.path.join(instance.instance_data_path, "odoo_init", "uninstall_addons.py")
-                instance.create_file(script_path, script_content)
-                instance.chmod_with_sudo(script_path, 0o755)
-
-                # Execute script directly using instance's Python environment
-                venv_python = f"/opt/{instance.name}/venv/bin/python3"
-
-                if instance.root_sudo_password:
-                    cmd = f"sudo -u {instance.name} {venv_python} {script_path}"
-                    result = instance.excute_command_with_sudo(cmd, shell=True, check=False)
-                else:
-                    cmd = f"-u {instance.name} {venv_python} {script_path}"
-                    result = instance.excute_command(cmd, shell=True, check=False)
+                # Prefer the management bridge of the running instance, fall back to a one-shot script
+                result = instance._run_management_script(
+                    'uninstall_addons.py', script_content, [{'op': 'uninstall_modules', 'names': addon_list}])
 
                 if result.returncode == 0:
                     output = result.stdout.strip().splitlines()
@@ -3328,9 +4110,6 @@ except Exception as e:
                     _logger.info(
                         f"[LAUNCHLY_SAAS - {instance.name}] Uninstall completed: {success_count} success, {warning_count} warnings, {error_count} errors")
 
-                    # Clean up
-                    instance.remove_file_with_sudo(script_path)
-
                     return error_count == 0  # Return True only if no errors occurred
 
                 else:
@@ -3366,22 +4145,19 @@ with registry.cursor() as cr:
     cr.commit()
     print("SUCCESS|Set user_limit_enforcer.allowed_users_count to {instance.allowed_users_count}")
 '''
-            script_path = os.path.join(instance.instance_data_path, "odoo_init", "set_user_limit.py")
-            instance.create_file(script_path, script_content)
-            instance.chmod_with_sudo(script_path, 0o755)
-            # Execute script directly using instance's Python environment
-            venv_python = f"/opt/{instance.name}/venv/bin/python3"
-            if instance.root_sudo_password:
-                cmd = f"sudo -u {instance.name} {venv_python} {script_path}"
-                result = instance.excute_command_with_sudo(cmd, shell=True, check=False)
-            else:
-                cmd = f"-u {instance.name} {venv_python} {script_path}"
-                result = instance.excute_command(cmd, shell=True, check=False)
+            # Prefer the management bridge of the running instance, fall back to a one-shot script
+            result = instance._run_management_script(
+                'set_user_limit.py', script_content, [{'op': 'set_params', 'params': {
+                    'user_limit_enforcer.allowed_users_count': str(instance.allowed_users_count),
+                }}])
+
             if result.returncode == 0:
                 output = result.stdout if result.stdout else ''
                 if "SUCCESS|" in output:
                     instance.add_to_log(f"[SUCCESS] User limit set to {instance.allowed_users_count} in instance DB.")
-                    instance.restart_odoo_service()
+                    # Parameters written through the bridge are visible to the running server right away
+                    if not result.via_bridge:
+                        instance.restart_odoo_service()
 
                 else:
                     instance.add_to_log(f"[ERROR] User limit script output: {output}")
@@ -3425,26 +4201,20 @@ with registry.cursor() as cr:
     print("SUCCESS|Module restrictions set")
     '''
 
-            # Save script to instance path
-            script_path = os.path.join(instance.instance_data_path, "odoo_init", "set_module_limit.py")
-            instance.create_file(script_path, script_content)
-            instance.chmod_with_sudo(script_path, 0o755)
-
-            # Execute script directly using instance's Python environment
-            venv_python = f"/opt/{instance.name}/venv/bin/python3"
-            if instance.root_sudo_password:
-                cmd = f"sudo -u {instance.name} {venv_python} {script_path}"
-                result = instance.excute_command_with_sudo(cmd, shell=True, check=False)
-            else:
-                cmd = f"-u {instance.name} {venv_python} {script_path}"
-                result = instance.excute_command(cmd, shell=True, check=False)
+            # Prefer the management bridge of the running instance, fall back to a one-shot script
+            result = instance._run_management_script(
+                'set_module_limit.py', script_content, [{'op': 'set_params', 'params': {
+                    'module_install_limit.allowed_modules_count': str(instance.allowed_modules_count),
+                    'module_install_limit.allowed_module_names': allowed_names,
+                }}])
 
             # Log the result
             if result.returncode == 0:
                 output = result.stdout or ''
                 if "SUCCESS|" in output:
                     instance.add_to_log("[SUCCESS] Module limits set successfully in instance DB.")
-                    instance.restart_odoo_service()
+                    if not result.via_bridge:
+                        instance.restart_odoo_service()
                 else:
                     instance.add_to_log(f"[ERROR] Unexpected script output: {output}")
             else:
@@ -1,3 +1,4 @@
+import hashlib
 import logging
 import os
 import re
@@ -39,6 +40,34 @@ class OdooTemplate(models.Model):
     ], string='Odoo Version', required=True, default='18',
        help='Odoo version for installation')
 
+    def _get_shared_venv_paths(self):
+        """Return the (virtualenv, wheel cache) paths shared by every instance of this template.
+
+        The virtualenv is keyed by Odoo version and requirements.txt hash so that templates with
+        the same dependencies share it, and a requirements change gets a fresh environment.
+        """
+        self.ensure_one()
+        config = self.env['saas.config'].search([], limit=1)
+        root = config.shared_venv_root or '/opt/launchly_venvs'
+        requirements_path = os.path.join(self.source_path or '', 'requirements.txt')
+        requirements_hash = 'default'
+        if os.path.isfile(requirements_path):
+            with open(requirements_path, 'rb') as f:
+                requirements_hash = hashlib.sha256(f.read()).hexdigest()[:12]
+        return (os.path.join(root, f"{self.odoo_version}-{requirements_hash}"),
+                os.path.join(root, 'wheels'))
+
+    def action_view_golden_databases(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'Golden Databases',
+            'res_model': 'odoo.golden.database',
+            'view_mode': 'list,form',
+            'domain': [('template_id', '=', self.id)],
+            'context': {'default_template_id': self.id},
+        }
+
     @api.constrains('source_path', 'odoo_version')
     def _check_source_path(self):
         """Validate that the Odoo source path exists and contains odoo-bin"""
@@ -0,0 +1,151 @@
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+
+from odoo import models, api
+from odoo.sql_db import db_connect
+
+_logger = logging.getLogger(__name__)
+
+# application_name of the management connections, excluded from the tenant connection counts
+APPLICATION_NAME = 'launchly_saas'
+# Tenant pools kept open at the same time, the least recently used one is closed beyond that
+MAX_TENANT_POOLS = 16
+# Connections per tenant pool, management queries are short and rarely concurrent
+MAX_TENANT_CONNECTIONS = 2
+
+_tenant_pools = OrderedDict()
+_tenant_pools_lock = threading.Lock()
+
+
+class _TenantPool(ThreadedConnectionPool):
+    """Connection pool counting its borrowers, so that a pool removed while a thread still uses it
+    is only closed once that thread is done"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.borrowers = 0
+        self.retired = False
+
+
+def _retire(pool):
+    # Called with the lock held
+    pool.retired = True
+    if not pool.borrowers:
+        pool.closeall()
+
+
+def _get_tenant_pool(dsn):
+    """Pool of the tenant database, registered as borrowed until `_release_tenant_pool`"""
+    key = tuple(sorted(dsn.items()))
+    with _tenant_pools_lock:
+        pool = _tenant_pools.pop(key, None)
+        if pool is None:
+            pool = _TenantPool(0, MAX_TENANT_CONNECTIONS, application_name=APPLICATION_NAME, **dsn)
+        _tenant_pools[key] = pool
+        pool.borrowers += 1
+        while len(_tenant_pools) > MAX_TENANT_POOLS:
+            _old_key, old_pool = _tenant_pools.popitem(last=False)
+            _retire(old_pool)
+        return pool
+
+
+def _release_tenant_pool(pool):
+    with _tenant_pools_lock:
+        pool.borrowers -= 1
+        if pool.retired and not pool.borrowers:
+            pool.closeall()
+
+
+def close_tenant_pool(dbname):
+    """Close the pooled connections of this process to a tenant database, e.g. before restoring it.
+
+    The other workers have their own pools: use `terminate_pooled_connections_sql` before dropping
+    the database.
+    """
+    with _tenant_pools_lock:
+        for key in [key for key in _tenant_pools if dict(key).get('dbname') == dbname]:
+            _retire(_tenant_pools.pop(key))
+
+
+def terminate_pooled_connections_sql(dbname):
+    """SQL ending the pooled connections of every worker process to a tenant database"""
+    literal = "'%s'" % dbname.replace("'", "''")
+    return ("SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+            f"WHERE datname = {literal} AND application_name = '{APPLICATION_NAME}'")
+
+
+@contextmanager
+def tenant_cursor(dsn):
+    """Cursor on a pooled connection to a tenant database, committed on success"""
+    pool = _get_tenant_pool(dsn)
+    try:
+        conn = pool.getconn()
+    except Exception:
+        _release_tenant_pool(pool)
+        raise
+    broken = False
+    try:
+        with conn.cursor() as cr:
+            yield cr
+        conn.commit()
+    except psycopg2.OperationalError:
+        # Connection lost (e.g. the database was restarted), do not give it back to the pool
+        broken = True
+        raise
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn, close=broken or conn.closed)
+        _release_tenant_pool(pool)
+
+
+class LaunchlyPostgres(models.AbstractModel):
+    _name = 'launchly.postgres'
+    _description = 'PostgreSQL Fleet Access'
+
+    @contextmanager
+    def _server_cursor(self):
+        """Cursor on the maintenance database of the PostgreSQL server, with the manager credentials"""
+        with db_connect('postgres').cursor() as cr:
+            yield cr
+
+    @api.model
+    def _get_database_stats(self, db_names=None):
+        """Size, connections and activity of every database of the server in one round trip.
+
+        :returns: {datname: {'size': bytes or None, 'connections': int, 'xact_commit': int,
+                   'xact_rollback': int, 'cache_hit_ratio': float or None}}
+        """
+        with self._server_cursor() as cr:
+            cr.execute("""
+                SELECT d.datname,
+                       CASE WHEN has_database_privilege(d.datname, 'CONNECT')
+                            THEN pg_database_size(d.datname) END,
+                       COALESCE(a.connections, 0),
+                       s.xact_commit, s.xact_rollback, s.blks_read, s.blks_hit
+                  FROM pg_database d
+                  LEFT JOIN pg_stat_database s ON s.datid = d.oid
+                  LEFT JOIN (SELECT datid, count(*) AS connections
+                               FROM pg_stat_activity
+                              WHERE application_name IS DISTINCT FROM %(application)s
+                              GROUP BY datid) a ON a.datid = d.oid
+                 WHERE NOT d.datistemplate
+                   AND (%(names)s::text[] IS NULL OR d.datname = ANY(%(names)s::text[]))
+            """, {'application': APPLICATION_NAME, 'names': None if db_names is None else list(db_names)})
+            stats = {}
+            for datname, size, connections, commits, rollbacks, blks_read, blks_hit in cr.fetchall():
+                blocks = (blks_read or 0) + (blks_hit or 0)
+                stats[datname] = {
+                    'size': size,
+                    'connections': connections,
+                    'xact_commit': commits or 0,
+                    'xact_rollback': rollbacks or 0,
+                    'cache_hit_ratio': round((blks_hit or 0) * 100.0 / blocks, 2) if blocks else None,
+                }
+            return stats
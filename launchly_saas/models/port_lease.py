@@ -0,0 +1,166 @@
+import logging
+import socket
+
+from psycopg2.errors import UniqueViolation
+
+from odoo import models, fields, api
+from odoo.exceptions import ValidationError, UserError
+
+_logger = logging.getLogger(__name__)
+
+
+class OdooPortRange(models.Model):
+    _name = 'odoo.port.range'
+    _description = 'Instance Port Range'
+    _order = 'sequence, start_port'
+
+    name = fields.Char(string='Name', required=True)
+    sequence = fields.Integer(string='Sequence', default=10)
+    active = fields.Boolean(string='Active', default=True)
+    start_port = fields.Integer(string='First Port', required=True)
+    end_port = fields.Integer(string='Last Port', required=True)
+    lease_count = fields.Integer(string='Leased Ports', compute='_compute_lease_count')
+
+    _sql_constraints = [
+        ('port_order', 'CHECK (start_port >= 1024 AND end_port <= 65535 AND start_port < end_port)',
+         'Ports must be between 1024 and 65535 and the first port lower than the last one !'),
+    ]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        port_ranges = super().create(vals_list)
+        # Attach the leases taken before the range existed (e.g. migrated instances)
+        for port_range in port_ranges:
+            self.env.cr.execute("""
+                UPDATE odoo_port_lease SET range_id = %s
+                 WHERE range_id IS NULL AND port BETWEEN %s AND %s
+            """, (port_range.id, port_range.start_port, port_range.end_port))
+        return port_ranges
+
+    def _compute_lease_count(self):
+        counts = dict(self.env['odoo.port.lease']._read_group(
+            [('range_id', 'in', self.ids)], ['range_id'], ['__count']))
+        for port_range in self:
+            port_range.lease_count = counts.get(port_range, 0)
+
+    @api.constrains('start_port', 'end_port')
+    def _check_overlap(self):
+        for port_range in self:
+            overlapping = self.with_context(active_test=False).search([
+                ('id', '!=', port_range.id),
+                ('start_port', '<=', port_range.end_port),
+                ('end_port', '>=', port_range.start_port),
+            ], limit=1)
+            if overlapping:
+                raise ValidationError(f"Port range '{port_range.name}' overlaps with '{overlapping.name}'")
+
+    def _free_gaps(self):
+        """Free port intervals (first, last) of the range, in port order.
+
+        One pass over the leased ports of the range in the unique port index (linear in the number
+        of leases of the range) instead of testing every port of the range.
+        """
+        self.ensure_one()
+        self.env.cr.execute("""
+            SELECT port + 1, next_port - 1
+              FROM (SELECT port, LEAD(port) OVER (ORDER BY port) AS next_port
+                      FROM (SELECT port FROM odoo_port_lease WHERE port BETWEEN %(start)s AND %(end)s
+                            UNION ALL SELECT %(start)s - 1
+                            UNION ALL SELECT %(end)s + 1) AS used) AS gaps
+             WHERE next_port - port > 2
+             ORDER BY port
+        """, {'start': self.start_port, 'end': self.end_port})
+        return self.env.cr.fetchall()
+
+
+class OdooPortLease(models.Model):
+    _name = 'odoo.port.lease'
+    _description = 'Instance Port Lease'
+    _order = 'port'
+    _rec_name = 'port'
+
+    port = fields.Integer(string='Port', required=True, readonly=True)
+    kind = fields.Selection([
+        ('http', 'HTTP'),
+        ('longpolling', 'Longpolling'),
+    ], string='Usage', required=True, readonly=True)
+    instance_id = fields.Many2one('odoo.instance', string='Instance', required=True, ondelete='cascade',
+                                  index=True, readonly=True)
+    range_id = fields.Many2one('odoo.port.range', string='Port Range', ondelete='set null', readonly=True)
+
+    _sql_constraints = [
+        ('port_uniq', 'unique (port)', 'This port is already leased by another instance !'),
+        ('instance_kind_uniq', 'unique (instance_id, kind)', 'An instance can lease only one port per usage !'),
+    ]
+
+    def init(self):
+        # Lease the ports of the instances created before the lease table existed; an instance
+        # sharing its port with an older one keeps no lease and gets new ports when provisioned
+        for kind, column in (('http', 'http_port'), ('longpolling', 'longpolling_port')):
+            self.env.cr.execute(f"""
+                INSERT INTO odoo_port_lease (port, kind, instance_id, range_id,
+                                             create_uid, create_date, write_uid, write_date)
+                SELECT DISTINCT ON (i.{column}::integer)
+                       i.{column}::integer, %s, i.id,
+                       (SELECT r.id FROM odoo_port_range r
+                         WHERE i.{column}::integer BETWEEN r.start_port AND r.end_port LIMIT 1),
+                       1, now() at time zone 'UTC', 1, now() at time zone 'UTC'
+                  FROM odoo_instance i
+                 WHERE i.{column} ~ '^[0-9]+$'
+                 ORDER BY i.{column}::integer, i.id
+                ON CONFLICT DO NOTHING
+            """, (kind,))
+
+    @api.model
+    def _is_port_bindable(self, port):
+        """Check that nothing outside of the leases (another service) listens on the port"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.bind(("0.0.0.0", port))
+            return True
+        except OSError:
+            return False
+        finally:
+            sock.close()
+
+    @api.model
+    def _allocate_pair(self, instance):
+        """Lease two consecutive free ports (http, longpolling) for the instance.
+
+        The free gaps are read from the transaction snapshot, which misses the leases committed
+        meanwhile by concurrent allocations: each pair is inserted in a savepoint and the unique
+        port constraint makes a pair taken by another transaction fall through to the next one.
+        """
+        for port_range in self.env['odoo.port.range'].search([]):
+            for first, last in port_range._free_gaps():
+                for port in range(first, last):
+                    if not (self._is_port_bindable(port) and self._is_port_bindable(port + 1)):
+                        continue
+                    try:
+                        with self.env.cr.savepoint():
+                            return self.create([
+                                {'port': port, 'kind': 'http', 'instance_id': instance.id,
+                                 'range_id': port_range.id},
+                                {'port': port + 1, 'kind': 'longpolling', 'instance_id': instance.id,
+                                 'range_id': port_range.id},
+                            ])
+                    except UniqueViolation as e:
+                        if e.diag.constraint_name != 'odoo_port_lease_port_uniq':
+                            raise
+                        _logger.info(f"[LAUNCHLY_SAAS] Ports {port}-{port + 1} taken concurrently, trying the next ones")
+        raise UserError("No free ports left in the configured port ranges")
+
+    @api.model
+    def _lease_ports(self, instance, ports):
+        """Lease explicitly chosen ports ({kind: port}) for the instance"""
+        vals_list = []
+        for kind, port in ports.items():
+            owner = self.search([('port', '=', port)], limit=1)
+            if owner and owner.instance_id != instance:
+                raise UserError(f"Port {port} is already used by instance '{owner.instance_id.name}'")
+            if not owner:
+                port_range = self.env['odoo.port.range'].search(
+                    [('start_port', '<=', port), ('end_port', '>=', port)], limit=1)
+                vals_list.append({'port': port, 'kind': kind, 'instance_id': instance.id,
+                                  'range_id': port_range.id})
+        return self.create(vals_list)
@@ -0,0 +1,194 @@
+import logging
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from odoo import models, fields, api, SUPERUSER_ID
+from odoo.modules.registry import Registry
+
+_logger = logging.getLogger(__name__)
+
+
+class ProvisionJob(models.Model):
+    _name = 'launchly.provision.job'
+    _description = 'Instance Provisioning Job'
+    _order = 'id desc'
+
+    # Ordered install steps with the progress (%) reached when the step starts
+    _STEPS = [
+        ('queued', 'Queued', 0),
+        ('install', 'Installing Odoo', 10),
+        ('start', 'Starting Service', 80),
+        ('finalize', 'Finalizing', 95),
+        ('done', 'Done', 100),
+    ]
+    # Jobs running for longer than this are considered lost (e.g. worker killed)
+    _STALE_AFTER = timedelta(hours=2)
+
+    name = fields.Char(string='Reference', required=True, readonly=True, default='New', copy=False)
+    instance_id = fields.Many2one('odoo.instance', string='Instance', required=True, ondelete='cascade',
+                                  readonly=True)
+    subscription_id = fields.Many2one('launchly.subscription', string='Subscription', ondelete='set null',
+                                      readonly=True)
+    job_type = fields.Selection([
+        ('subscription', 'Subscription'),
+        ('demo', 'Demo'),
+    ], string='Type', default='subscription', required=True, readonly=True)
+    state = fields.Selection([
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='State', default='queued', required=True, readonly=True, index=True)
+    step = fields.Selection([(code, label) for code, label, progress in _STEPS],
+                            string='Step', default='queued', readonly=True)
+    progress = fields.Integer(string='Progress (%)', default=0, readonly=True)
+    step_log = fields.Text(string='Steps', readonly=True)
+    error = fields.Text(string='Error', readonly=True)
+    date_started = fields.Datetime(string='Started', readonly=True)
+    date_finished = fields.Datetime(string='Finished', readonly=True)
+    access_token = fields.Char(string='Access Token', readonly=True, copy=False,
+                               default=lambda self: secrets.token_urlsafe(24),
+                               help="Token required by the public status endpoint")
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            if vals.get('name', 'New') == 'New':
+                vals['name'] = self.env['ir.sequence'].next_by_code('launchly.provision.job') or 'New'
+        return super().create(vals_list)
+
+    @api.model
+    def _enqueue(self, instance, job_type='subscription', subscription=False):
+        """Queue the provisioning of an instance and wake the worker pool up"""
+        job = self.sudo().create({
+            'instance_id': instance.id,
+            'subscription_id': subscription.id if subscription else False,
+            'job_type': job_type,
+        })
+        job._append_step_log('Queued')
+        self.env.ref('launchly_saas.ir_cron_process_provision_jobs').sudo()._trigger()
+        _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Provisioning job {job.name} queued")
+        return job
+
+    def _append_step_log(self, message):
+        for job in self:
+            line = f"{fields.Datetime.to_string(fields.Datetime.now())} {message}"
+            job.step_log = f"{job.step_log}\n{line}" if job.step_log else line
+
+    def _set_step(self, step):
+        progress = dict((code, progress) for code, label, progress in self._STEPS)[step]
+        label = dict((code, label) for code, label, progress in self._STEPS)[step]
+        self.write({'step': step, 'progress': progress})
+        self._append_step_log(label)
+        # Make the progress visible to the status endpoint right away
+        self.env.cr.commit()
+
+    def get_status(self):
+        """Public status payload returned by the polling endpoint"""
+        self.ensure_one()
+        instance = self.instance_id
+        return {
+            'job_id': self.id,
+            'reference': self.name,
+            'state': self.state,
+            'step': self.step,
+            'progress': self.progress,
+            'steps': (self.step_log or '').splitlines(),
+            'error': self.error if self.state == 'failed' else None,
+            'instance_id': instance.id,
+            'instance_url': (instance.domained_url or instance.instance_url) if self.state == 'done' else None,
+        }
+
+    @api.model
+    def _cron_process_jobs(self):
+        """Claim queued jobs up to the configured concurrency and run them in a bounded pool"""
+        config = self.env['saas.config'].search([], limit=1)
+        concurrency = max(config.provision_concurrency or 1, 1)
+
+        stale_jobs = self.search([
+            ('state', '=', 'running'),
+            ('date_started', '<', fields.Datetime.now() - self._STALE_AFTER),
+        ])
+        for job in stale_jobs:
+            job.write({'state': 'failed', 'error': 'Provisioning worker was interrupted',
+                       'date_finished': fields.Datetime.now()})
+            job._append_step_log('Failed: worker was interrupted')
+
+        running_count = self.search_count([('state', '=', 'running')])
+        free_slots = concurrency - running_count
+        if free_slots <= 0:
+            return
+
+        # SKIP LOCKED lets several cron workers share the queue without claiming the same job
+        self.env.cr.execute("""
+            SELECT id FROM launchly_provision_job
+             WHERE state = 'queued'
+             ORDER BY id
+             LIMIT %s
+             FOR UPDATE SKIP LOCKED
+        """, (free_slots,))
+        job_ids = [row[0] for row in self.env.cr.fetchall()]
+        if not job_ids:
+            return
+
+        self.browse(job_ids).write({'state': 'running', 'date_started': fields.Datetime.now()})
+        self.env.cr.commit()
+
+        dbname = self.env.cr.dbname
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(job_ids)),
+                                thread_name_prefix='launchly_provision') as executor:
+            for job_id in job_ids:
+                executor.submit(self._run_job_in_thread, dbname, job_id)
+
+        # More work may have been queued while this batch was running
+        if self.search_count([('state', '=', 'queued')]):
+            self.env.ref('launchly_saas.ir_cron_process_provision_jobs')._trigger()
+
+    @api.model
+    def _run_job_in_thread(self, dbname, job_id):
+        threading.current_thread().dbname = dbname
+        try:
+            with Registry(dbname).cursor() as cr:
+                env = api.Environment(cr, SUPERUSER_ID, {})
+                env['launchly.provision.job'].browse(job_id)._run()
+        except Exception as e:
+            _logger.exception(f"[LAUNCHLY_SAAS] Provisioning job {job_id} crashed: {str(e)}")
+
+    def _run(self):
+        """Run the install steps, committing after each one so progress can be polled"""
+        self.ensure_one()
+        # Instance log entries written by the job are tagged with its reference
+        instance = self.instance_id.with_context(launchly_operation=self.name)
+        try:
+            self._set_step('install')
+            instance.create_odoo_environment()
+            self.env.cr.commit()
+
+            self._set_step('start')
+            instance.restart_instance()
+            self.env.cr.commit()
+
+            self._set_step('finalize')
+            if self.subscription_id and self.subscription_id.instance_id != instance:
+                self.subscription_id.instance_id = instance.id
+
+            self.write({'state': 'done', 'date_finished': fields.Datetime.now()})
+            self._set_step('done')
+            _logger.info(f"[LAUNCHLY_SAAS - {instance.name}] Provisioning job {self.name} done")
+        except Exception as e:
+            self.env.cr.rollback()
+            _logger.error(f"[LAUNCHLY_SAAS - {instance.name}] Provisioning job {self.name} failed: {str(e)}")
+            self.write({'state': 'failed', 'error': str(e), 'date_finished': fields.Datetime.now()})
+            self._append_step_log(f"Failed: {str(e)}")
+            instance.write({'state': 'error'})
+            instance.add_to_log(f"[ERROR] Provisioning failed: {str(e)}")
+            self.env.cr.commit()
+
+    def action_retry(self):
+        for job in self.filtered(lambda j: j.state == 'failed'):
+            job.write({'state': 'queued', 'step': 'queued', 'progress': 0, 'error': False,
+                       'date_started': False, 'date_finished': False})
+            job._append_step_log('Queued again')
+        self.env.ref('launchly_saas.ir_cron_process_provision_jobs')._trigger()
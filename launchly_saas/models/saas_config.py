@@ -10,5 +10,36 @@ class SaasConfig(models.Model):
     backup_path = fields.Char(string='Backup Path', help='Base directory for instance backups')
     domain = fields.Char(string='Domain', help='Domain for the SaaS instances')
     ssl_email = fields.Char(string='SSL Email', help='Email for SSL certificate registration')
+    wake_url = fields.Char(string='Wake-up URL',
+                           help='URL of this server as reached from nginx (e.g. http://127.0.0.1:8069), selecting '
+                                'this database. Instance vhosts send the requests of hibernated instances to it.')
+    ssl_renew_days = fields.Integer(string='Renew SSL Certificates Before (days)', default=30,
+                                    help='Certificates expiring within this many days are renewed by the daily check')
     instance_id = fields.Many2one('odoo.instance', string='Default Instance')
     script_path = fields.Char()
+    provision_concurrency = fields.Integer(string='Provisioning Concurrency', default=2,
+                                           help='Maximum number of instances installed at the same time')
+    backup_concurrency = fields.Integer(string='Backup Concurrency', default=0,
+                                        help='Instances backed up at the same time, 0 uses half of the host cores (at most 4)')
+    backup_large_tenant_mb = fields.Integer(string='Large Tenant Threshold (MB)', default=2048,
+                                            help='Tenants whose backups exceed this size are staggered')
+    backup_large_concurrency = fields.Integer(string='Large Tenant Backup Concurrency', default=1,
+                                              help='Large tenants backed up at the same time')
+    fleet_concurrency = fields.Integer(string='Fleet Operation Concurrency', default=8,
+                                       help='Instances started, stopped or upgraded at the same time by fleet operations')
+    shared_venv_root = fields.Char(string='Shared Virtualenvs Path', default='/opt/launchly_venvs',
+                                   help='Base directory of the virtualenvs shared by instances of the same Odoo '
+                                        'version and requirements, and of their wheel cache')
+    log_max_entries = fields.Integer(string='Log Entries Kept per Instance', default=2000,
+                                     help='Older instance log entries are removed by a daily cleanup')
+    addon_store_path = fields.Char(string='Addon Store Path', default='/opt/launchly_addons',
+                                   help='Directory holding one copy of each custom addon version, linked into the instances')
+    addon_zip_max_entries = fields.Integer(string='Addon ZIP Max Entries', default=10000,
+                                           help='Uploaded addon archives with more entries are rejected')
+    addon_zip_max_file_mb = fields.Integer(string='Addon ZIP Max File Size (MB)', default=50,
+                                           help='Uploaded addon archives holding a larger file are rejected')
+    addon_zip_max_total_mb = fields.Integer(string='Addon ZIP Max Total Size (MB)', default=500,
+                                            help='Uploaded addon archives expanding to more than this are rejected')
+    metric_minute_retention_days = fields.Integer(string='Minute Metrics Retention (days)', default=2)
+    metric_hour_retention_days = fields.Integer(string='Hourly Metrics Retention (days)', default=90)
+    metric_day_retention_days = fields.Integer(string='Daily Metrics Retention (days)', default=730)
@@ -43,6 +43,8 @@ class Subscription(models.Model):
     renewal_history_ids = fields.One2many('subscription.renewal.history', 'subscription_id', string='Renewal History', ondelete='cascade')
 
     project_id = fields.Many2one('project.project', string='Project', ondelete='cascade', readonly=True)
+    provision_job_id = fields.Many2one('launchly.provision.job', string='Provisioning Job', readonly=True)
+    provision_state = fields.Selection(related='provision_job_id.state', string='Provisioning State')
 
     @api.depends('start_date', 'subscription_period')
     def _compute_end_date(self):
@@ -110,7 +112,11 @@ class Subscription(models.Model):
 
         return subscription
     def _create_odoo_instance(self):
-        """Automatically create a odoo instance for this subscription."""
+        """Automatically create a odoo instance for this subscription.
+
+        Only the instance record is created here; the installation itself is queued as a
+        provisioning job and runs off the request path.
+        """
         self.ensure_one()
 
         partner = self.partner_id
@@ -137,34 +143,20 @@ class Subscription(models.Model):
 
         instance = self.env['odoo.instance'].with_context(skip_template_apply=True).create(instance_vals)
 
-        if not instance.http_port:
-            instance.http_port = instance._get_available_port()
-        if not instance.longpolling_port:
-            instance.longpolling_port = instance._get_available_port(int(instance.http_port) + 1)
-
         template = plan.template_id
         if template:
             instance.write({'template_id': template.id})
-            instance.onchange_template_id()
-
-            odoo_var = instance.variable_ids.filtered(lambda r: r.name == '{{ODOO-VERSION}}')
-            plan_odoo_var = template.variable_ids.filtered(lambda r: r.name == '{{ODOO-VERSION}}')
-            if odoo_var and plan_odoo_var and plan_odoo_var.demo_value:
-                odoo_var.demo_value = plan_odoo_var.demo_value
-
-            pg_var = instance.variable_ids.filtered(lambda r: r.name == '{{POSTGRES-VERSION}}')
-            plan_pg_var = template.variable_ids.filtered(lambda r: r.name == '{{POSTGRES-VERSION}}')
-            if pg_var and plan_pg_var and plan_pg_var.demo_value:
-                pg_var.demo_value = plan_pg_var.demo_value
 
         instance._compute_instance_url()
         instance._compute_config_id()
         instance.invalidate_recordset()
-        instance.create_odoo_environment()
-        instance.restart_instance()
 
         self.instance_id = instance.id
-        _logger.info('odoo instance %s created for subscription %s', instance.name, self.name)
+        self.provision_job_id = self.env['launchly.provision.job']._enqueue(
+            instance, job_type='subscription', subscription=self)
+        _logger.info('odoo instance %s created for subscription %s, provisioning job %s queued',
+                     instance.name, self.name, self.provision_job_id.name)
+        return self.provision_job_id
 
     def action_cancel_subscription(self):
         self.write({'state': 'cancelled'})
@@ -244,11 +236,14 @@ class Subscription(models.Model):
             ('end_date', '<', fields.Date.today())
         ])
         expired_subscriptions.write({'state': 'expired'})
-        for subscription in expired_subscriptions:
-            if subscription.instance_id:
-                try:
-                    subscription.instance_id.stop_instance()
-                    _logger.info(f'Stopped instance {subscription.instance_id.name} for expired subscription {subscription.name}')
-                except Exception as e:
-                    _logger.error(f'Failed to stop instance {subscription.instance_id.name} for expired subscription {subscription.name}: {str(e)}')
+        # Their service is already stopped, they must just not be woken up anymore
+        hibernated = expired_subscriptions.instance_id.filtered(lambda i: i.state == 'hibernated')
+        hibernated.write({'state': 'stopped', 'hibernated_since': False})
+        instances = expired_subscriptions.instance_id.filtered(lambda i: i.state == 'running')
+        if instances:
+            # One fleet operation stops all the expired instances concurrently, a failing
+            # instance is recorded on its result line without blocking the others
+            operation = self.env['odoo.fleet.operation']._run_for(instances, 'stop', max_error_rate=100.0)
+            _logger.info(f'Stopped {operation.success_count} of {len(instances)} instances for expired '
+                         f'subscriptions ({operation.name})')
         _logger.info(f'Updated {len(expired_subscriptions)} expired subscriptions')
@@ -0,0 +1,59 @@
+#!/bin/bash
+################################################################################
+# Shared Virtualenv Builder
+# Builds (once) the virtualenv shared read-only by every instance of the same
+# Odoo version and requirements.txt, backed by a local wheel cache so that a
+# rebuild installs prebuilt wheels instead of recompiling psycopg2, lxml, ...
+# Usage:
+#   ./setup_shared_venv.sh <shared_venv_path> <wheel_cache_path> <source_path>
+################################################################################
+
+# Exit on error
+set -e
+
+SHARED_VENV=$1
+WHEEL_CACHE=$2
+SOURCE_PATH=$3
+READY_MARKER="$SHARED_VENV/.launchly-ready"
+
+if [ -f "$READY_MARKER" ]; then
+    echo "Shared virtualenv $SHARED_VENV is ready."
+    exit 0
+fi
+
+sudo mkdir -p "$(dirname "$SHARED_VENV")" "$WHEEL_CACHE"
+
+# Concurrent installations of the same version wait for a single build, apt-get included
+exec 9>"$SHARED_VENV.lock"
+flock 9
+
+if [ ! -f "$READY_MARKER" ]; then
+    echo "Building shared virtualenv $SHARED_VENV..."
+    # Build dependencies (only needed when wheels must be built)
+    sudo apt-get install -y git python3.10 python3.10-venv python3.10-dev \
+        libxml2-dev libxslt1-dev zlib1g-dev libsasl2-dev libldap2-dev \
+        build-essential libssl-dev libffi-dev libjpeg-dev libpq-dev \
+        xfonts-75dpi xfonts-base fontconfig acl
+
+    # A previous build without the ready marker is incomplete
+    sudo rm -rf "$SHARED_VENV"
+    sudo python3.10 -m venv "$SHARED_VENV"
+    sudo "$SHARED_VENV/bin/python3.10" -m pip install --upgrade pip wheel setuptools
+
+    # Build missing wheels into the cache, then install from the cache only
+    sudo "$SHARED_VENV/bin/python3.10" -m pip wheel \
+        --wheel-dir "$WHEEL_CACHE" --find-links "$WHEEL_CACHE" \
+        -r "$SOURCE_PATH/requirements.txt"
+    sudo "$SHARED_VENV/bin/python3.10" -m pip install \
+        --no-index --find-links "$WHEEL_CACHE" \
+        -r "$SOURCE_PATH/requirements.txt"
+
+    # Instances only get read access to the shared environment
+    sudo chmod -R a+rX,go-w "$SHARED_VENV"
+    sudo touch "$READY_MARKER"
+    echo "Shared virtualenv $SHARED_VENV built successfully."
+else
+    echo "Shared virtualenv $SHARED_VENV was built by another installation."
+fi
+
+flock -u 9
@@ -0,0 +1,70 @@
+/** @odoo-module **/
+
+import { Component, onMounted, onWillUnmount, onWillUpdateProps, useEffect, useRef, useState } from "@odoo/owl";
+import { registry } from "@web/core/registry";
+import { useService } from "@web/core/utils/hooks";
+import { standardFieldProps } from "@web/views/fields/standard_field_props";
+
+// Keep in line with LOG_DISPLAY_MAX_LINES on the server
+const MAX_LINES = 2000;
+// The server follows an instance for two minutes after each ping
+const FOLLOW_PING_INTERVAL = 60000;
+
+export class InstanceLogViewer extends Component {
+    static template = "launchly_saas.InstanceLogViewer";
+    static props = { ...standardFieldProps };
+
+    setup() {
+        this.orm = useService("orm");
+        this.busService = useService("bus_service");
+        this.logRef = useRef("log");
+        this.state = useState({ text: this.props.record.data[this.props.name] || "" });
+        this.onLogs = this.onLogs.bind(this);
+
+        onWillUpdateProps((nextProps) => {
+            this.state.text = nextProps.record.data[nextProps.name] || "";
+        });
+        onMounted(() => {
+            this.busService.subscribe("launchly_saas.instance_logs", this.onLogs);
+            this.busService.start();
+            this.follow();
+            this.followInterval = setInterval(() => this.follow(), FOLLOW_PING_INTERVAL);
+        });
+        onWillUnmount(() => {
+            clearInterval(this.followInterval);
+            this.busService.unsubscribe("launchly_saas.instance_logs", this.onLogs);
+        });
+        useEffect(
+            () => {
+                const el = this.logRef.el;
+                if (el) {
+                    el.scrollTop = el.scrollHeight;
+                }
+            },
+            () => [this.state.text]
+        );
+    }
+
+    follow() {
+        const resId = this.props.record.resId;
+        if (resId) {
+            this.orm.call("odoo.instance", "action_follow_logs", [[resId]]);
+        }
+    }
+
+    onLogs(payload) {
+        if (payload.instance_id !== this.props.record.resId || !payload.text) {
+            return;
+        }
+        const lines = (this.state.text + payload.text).split("\n");
+        this.state.text = lines.slice(-MAX_LINES - 1).join("\n");
+    }
+}
+
+export const instanceLogViewer = {
+    component: InstanceLogViewer,
+    displayName: "Instance Log Viewer",
+    supportedTypes: ["text"],
+};
+
+registry.category("fields").add("instance_log_viewer", instanceLogViewer);
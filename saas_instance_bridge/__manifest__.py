@@ -0,0 +1,14 @@
+{
+    'name': 'SaaS Instance Bridge',
+    'version': '1.0',
+    'summary': 'Management endpoint used by Launchly SaaS to administrate this instance',
+    'description': 'Exposes a token protected, local-only JSON endpoint that runs batched management commands '
+                   '(users, modules, configuration parameters) inside the running Odoo process.',
+    'author': 'Abdulrahman Elassal',
+    'category': 'Tools',
+    'depends': ['base'],
+    'data': [],
+    'installable': True,
+    'application': False,
+    'auto_install': False,
+}
@@ -0,0 +1,145 @@
+import logging
+
+from odoo import api, http, SUPERUSER_ID
+from odoo.http import request
+from odoo.tools import consteq
+
+_logger = logging.getLogger(__name__)
+
+TOKEN_PARAM = 'saas_instance_bridge.token'
+LOOPBACK_ADDRESSES = ('127.0.0.1', '::1')
+
+
+class SaasInstanceBridge(http.Controller):
+    """Management endpoint called by Launchly SaaS from the same host.
+
+    Every command runs inside the already running Odoo process and answers with the same
+    line protocol the generated management scripts used to print (SUCCESS|, WARNING|,
+    ERROR|, USER|, ADDON|), so the manager can parse both the same way.
+    """
+
+    @http.route('/saas/bridge/execute', type='json', auth='none', methods=['POST'], csrf=False)
+    def execute(self, token=None, commands=None):
+        httprequest = request.httprequest
+        # Requests proxied by nginx also come from the loopback address, but carry forwarding headers
+        if httprequest.remote_addr not in LOOPBACK_ADDRESSES or httprequest.headers.get('X-Forwarded-For'):
+            return {'error': 'forbidden'}
+        if not request.db:
+            return {'error': 'no database'}
+
+        env = api.Environment(request.env.cr, SUPERUSER_ID, {})
+        expected_token = env['ir.config_parameter'].get_param(TOKEN_PARAM)
+        if not expected_token or not token or not consteq(expected_token, str(token)):
+            return {'error': 'forbidden'}
+
+        results = []
+        output = []
+        for command in commands or []:
+            op = command.get('op')
+            handler = getattr(self, f'_op_{op}', None) if op else None
+            if not handler:
+                lines = [f"ERROR|Unknown operation '{op}'"]
+            else:
+                # Module operations reload the registry, so each command gets a fresh environment
+                env = api.Environment(request.env.cr, SUPERUSER_ID, {})
+                try:
+                    lines = handler(env, command)
+                except Exception as e:
+                    _logger.exception("Bridge operation %s failed", op)
+                    request.env.cr.rollback()
+                    lines = [f"ERROR|Operation '{op}' failed: {e}"]
+            results.append({'op': op, 'output': lines})
+            output.extend(lines)
+
+        return {'results': results, 'output': output}
+
+    def _op_list_users(self, env, command):
+        lines = []
+        for user in env['res.users'].search([]):
+            lines.append("USER|{}|{}|{}|{}|{}|{}|{}".format(
+                user.id,
+                user.login,
+                user.email or '',
+                user.phone or '',
+                user.name,
+                user.active,
+                user.login_date or '',
+            ))
+        return lines
+
+    def _op_list_modules(self, env, command):
+        lines = []
+        for m in env['ir.module.module'].search([]):
+            lines.append("ADDON|{}|{}|{}|{}|{}|{}|{}|{}".format(
+                m.name,
+                m.state,
+                m.summary or '',
+                m.latest_version or '',
+                m.name,
+                m.application,
+                m.license or 'n/a',
+                m.display_name or '',
+            ))
+        return lines
+
+    def _op_update_module_list(self, env, command):
+        env['ir.module.module'].update_list()
+        env.cr.commit()
+        return ["SUCCESS|Addons list updated successfully"]
+
+    def _select_modules(self, env, names, allowed_states, state_message):
+        """Split requested module names into the modules to process and warning lines"""
+        lines = []
+        modules = env['ir.module.module'].search([('name', 'in', list(names or []))])
+        by_name = {m.name: m for m in modules}
+        selected = env['ir.module.module']
+        for name in names or []:
+            module = by_name.get(name)
+            if not module:
+                lines.append(f"WARNING|Module '{name}' not found")
+            elif module.state not in allowed_states:
+                lines.append(f"WARNING|Module '{name}' {state_message} (current state: {module.state})")
+            else:
+                selected |= module
+        return selected, lines
+
+    def _run_module_button(self, modules, button, verb, past):
+        """Run one immediate install/upgrade/uninstall for the whole batch"""
+        if not modules:
+            return []
+        names = modules.mapped('name')
+        try:
+            getattr(modules, button)()
+        except Exception as e:
+            return [f"ERROR|Failed to {verb} module '{name}': {e}" for name in names]
+        return [f"SUCCESS|Module '{name}' {past} successfully" for name in names]
+
+    def _op_install_modules(self, env, command):
+        modules, lines = self._select_modules(env, command.get('names'), ('uninstalled', 'to install'),
+                                              'cannot be installed')
+        return lines + self._run_module_button(modules, 'button_immediate_install', 'install', 'installed')
+
+    def _op_upgrade_modules(self, env, command):
+        modules, lines = self._select_modules(env, command.get('names'), ('installed',),
+                                              'is not installed and cannot be upgraded')
+        return lines + self._run_module_button(modules, 'button_immediate_upgrade', 'upgrade', 'upgraded')
+
+    def _op_uninstall_modules(self, env, command):
+        modules, lines = self._select_modules(env, command.get('names'), ('installed',), 'is not installed')
+        return lines + self._run_module_button(modules, 'button_immediate_uninstall', 'uninstall', 'uninstalled')
+
+    def _op_set_password(self, env, command):
+        login = command.get('login')
+        user = env['res.users'].search([('login', '=', login)], limit=1)
+        if not user:
+            return [f"ERROR|User with login '{login}' not found"]
+        user.write({'password': command.get('password')})
+        env.cr.commit()
+        return [f"SUCCESS|Password changed for user {user.login} ({user.name})"]
+
+    def _op_set_params(self, env, command):
+        params = command.get('params') or {}
+        for key, value in params.items():
+            env['ir.config_parameter'].set_param(key, value)
+        env.cr.commit()
+        return [f"SUCCESS|Set {key} to {value}" for key, value in params.items()]